@@ -1,8 +1,29 @@
 """JoystickXL standard boot.py."""
 
-import usb_hid  # type: ignore (this is a CircuitPython built-in)
-from telephony.hid import create_joystick
+import os
+import time
 
-# This will enable a joystick USB HID device.  All other standard CircuitPython USB HID
-# devices (keyboard, mouse, consumer control) will be disabled.
-usb_hid.enable((create_joystick(buttons=2),))
\ No newline at end of file
+import board  # type: ignore (this is a CircuitPython built-in)
+import usb_cdc  # type: ignore (this is a CircuitPython built-in)
+from telephony.profiles import JOYSTICK, TELEPHONY_KEYBOARD, select
+
+# This will enable one of the prebuilt USB HID profiles (see telephony/profiles.py).
+# Hold GP8 at power-on for telephony + keyboard, or GP9 for the large joystick; the
+# choice is remembered.  TELEPHONY_PROFILE in settings.toml picks one by name.  These
+# pins are kept apart from TELEPHONY_BUTTONS, or holding Phone Mute while plugging in
+# would quietly switch profile.
+profile = select(held=((board.GP8, TELEPHONY_KEYBOARD), (board.GP9, JOYSTICK)))
+profile.enable()
+
+# A second serial port carries binary telemetry (see telephony/telemetry.py), so the
+# console stays free for the REPL.
+usb_cdc.enable(console=True, data=True)
+
+# With TELEPHONY_PROFILE_BOOT = 1 in settings.toml, record when boot.py finished in
+# a "+" line like the joystick's, so telephony.profiler can report it.  Off by
+# default, because a boot_out.txt that changes on every boot is rewritten to flash
+# every time.
+if os.getenv("TELEPHONY_PROFILE_BOOT"):
+    from telephony.profiler import BOOT_MARKER
+
+    print(BOOT_MARKER, time.monotonic_ns() // 1000, "us")
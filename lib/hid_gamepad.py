@@ -9,52 +9,69 @@
 * Author(s): Dan Halbert
 """
 
-import struct
 import time
 
 from adafruit_hid import find_device
 
+# Generic Desktop usages given to axes, in order.
+_AXIS_USAGES = (0x30, 0x31, 0x32, 0x35, 0x33, 0x34, 0x36, 0x37, 0x38)
 
-class Gamepad:
-    """Emulate a generic gamepad controller with 16 buttons,
-    numbered 1-16, and two joysticks, one controlling
-    ``x` and ``y`` values, and the other controlling ``z`` and
-    ``r_z`` (z rotation or ``Rz``) values.
 
-    The joystick values could be interpreted
-    differently by the receiving program: those are just the names used here.
-    The joystick values are in the range -127 to 127."""
+class LayoutGamepad:
+    """Emulate a gamepad with any number of buttons, numbered from 1, and signed
+    axes of any width from 2 to 16 bits.
 
-    def __init__(self, devices):
-        """Create a Gamepad object that will send USB gamepad HID reports.
+    The layout is fixed when the object is created, and the byte and bit position
+    of every axis is worked out once then.  Each change is written straight into
+    the report, and a report is only sent when it differs from the last one sent.
 
-        Devices can be a list of devices that includes a gamepad device or a gamepad device
-        itself. A device is any object that implements ``send_report()``, ``usage_page`` and
-        ``usage``.
+    Buttons come first in the report, padded to a whole byte, followed by the axes
+    packed back to back. ``report_descriptor()`` builds the matching descriptor for
+    ``usb_hid.Device`` in ``boot.py``."""
+
+    def __init__(
+        self,
+        devices,
+        buttons=16,
+        axes=4,
+        axis_bits=8,
+        usage_page=0x1,
+        usage=0x05,
+    ):
+        """Create a gamepad object that will send USB gamepad HID reports.
+
+        Devices can be a list of devices that includes a gamepad device or a gamepad
+        device itself. A device is any object that implements ``send_report()``,
+        ``usage_page`` and ``usage``.
+
+        ``axis_bits`` is either one width for every axis, or a sequence with the
+        width of each axis. An axis ``n`` bits wide takes values from
+        ``-(2 ** (n - 1) - 1)`` to ``2 ** (n - 1) - 1``, i.e. -127 to 127 for 8 bits.
         """
-        self._gamepad_device = find_device(devices, usage_page=0x1, usage=0x0B)
+        self._buttons, self._axis_bits = self._check_layout(buttons, axes, axis_bits)
+        self._gamepad_device = find_device(devices, usage_page=usage_page, usage=usage)
 
-        # Reuse this bytearray to send mouse reports.
-        # Typically controllers start numbering buttons at 1 rather than 0.
-        # report[0] buttons 1-8 (LSB is button 1)
-        # report[1] buttons 9-16
-        # report[2] joystick 0 x: -127 to 127
-        # report[3] joystick 0 y: -127 to 127
-        # report[4] joystick 1 x: -127 to 127
-        # report[5] joystick 1 y: -127 to 127
-        self._report = bytearray(6)
+        # The packing plan, per axis: ((byte, byte mask, right shift), ...), the
+        # shift into the first byte, the value mask and the largest value
+        self._plan = list()
+        offset = 8 * ((buttons + 7) // 8)
+        for bits in self._axis_bits:
+            shift = offset % 8
+            mask = (1 << bits) - 1
+            parts = tuple(
+                (offset // 8 + n, ((mask << shift) >> (8 * n)) & 0xFF, 8 * n)
+                for n in range((shift + bits + 7) // 8)
+            )
+            self._plan.append((parts, shift, mask, (1 << (bits - 1)) - 1))
+            offset += bits
+        self._button_bytes = (buttons + 7) // 8
+
+        # Reuse this bytearray for every report.
+        self._report = bytearray((offset + 7) // 8)
 
         # Remember the last report as well, so we can avoid sending
         # duplicate reports.
-        self._last_report = bytearray(6)
-
-        # Store settings separately before putting into report. Saves code
-        # especially for buttons.
-        self._buttons_state = 0
-        self._joy_x = 0
-        self._joy_y = 0
-        self._joy_z = 0
-        self._joy_r_z = 0
+        self._last_report = bytearray(len(self._report))
 
         # Send an initial report to test if HID device is ready.
         # If not, wait a bit and try once more.
@@ -64,22 +81,77 @@ class Gamepad:
             time.sleep(1)
             self.reset_all()
 
+    @staticmethod
+    def report_descriptor(buttons=16, axes=4, axis_bits=8, report_id=0):
+        """Build the HID report descriptor for a layout, without a device.
+
+        Pass the result to ``usb_hid.Device`` in ``boot.py``, with the same layout
+        given to this class in ``code.py``. A ``report_id`` of ``0`` leaves the
+        report ID out."""
+        buttons, widths = LayoutGamepad._check_layout(buttons, axes, axis_bits)
+        # fmt: off
+        descriptor = bytearray((
+            0x05, 0x01,  # Usage Page (Generic Desktop Ctrls)
+            0x09, 0x05,  # Usage (Game Pad)
+            0xA1, 0x01,  # Collection (Application)
+        ))
+        if report_id:
+            descriptor.extend((0x85, report_id))  # Report ID
+        if buttons:
+            descriptor.extend((
+                0x05, 0x09,  # Usage Page (Button)
+                0x19, 0x01,  # Usage Minimum (Button 1)
+                0x29, buttons,  # Usage Maximum
+                0x15, 0x00,  # Logical Minimum (0)
+                0x25, 0x01,  # Logical Maximum (1)
+                0x75, 0x01,  # Report Size (1)
+                0x95, buttons,  # Report Count
+                0x81, 0x02,  # Input (Data,Var,Abs)
+            ))
+            if buttons % 8:
+                descriptor.extend((
+                    0x75, 8 - buttons % 8,  # Report Size (padding)
+                    0x95, 0x01,  # Report Count (1)
+                    0x81, 0x03,  # Input (Const,Var,Abs)
+                ))
+        if widths:
+            descriptor.extend((0x05, 0x01))  # Usage Page (Generic Desktop Ctrls)
+            for usage, bits in zip(_AXIS_USAGES, widths):
+                limit = (1 << (bits - 1)) - 1
+                descriptor.extend((
+                    0x09, usage,  # Usage (X, Y, Z, Rz, ...)
+                    0x16, -limit & 0xFF, (-limit >> 8) & 0xFF,  # Logical Minimum
+                    0x26, limit & 0xFF, limit >> 8,  # Logical Maximum
+                    0x75, bits,  # Report Size
+                    0x95, 0x01,  # Report Count (1)
+                    0x81, 0x02,  # Input (Data,Var,Abs)
+                ))
+            if sum(widths) % 8:
+                descriptor.extend((
+                    0x75, 8 - sum(widths) % 8,  # Report Size (padding)
+                    0x95, 0x01,  # Report Count (1)
+                    0x81, 0x03,  # Input (Const,Var,Abs)
+                ))
+        descriptor.append(0xC0)  # End Collection
+        # fmt: on
+        return bytes(descriptor)
+
     def press_buttons(self, *buttons):
         """Press and hold the given buttons."""
         for button in buttons:
-            self._buttons_state |= 1 << self._validate_button_number(button) - 1
+            self.update_button(self._validate_button_number(button), True)
         self._send()
 
     def release_buttons(self, *buttons):
         """Release the given buttons."""
         for button in buttons:
-            self._buttons_state &= ~(1 << self._validate_button_number(button) - 1)
+            self.update_button(self._validate_button_number(button), False)
         self._send()
 
     def release_all_buttons(self):
         """Release all the buttons."""
-
-        self._buttons_state = 0
+        for i in range(self._button_bytes):
+            self._report[i] = 0
         self._send()
 
     def click_buttons(self, *buttons):
@@ -87,71 +159,136 @@ class Gamepad:
         self.press_buttons(*buttons)
         self.release_buttons(*buttons)
 
-    def move_joysticks(self, x=None, y=None, z=None, r_z=None):
-        """Set and send the given joystick values.
-        The joysticks will remain set with the given values until changed
-
-        One joystick provides ``x`` and ``y`` values,
-        and the other provides ``z`` and ``r_z`` (z rotation).
-        Any values left as ``None`` will not be changed.
-
-        All values must be in the range -127 to 127 inclusive.
+    def move_axes(self, *values):
+        """Set and send axis values, in axis order. Any values left as ``None``
+        will not be changed.
 
         Examples::
 
-            # Change x and y values only.
-            gp.move_joysticks(x=100, y=-50)
+            # Change the first two axes only.
+            gp.move_axes(100, -50)
 
-            # Reset all joystick values to center position.
-            gp.move_joysticks(0, 0, 0, 0)
+            # Change the third axis only.
+            gp.move_axes(None, None, 20)
         """
-        if x is not None:
-            self._joy_x = self._validate_joystick_value(x)
-        if y is not None:
-            self._joy_y = self._validate_joystick_value(y)
-        if z is not None:
-            self._joy_z = self._validate_joystick_value(z)
-        if r_z is not None:
-            self._joy_r_z = self._validate_joystick_value(r_z)
+        if len(values) > len(self._plan):
+            raise ValueError("Gamepad has only %d axes" % len(self._plan))
+        for axis, value in enumerate(values):
+            if value is not None:
+                self.update_axis(axis, self._validate_axis_value(axis, value))
+        self._send()
+
+    def update_button(self, button, pressed):
+        """Set one button in the report, without checking it or sending.
+
+        This is the trusted fast path for code that already keeps its inputs in
+        range, i.e. a scan loop that calls ``send()`` once per pass."""
+        if pressed:
+            self._report[(button - 1) >> 3] |= 1 << ((button - 1) & 7)
+        else:
+            self._report[(button - 1) >> 3] &= ~(1 << ((button - 1) & 7))
+
+    def update_axis(self, axis, value):
+        """Set one axis in the report, without checking it or sending.
+
+        Only the bytes the axis occupies are rewritten. Like ``update_button()``,
+        out-of-range values are not caught."""
+        parts, shift, mask, _ = self._plan[axis]
+        raw = (value & mask) << shift
+        report = self._report
+        for index, byte_mask, right in parts:
+            report[index] = (report[index] & ~byte_mask) | ((raw >> right) & byte_mask)
+
+    def send(self):
+        """Send the report if anything changed since the last one was sent."""
         self._send()
 
     def reset_all(self):
-        """Release all buttons and set joysticks to zero."""
-        self._buttons_state = 0
-        self._joy_x = 0
-        self._joy_y = 0
-        self._joy_z = 0
-        self._joy_r_z = 0
+        """Release all buttons and set all axes to zero."""
+        for i in range(len(self._report)):
+            self._report[i] = 0
         self._send(always=True)
 
     def _send(self, always=False):
-        """Send a report with all the existing settings.
+        """Send the report.
         If ``always`` is ``False`` (the default), send only if there have been changes.
         """
-        struct.pack_into(
-            "<Hbbbb",
-            self._report,
-            0,
-            self._buttons_state,
-            self._joy_x,
-            self._joy_y,
-            self._joy_z,
-            self._joy_r_z,
-        )
-
         if always or self._last_report != self._report:
             self._gamepad_device.send_report(self._report)
             # Remember what we sent, without allocating new storage.
             self._last_report[:] = self._report
 
-    @staticmethod
-    def _validate_button_number(button):
-        if not 1 <= button <= 16:
-            raise ValueError("Button number must in range 1 to 16")
+    def _validate_button_number(self, button):
+        if not 1 <= button <= self._buttons:
+            raise ValueError("Button number must in range 1 to %d" % self._buttons)
         return button
 
+    def _validate_axis_value(self, axis, value):
+        limit = self._plan[axis][3]
+        if not -limit <= value <= limit:
+            raise ValueError("Axis value must be in range %d to %d" % (-limit, limit))
+        return value
+
     @staticmethod
-    def _validate_joystick_value(value):
-        if not -127 <= value <= 127:
-            raise ValueError("Joystick value must be in range -127 to 127")
-        return valu
\ No newline at end of file
+    def _check_layout(buttons, axes, axis_bits):
+        if isinstance(axis_bits, int):
+            axis_bits = (axis_bits,) * axes
+        axis_bits = tuple(axis_bits)
+        if len(axis_bits) != axes:
+            raise ValueError("Need one axis width per axis")
+        if not 0 <= buttons <= 255:
+            raise ValueError("Button count must be in range 0 to 255")
+        if not 0 <= axes <= len(_AXIS_USAGES):
+            raise ValueError("Axis count must be in range 0 to %d" % len(_AXIS_USAGES))
+        for bits in axis_bits:
+            if not 2 <= bits <= 16:
+                raise ValueError("Axis width must be in range 2 to 16 bits")
+        if not buttons and not axes:
+            raise ValueError("Gamepad needs at least one button or axis")
+        return buttons, axis_bits
+
+
+class Gamepad(LayoutGamepad):
+    """Emulate a generic gamepad controller with 16 buttons,
+    numbered 1-16, and two joysticks, one controlling
+    ``x` and ``y`` values, and the other controlling ``z`` and
+    ``r_z`` (z rotation or ``Rz``) values.
+
+    The joystick values could be interpreted
+    differently by the receiving program: those are just the names used here.
+    The joystick values are in the range -127 to 127."""
+
+    def __init__(self, devices):
+        """Create a Gamepad object that will send USB gamepad HID reports.
+
+        Devices can be a list of devices that includes a gamepad device or a gamepad device
+        itself. A device is any object that implements ``send_report()``, ``usage_page`` and
+        ``usage``.
+        """
+        # report[0] buttons 1-8 (LSB is button 1)
+        # report[1] buttons 9-16
+        # report[2] joystick 0 x: -127 to 127
+        # report[3] joystick 0 y: -127 to 127
+        # report[4] joystick 1 x: -127 to 127
+        # report[5] joystick 1 y: -127 to 127
+        super().__init__(devices, buttons=16, axes=4, axis_bits=8, usage=0x0B)
+
+    def move_joysticks(self, x=None, y=None, z=None, r_z=None):
+        """Set and send the given joystick values.
+        The joysticks will remain set with the given values until changed
+
+        One joystick provides ``x`` and ``y`` values,
+        and the other provides ``z`` and ``r_z`` (z rotation).
+        Any values left as ``None`` will not be changed.
+
+        All values must be in the range -127 to 127 inclusive.
+
+        Examples::
+
+            # Change x and y values only.
+            gp.move_joysticks(x=100, y=-50)
+
+            # Reset all joystick values to center position.
+            gp.move_joysticks(0, 0, 0, 0)
+        """
+        self.move_axes(x, y, z, r_z)
@@ -0,0 +1,225 @@
+"""
+Runtime configuration for JoystickXL inputs, loaded from ``settings.toml``.
+
+This module provides a ``Config`` object that reads button pin mappings, debounce
+times and the scan rate from ``settings.toml``, and re-applies changes to a running
+``Joystick`` by rebuilding only the inputs that changed.  Anything that would change
+the USB HID descriptor (i.e. the number of buttons) still needs ``boot.py``.
+
+.. code-block:: toml
+
+   TELEPHONY_BUTTONS = "GP4,GP5"
+   TELEPHONY_ACTIVE_LOW = 1
+   TELEPHONY_DEBOUNCE_MS = 10
+   TELEPHONY_SCAN_HZ = 1000
+
+.. note::
+
+   Saving ``settings.toml`` over USB normally triggers an auto-reload.  Set
+   ``supervisor.runtime.autoreload = False`` to have ``Config.poll()`` pick up the
+   change in place instead.
+"""
+
+import os
+import time
+
+# These typing imports help during development in vscode but fail in CircuitPython
+try:
+    from typing import Dict, List, Tuple, Union
+except ImportError:
+    pass
+
+import board  # type: ignore (this is a CircuitPython built-in)
+
+from telephony.inputs import Button
+
+
+class Config:
+    """Input mappings and timing settings loaded from ``settings.toml``."""
+
+    PREFIX = "TELEPHONY_"
+    """Prefix shared by every setting this module reads."""
+
+    def __init__(self, path: str = "/settings.toml", poll_ms: int = 1000) -> None:
+        """
+        Load input mappings and timing settings from ``settings.toml``.
+
+        :param path: Location of the settings file.  (Defaults to
+            ``/settings.toml``)
+        :type path: str, optional
+        :param poll_ms: Minimum time between checks for a changed file in
+            ``poll()``.  (Defaults to ``1000``)
+        :type poll_ms: int, optional
+        """
+        self._path = path
+        self._poll_ns = poll_ms * 1000000
+        self._next_poll = 0
+        self._stamp = None
+        self._applied = list()
+
+        self.buttons = ("GP4", "GP5")
+        """Board pin names for each button, in report order."""
+
+        self.active_low = True
+        """``True`` if the buttons are active low."""
+
+        self.debounce_ms = 0
+        """Debounce time applied to every button."""
+
+        self.scan_hz = 0
+        """Target ``Joystick.update()`` rate, or ``0`` to run as fast as possible."""
+
+        self.load()
+
+    @property
+    def scan_period_ns(self) -> int:
+        """
+        Get the target time between updates.
+
+        :return: Nanoseconds per update, ``0`` if the scan rate is unlimited.
+        :rtype: int
+        """
+        return 1000000000 // self.scan_hz if self.scan_hz else 0
+
+    def load(self) -> bool:
+        """
+        Read the current settings from the file at ``path``.
+
+        Settings that are missing keep their current value.  The file is read
+        directly rather than through ``os.getenv()``, which only ever sees
+        ``/settings.toml``.
+
+        :return: ``True`` if any setting changed.
+        :rtype: bool
+        """
+        previous = (self.buttons, self.active_low, self.debounce_ms, self.scan_hz)
+
+        self._stamp = self._file_stamp()
+        settings = self._read()
+
+        buttons = settings.get(self.PREFIX + "BUTTONS")
+        if buttons is not None:
+            self.buttons = tuple(p.strip() for p in buttons.split(",") if p.strip())
+        active_low = settings.get(self.PREFIX + "ACTIVE_LOW", self.active_low)
+        self.active_low = bool(active_low)
+        self.debounce_ms = settings.get(self.PREFIX + "DEBOUNCE_MS", self.debounce_ms)
+        self.scan_hz = settings.get(self.PREFIX + "SCAN_HZ", self.scan_hz)
+
+        return previous != (
+            self.buttons,
+            self.active_low,
+            self.debounce_ms,
+            self.scan_hz,
+        )
+
+    def apply(self, joystick) -> int:
+        """
+        Bring a joystick's buttons in line with the loaded settings.
+
+        Buttons whose pin or polarity changed are rebuilt and swapped in with
+        ``Joystick.replace_input()``; every other button is left alone apart from
+        its debounce time.  Buttons beyond the count in the USB HID descriptor are
+        ignored, and buttons no longer listed are replaced by idle virtual inputs.
+
+        :param joystick: The joystick to configure.
+        :type joystick: Joystick
+        :return: The number of buttons that were added or rebuilt.
+        :rtype: int
+        """
+        wanted = self._mapping(joystick.num_buttons, len(joystick.button))
+        changed = [
+            i
+            for i, mapping in enumerate(wanted)
+            if i >= len(self._applied) or self._applied[i] != mapping
+        ]
+
+        # release every old pin first, in case the new mapping swaps pins around
+        for i in changed:
+            if i < len(joystick.button):
+                joystick.button[i].deinit()
+
+        for i in changed:
+            button = self._build(wanted[i])
+            if i < len(joystick.button):
+                joystick.replace_input(i, button)
+            else:
+                joystick.add_input(button)
+
+        for button in joystick.button:
+            button.debounce_ms = self.debounce_ms
+
+        self._applied = wanted
+        return len(changed)
+
+    def poll(self, joystick) -> int:
+        """
+        Re-apply the settings if ``settings.toml`` changed since it was last read.
+
+        The file is checked at most once per ``poll_ms``, so this is cheap enough
+        to call on every pass through the input loop.
+
+        :param joystick: The joystick to reconfigure.
+        :type joystick: Joystick
+        :return: The number of buttons that were rebuilt.
+        :rtype: int
+        """
+        now = time.monotonic_ns()
+        if now < self._next_poll:
+            return 0
+        self._next_poll = now + self._poll_ns
+
+        if self._file_stamp() == self._stamp or not self.load():
+            return 0
+        return self.apply(joystick)
+
+    def _mapping(self, limit: int, current: int) -> List[Tuple[str, bool]]:
+        """Return the ``(pin name, active low)`` pair wanted for each button."""
+        wanted = [(name, self.active_low) for name in self.buttons[:limit]]
+        while len(wanted) < current:
+            wanted.append(("", self.active_low))
+        return wanted
+
+    def _build(self, mapping: Tuple[str, bool]) -> Button:
+        """Create a button for a ``(pin name, active low)`` pair."""
+        name, active_low = mapping
+        source = getattr(board, name) if name else None
+        return Button(source, active_low, debounce_ms=self.debounce_ms)
+
+    def _read(self) -> Dict[str, Union[str, int]]:
+        """
+        Parse the ``PREFIX`` settings from the file at ``path``.
+
+        Only the ``settings.toml`` subset CircuitPython itself understands is
+        handled: one ``KEY = value`` per line, with a quoted string or an integer.
+
+        :return: Each setting found, by key.  Empty if the file can't be read.
+        :rtype: Dict[str, Union[str, int]]
+        """
+        settings = dict()
+        try:
+            with open(self._path) as f:
+                for line in f:
+                    line = line.strip()
+                    if not line.startswith(self.PREFIX) or "=" not in line:
+                        continue
+                    key, value = line.split("=", 1)
+                    value = value.strip()
+                    try:
+                        if value.startswith('"'):
+                            value = value[1 : value.index('"', 1)]
+                        else:
+                            value = int(value.split("#", 1)[0].strip(), 0)
+                    except ValueError:
+                        continue
+                    settings[key.strip()] = value
+        except OSError:
+            pass
+        return settings
+
+    def _file_stamp(self) -> Tuple[int, int]:
+        """Return the size and modification time of the settings file."""
+        try:
+            stat = os.stat(self._path)
+        except OSError:
+            return (0, 0)
+        return (stat[6], stat[8])
@@ -0,0 +1,309 @@
+"""
+USB HID report descriptor parsing and report decoding.
+
+This module turns a report descriptor into a flat list of ``Field`` objects (report
+ID, bit offset, size, count and usages) and decodes raw reports against them.  It
+has no CircuitPython dependencies, so the same code is used on the device and by the
+host-side tools in ``tools/``.
+"""
+
+# These typing imports help during development in vscode but fail in CircuitPython
+try:
+    from typing import Dict, List, Optional, Tuple
+except ImportError:
+    pass
+
+# fmt: off
+TELEPHONY_INPUTS = bytes((
+    0x15, 0x00,  #   LOGICAL_MINIMUM (0)
+    0x25, 0x01,  #   LOGICAL_MAXIMUM (1)
+    0x75, 0x01,  #   REPORT_SIZE (1)
+    0x09, 0x2f,  #   USAGE (Phone Mute)
+    0x09, 0x20,  #   USAGE (Hook Switch)
+    0x95, 0x02,  #   REPORT_COUNT (2)
+    0x81, 0x02,  #   INPUT (Data,Var,Abs)
+    0x95, 0x06,  #   REPORT_COUNT (6)
+    0x81, 0x03,  #   INPUT (Cnst,Var,Abs)
+))
+"""Phone Mute (bit 0) and Hook Switch (bit 1) input items, one report byte."""
+
+TELEPHONY_LEDS = bytes((
+    0x05, 0x08,  #   USAGE_PAGE (LEDs)
+    0x09, 0x09,  #   USAGE (Mute)
+    0x09, 0x17,  #   USAGE (Off-Hook)
+    0x09, 0x18,  #   USAGE (Ring)
+    0x15, 0x00,  #   LOGICAL_MINIMUM (0)
+    0x25, 0x01,  #   LOGICAL_MAXIMUM (1)
+    0x75, 0x01,  #   REPORT_SIZE (1)
+    0x95, 0x03,  #   REPORT_COUNT (3)
+    0x91, 0x02,  #   OUTPUT (Data,Var,Abs)
+    0x95, 0x05,  #   REPORT_COUNT (5)
+    0x91, 0x03,  #   OUTPUT (Cnst,Var,Abs)
+    0x05, 0x0b,  #   USAGE_PAGE (Telephony Devices)
+))
+"""Mute (bit 0), Off-Hook (bit 1) and Ring (bit 2) LED output items, one report
+byte.  They leave the usage page on Telephony Devices."""
+
+TELEPHONY_REPORT_DESCRIPTOR = bytes((
+    0x05, 0x0b,  # USAGE_PAGE (Telephony Devices)
+    0x09, 0x05,  # USAGE (Headset)
+    0xa1, 0x01,  # COLLECTION (Application)
+    0x85, 0x0b,  #   REPORT_ID (11)
+)) + TELEPHONY_INPUTS + TELEPHONY_LEDS + bytes((
+    0xc0,        # END_COLLECTION
+))
+"""The telephony headset: ``TELEPHONY_INPUTS`` and ``TELEPHONY_LEDS`` in report 11.
+Every device this package builds lays out its first report this way."""
+# fmt: on
+
+INPUT = 0x8
+"""Main item tag for ``INPUT`` fields."""
+
+OUTPUT = 0x9
+"""Main item tag for ``OUTPUT`` fields."""
+
+FEATURE = 0xB
+"""Main item tag for ``FEATURE`` fields."""
+
+
+class Field:
+    """One ``INPUT``, ``OUTPUT`` or ``FEATURE`` main item from a report descriptor."""
+
+    def __init__(
+        self,
+        kind: int,
+        report_id: int,
+        offset: int,
+        size: int,
+        count: int,
+        flags: int,
+        usage_page: int,
+        usages: List[int],
+        logical_min: int,
+        logical_max: int,
+    ) -> None:
+        """
+        Describe one main item from a report descriptor.
+
+        :param kind: ``INPUT``, ``OUTPUT`` or ``FEATURE``.
+        :type kind: int
+        :param report_id: The report ID the field belongs to, ``0`` if none.
+        :type report_id: int
+        :param offset: Bit offset of the first element, not counting the report ID.
+        :type offset: int
+        :param size: Bits per element (``REPORT_SIZE``).
+        :type size: int
+        :param count: Number of elements (``REPORT_COUNT``).
+        :type count: int
+        :param flags: The main item data (bit 0 constant, bit 1 variable, bit 2
+            relative).
+        :type flags: int
+        :param usage_page: The usage page in effect for the field.
+        :type usage_page: int
+        :param usages: Usages for each element of a variable field, or the usages
+            selected by each logical value of an array field.
+        :type usages: List[int]
+        :param logical_min: ``LOGICAL_MINIMUM`` for the field.
+        :type logical_min: int
+        :param logical_max: ``LOGICAL_MAXIMUM`` for the field.
+        :type logical_max: int
+        """
+        self.kind = kind
+        self.report_id = report_id
+        self.offset = offset
+        self.size = size
+        self.count = count
+        self.flags = flags
+        self.usage_page = usage_page
+        self.usages = usages
+        self.logical_min = logical_min
+        self.logical_max = logical_max
+
+    @property
+    def constant(self) -> bool:
+        """
+        Determine if this field is padding.
+
+        :return: ``True`` for constant fields.
+        :rtype: bool
+        """
+        return bool(self.flags & 0x01)
+
+    @property
+    def variable(self) -> bool:
+        """
+        Determine if each element of this field maps to its own usage.
+
+        :return: ``True`` for variable fields, ``False`` for array fields.
+        :rtype: bool
+        """
+        return bool(self.flags & 0x02)
+
+    def usage(self, index: int) -> int:
+        """
+        Get the usage of one element of a variable field.
+
+        :param index: The 0-based element index.
+        :type index: int
+        :return: The usage ID, repeating the last usage if the descriptor listed
+            fewer usages than elements.  ``0`` if no usages were given.
+        :rtype: int
+        """
+        if not self.usages:
+            return 0
+        return self.usages[min(index, len(self.usages) - 1)]
+
+
+def parse_descriptor(descriptor) -> List[Field]:
+    """
+    Parse a USB HID report descriptor into a list of fields.
+
+    Only short items are supported, which covers every descriptor in this project
+    and practically every real device.
+
+    :param descriptor: The raw report descriptor.
+    :type descriptor: bytes
+    :raises ValueError: If the descriptor contains a long item or is truncated.
+    :return: Every ``INPUT``, ``OUTPUT`` and ``FEATURE`` field in descriptor order.
+    :rtype: List[Field]
+    """
+    fields = list()
+    state = {"page": 0, "min": 0, "max": 0, "size": 0, "count": 0, "id": 0}
+    stack = list()
+    usages = list()
+    usage_min = None
+    offsets = dict()  # (kind, report_id) -> next bit offset
+
+    i = 0
+    while i < len(descriptor):
+        prefix = descriptor[i]
+        if prefix == 0xFE:
+            raise ValueError("Long HID descriptor items are not supported.")
+        length = (0, 1, 2, 4)[prefix & 0x03]
+        if i + 1 + length > len(descriptor):
+            raise ValueError("HID descriptor is truncated.")
+        data = 0
+        for n in range(length):
+            data |= descriptor[i + 1 + n] << (8 * n)
+        item_type = (prefix >> 2) & 0x03
+        tag = prefix >> 4
+        i += 1 + length
+
+        if item_type == 0:  # main
+            if tag in (INPUT, OUTPUT, FEATURE):
+                key = (tag, state["id"])
+                offset = offsets.get(key, 0)
+                fields.append(
+                    Field(
+                        tag,
+                        state["id"],
+                        offset,
+                        state["size"],
+                        state["count"],
+                        data,
+                        state["page"],
+                        [u & 0xFFFF for u in usages],
+                        state["min"],
+                        state["max"],
+                    )
+                )
+                offsets[key] = offset + state["size"] * state["count"]
+            usages = list()
+            usage_min = None
+        elif item_type == 1:  # global
+            if tag == 0x0:
+                state["page"] = data
+            elif tag == 0x1:
+                state["min"] = _signed(data, length)
+            elif tag == 0x2:
+                state["max"] = _signed(data, length)
+            elif tag == 0x7:
+                state["size"] = data
+            elif tag == 0x8:
+                state["id"] = data
+            elif tag == 0x9:
+                state["count"] = data
+            elif tag == 0xA:
+                stack.append(dict(state))
+            elif tag == 0xB and stack:
+                state = stack.pop()
+        elif item_type == 2:  # local
+            if tag == 0x0:
+                usages.append(data)
+            elif tag == 0x1:
+                usage_min = data
+            elif tag == 0x2 and usage_min is not None:
+                usages.extend(range(usage_min, data + 1))
+
+    return fields
+
+
+def report_lengths(fields: List[Field], kind: int = INPUT) -> Dict[int, int]:
+    """
+    Calculate the length of each report, not counting the report ID byte.
+
+    :param fields: Fields returned by ``parse_descriptor``.
+    :type fields: List[Field]
+    :param kind: ``INPUT``, ``OUTPUT`` or ``FEATURE``.  (Defaults to ``INPUT``)
+    :type kind: int, optional
+    :return: Report length in bytes for each report ID (``0`` if none are used).
+    :rtype: Dict[int, int]
+    """
+    bits = dict()
+    for f in fields:
+        if f.kind == kind:
+            end = f.offset + f.size * f.count
+            bits[f.report_id] = max(bits.get(f.report_id, 0), end)
+    return {report_id: (n + 7) // 8 for report_id, n in bits.items()}
+
+
+def decode_report(
+    fields: List[Field], report, report_id: Optional[int] = None
+) -> List[Tuple[int, int, int]]:
+    """
+    Decode an input report into ``(usage_page, usage, value)`` tuples.
+
+    Variable fields produce one tuple per element.  Array fields produce one tuple,
+    with a value of ``1``, for each usage currently listed in the report.
+
+    :param fields: Fields returned by ``parse_descriptor``.
+    :type fields: List[Field]
+    :param report: The raw report.  If ``report_id`` is ``None`` and the descriptor
+        uses report IDs, the first byte is taken to be the report ID.
+    :type report: bytes
+    :param report_id: The report ID, if it has already been stripped from the data.
+        (Defaults to ``None``)
+    :type report_id: int, optional
+    :return: The decoded values, constant fields excluded.
+    :rtype: List[Tuple[int, int, int]]
+    """
+    if report_id is None:
+        report_id = 0
+        if any(f.report_id for f in fields):
+            report_id = report[0]
+            report = report[1:]
+
+    data = int.from_bytes(bytes(report), "little")
+    values = list()
+    for f in fields:
+        if f.kind != INPUT or f.report_id != report_id or f.constant:
+            continue
+        mask = (1 << f.size) - 1
+        for n in range(f.count):
+            raw = (data >> (f.offset + n * f.size)) & mask
+            if f.logical_min < 0 and raw & (1 << (f.size - 1)):
+                raw -= 1 << f.size
+            if f.variable:
+                values.append((f.usage_page, f.usage(n), raw))
+            elif 0 <= raw - f.logical_min < len(f.usages):
+                usage = f.usages[raw - f.logical_min]
+                if usage:
+                    values.append((f.usage_page, usage, 1))
+    return values
+
+
+def _signed(value: int, length: int) -> int:
+    """Sign-extend item data of ``length`` bytes."""
+    if length and value & (1 << (8 * length - 1)):
+        return value - (1 << (8 * length))
+    return value
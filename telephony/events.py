@@ -0,0 +1,132 @@
+"""
+Edge-latched input events shared by several independent consumers.
+
+This module provides an ``EventQueue`` that ``Joystick.update()`` fills with a
+timestamped event for every button edge it scans, and ``EventCursor`` readers that
+each keep their own place in it.  Report generation, LEDs, gestures and telemetry can
+all follow the same edges without reading ``Button.value`` themselves, so no consumer
+can make another miss a press.
+
+.. code::
+
+   presses = js.events.cursor()
+
+   while True:
+       js.update()
+       while presses.next():
+           print("button", presses.index, presses.pressed, presses.time_us)
+"""
+
+from array import array
+
+
+class EventQueue:
+    """Preallocated ring buffer of timestamped button edges."""
+
+    def __init__(self, size: int = 64) -> None:
+        """
+        Preallocate a ring buffer of button edges.
+
+        :param size: Events kept before the oldest is overwritten.  A cursor that
+            falls further behind than this skips ahead and counts the events it
+            missed.  (Defaults to ``64``)
+        :type size: int, optional
+        """
+        self._size = size
+        self._index = array("H", [0] * size)
+        self._pressed = bytearray(size)
+        self._time = array("L", [0] * size)
+
+        self.written = 0
+        """Total events added since start-up."""
+
+    def push(self, index: int, pressed: bool, time_us: int) -> None:
+        """
+        Add an event, overwriting the oldest one if the buffer is full.
+
+        :param index: The button's index in ``Joystick.button``.
+        :type index: int
+        :param pressed: ``True`` for a press, ``False`` for a release.
+        :type pressed: bool
+        :param time_us: When the edge was scanned, in microseconds (wrapping at
+            32 bits).
+        :type time_us: int
+        """
+        slot = self.written % self._size
+        self._index[slot] = index
+        self._pressed[slot] = pressed
+        self._time[slot] = time_us & 0xFFFFFFFF
+        self.written += 1
+
+    def cursor(self) -> "EventCursor":
+        """
+        Create a reader that starts with the next event added.
+
+        :return: A new, independent cursor.
+        :rtype: EventCursor
+        """
+        return EventCursor(self)
+
+
+class EventCursor:
+    """One consumer's position in an ``EventQueue``."""
+
+    @property
+    def pending(self) -> int:
+        """
+        Get the number of events waiting for this cursor.
+
+        :return: Unread events, including any that were already overwritten.
+        :rtype: int
+        """
+        return self._queue.written - self._read
+
+    def __init__(self, queue: EventQueue) -> None:
+        """
+        Follow an ``EventQueue`` from its next event on.
+
+        :param queue: The queue to read.
+        :type queue: EventQueue
+        """
+        self._queue = queue
+        self._read = queue.written
+
+        self.index = 0
+        """Button index of the current event."""
+
+        self.pressed = False
+        """``True`` if the current event is a press, ``False`` for a release."""
+
+        self.time_us = 0
+        """Scan time of the current event, in microseconds (wrapping at 32 bits)."""
+
+        self.missed = 0
+        """Events overwritten before this cursor read them."""
+
+    def next(self) -> bool:
+        """
+        Load the next event into ``index``, ``pressed`` and ``time_us``.
+
+        Nothing is allocated, so this is safe to call in the input loop.
+
+        :return: ``True`` if there was an event, ``False`` if the cursor is caught up.
+        :rtype: bool
+        """
+        queue = self._queue
+        behind = queue.written - self._read
+        if not behind:
+            return False
+        if behind > queue._size:
+            self.missed += behind - queue._size
+            self._read = queue.written - queue._size
+
+        slot = self._read % queue._size
+        self.index = queue._index[slot]
+        self.pressed = queue._pressed[slot] == 1
+        self.time_us = queue._time[slot]
+        self._read += 1
+        return True
+
+    def skip(self) -> None:
+        """Drop every pending event, i.e. after a consumer was paused."""
+        self._read = self._queue.written
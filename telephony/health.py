@@ -0,0 +1,245 @@
+"""
+Chatter and stuck-input detection with automatic bypass.
+
+This module provides a ``HealthMonitor`` that follows a joystick's button edges
+through ``Joystick.events``, counts edges per time window and how long each button
+has been held, and sets the input's ``bypass`` flag when a switch chatters or
+sticks.  A failing switch then stops flooding the host with reports, or holding
+Phone Mute forever, until it behaves again.  ``Axis`` and ``Hat`` inputs, which
+``Joystick`` does not manage, can be added with ``watch()``.
+
+.. code::
+
+   health = HealthMonitor(js, max_edges=20, stuck_ms=120000)
+
+   while True:
+       js.update()
+       health.update()
+"""
+
+import time
+from array import array
+
+# These typing imports help during development in vscode but fail in CircuitPython
+try:
+    from typing import Callable, List, Optional, Sequence, Tuple
+except ImportError:
+    pass
+
+from telephony.inputs import Hat
+from telephony.telemetry import FAULT
+
+CHATTER = 1
+"""Fault: more than ``max_edges`` edges in one window."""
+
+STUCK = 2
+"""Fault: held (or off-centre) for longer than ``stuck_ms``."""
+
+WATCHED_INDEX = 0xF0
+"""Telemetry index of the first ``watch()`` input; buttons use their own index."""
+
+_MASK = 0xFFFFFFFF
+
+
+class HealthMonitor:
+    """Bypass inputs that chatter or stick, and report the fault."""
+
+    def __init__(
+        self,
+        joystick,
+        window_ms: int = 1000,
+        max_edges: int = 20,
+        stuck_ms: int = 120000,
+        recover: bool = True,
+        exclude: Sequence[int] = (),
+        on_fault: Optional[Callable[[int, int], None]] = None,
+    ) -> None:
+        """
+        Watch a joystick's buttons for chatter and stuck switches.
+
+        :param joystick: The joystick whose ``events`` are followed.
+        :type joystick: Joystick
+        :param window_ms: Length of each edge-counting window.
+            (Defaults to ``1000``)
+        :type window_ms: int, optional
+        :param max_edges: Edges allowed per window before an input counts as
+            chattering.  (Defaults to ``20``)
+        :type max_edges: int, optional
+        :param stuck_ms: How long an input may stay pressed before it counts as
+            stuck, ``0`` to disable.  (Defaults to ``120000``)
+        :type stuck_ms: int, optional
+        :param recover: Clear a fault, and the bypass, once a stuck input is
+            released or a chattering one has a quiet window (a quarter of
+            ``max_edges`` or fewer).  (Defaults to ``True``)
+        :type recover: bool, optional
+        :param exclude: Button indexes that are never bypassed, i.e. a latching
+            hook switch that is legitimately held for a whole call.  More can be
+            added later with ``exclude()``.  (Defaults to none)
+        :type exclude: Sequence[int], optional
+        :param on_fault: Called as ``on_fault(index, kind)`` when a fault is set,
+            and with ``kind`` ``0`` when it clears.  ``index`` is the button index,
+            or ``WATCHED_INDEX`` plus the ``watch()`` order.  (Defaults to none)
+        :type on_fault: Callable, optional
+        """
+        count = joystick.num_buttons
+        self._joystick = joystick
+        self._events = joystick.events.cursor()
+        self._window = window_ms * 1000
+        self._max_edges = max_edges
+        self._stuck = stuck_ms * 1000
+        self._recover = recover
+        self._exclude = tuple(exclude)
+        self._on_fault = on_fault
+        self._edges = bytearray(count)  # saturates at 255
+        self._held = bytearray(count)
+        self._since = array("L", [0] * count)  # press time, microseconds
+        self._fault = bytearray(count)  # fault set by this monitor, 0 if none
+        self._watched = list()  # [input, idle, last value, edges, since, fault]
+        self._window_start = (time.monotonic_ns() // 1000) & _MASK
+
+        self.faults = 0
+        """Faults detected since start-up."""
+
+    def watch(self, input, idle: Optional[int] = None) -> int:
+        """
+        Also monitor an ``Axis`` or ``Hat``, through the value it last reported.
+
+        :param input: The input to monitor.  Its ``.value`` must be read elsewhere
+            (i.e. when building its report); this only looks at the cached value.
+        :type input: Axis or Hat
+        :param idle: The resting value.  A ``Hat`` counts as stuck when away from
+            it for ``stuck_ms``, an ``Axis`` when pinned at ``0`` or ``255``.
+            (Defaults to ``input.IDLE``)
+        :type idle: int, optional
+        :return: The telemetry and ``on_fault`` index used for this input.
+        :rtype: int
+        """
+        if idle is None:
+            idle = input.IDLE
+        self._watched.append([input, idle, input._value, 0, 0, 0])
+        return WATCHED_INDEX + len(self._watched) - 1
+
+    def exclude(self, *index: int) -> None:
+        """
+        Never bypass these buttons from now on, and lift any bypass already set.
+
+        Use it for a button that is held on purpose, i.e. ``MuteControl.output`` in
+        ``ON_OFF`` mode, which stays pressed for as long as the call is muted.
+
+        :param index: Button indexes in ``Joystick.button``.
+        :type index: int
+        """
+        self._exclude += index
+        for i in index:
+            if i < len(self._fault) and self._fault[i]:
+                self._clear(i)
+
+    def faulted(self) -> List[Tuple[int, int]]:
+        """
+        Get the inputs currently bypassed by this monitor.
+
+        :return: ``(index, kind)`` pairs, with ``kind`` ``CHATTER`` or ``STUCK``.
+        :rtype: List[Tuple[int, int]]
+        """
+        found = [(i, kind) for i, kind in enumerate(self._fault) if kind]
+        for n, w in enumerate(self._watched):
+            if w[5]:
+                found.append((WATCHED_INDEX + n, w[5]))
+        return found
+
+    def update(self) -> None:
+        """Count new edges, and check hold times once per window.  Call every loop."""
+        now = (time.monotonic_ns() // 1000) & _MASK
+        edges = self._edges
+        events = self._events
+        while events.next():
+            i = events.index
+            if i >= len(edges):
+                continue
+            if edges[i] < 255:
+                edges[i] += 1
+            self._held[i] = events.pressed
+            self._since[i] = events.time_us
+            if self._fault[i] == STUCK and not events.pressed and self._recover:
+                self._clear(i)
+            elif edges[i] > self._max_edges and not self._fault[i]:
+                self._set(i, CHATTER)
+
+        for n, w in enumerate(self._watched):
+            value = w[0]._value
+            if value != w[2]:
+                w[2] = value
+                w[3] += 1
+                w[4] = now
+                if w[5] == STUCK and not self._pinned(w) and self._recover:
+                    self._set_watched(n, 0)
+                elif w[3] > self._max_edges and not w[5]:
+                    self._set_watched(n, CHATTER)
+
+        if (now - self._window_start) & _MASK >= self._window:
+            self._window_start = now
+            self._end_window(now)
+
+    def _end_window(self, now: int) -> None:
+        """Recover quiet inputs, check for stuck ones and start a new window."""
+        quiet = self._max_edges // 4
+        for i in range(len(self._edges)):
+            if self._fault[i] == CHATTER and self._recover and self._edges[i] <= quiet:
+                self._clear(i)
+            self._edges[i] = 0
+            if self._stuck and self._held[i] and not self._fault[i]:
+                if (now - self._since[i]) & _MASK >= self._stuck:
+                    self._set(i, STUCK)
+
+        for n, w in enumerate(self._watched):
+            if w[5] == CHATTER and self._recover and w[3] <= quiet:
+                self._set_watched(n, 0)
+            w[3] = 0
+            if self._stuck and not w[5] and self._pinned(w):
+                if (now - w[4]) & _MASK >= self._stuck:
+                    self._set_watched(n, STUCK)
+
+    def _set(self, index: int, kind: int) -> None:
+        """Bypass a button and report the fault."""
+        if index in self._exclude or index >= len(self._joystick.button):
+            return
+        button = self._joystick.button[index]
+        if button.bypass:
+            # already bypassed by the application; leave it alone
+            return
+        button.bypass = True
+        self._fault[index] = kind
+        self._report(index, kind)
+
+    def _clear(self, index: int) -> None:
+        """Remove the bypass this monitor set on a button."""
+        self._fault[index] = 0
+        if index < len(self._joystick.button):
+            self._joystick.button[index].bypass = False
+        self._report(index, 0)
+
+    def _set_watched(self, n: int, kind: int) -> None:
+        """Set or clear (``kind`` ``0``) the fault on a watched input."""
+        w = self._watched[n]
+        if kind and w[0].bypass:
+            return
+        w[0].bypass = bool(kind)
+        w[5] = kind
+        self._report(WATCHED_INDEX + n, kind)
+
+    @staticmethod
+    def _pinned(w: list) -> bool:
+        """Determine if a watched input is away from rest in a way that can stick."""
+        if w[1] == Hat.IDLE:  # any held direction can stick
+            return w[2] != w[1]
+        return w[2] in (0, 255)
+
+    def _report(self, index: int, kind: int) -> None:
+        """Send a fault (or its recovery) to telemetry and ``on_fault``."""
+        if kind:
+            self.faults += 1
+        telemetry = self._joystick.telemetry
+        if telemetry is not None:
+            telemetry.record(FAULT, index, kind)
+        if self._on_fault is not None:
+            self._on_fault(index, kind)
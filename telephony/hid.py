@@ -8,11 +8,35 @@ with a descriptor that includes the configured type and quantity of inputs.
 import usb_hid  # type: ignore (this is a CircuitPython built-in)
 
 from telephony import __version__
+from telephony.descriptor import TELEPHONY_INPUTS, TELEPHONY_LEDS
+
+# These typing imports help during development in vscode but fail in CircuitPython
+try:
+    from typing import List, Sequence, Tuple
+except ImportError:
+    pass
+
+SHARD_BUTTONS = 128
+"""Buttons per report.  Buttons beyond the first shard go in extra report IDs."""
+
+MAX_SHARDS = 8
+"""The most button reports a single device can be split across."""
+
+LED_MUTE = 0
+"""Bit position of the Mute LED in the output report enabled by ``leds=True``."""
+
+LED_OFF_HOOK = 1
+"""Bit position of the Off-Hook LED in the output report enabled by ``leds=True``."""
+
+LED_RING = 2
+"""Bit position of the Ring LED in the output report enabled by ``leds=True``."""
 
 
 def create_joystick(
     buttons: int = 16,
     report_id: int = 0x0b,
+    reports: Sequence[Tuple[int, int, bytes]] = (),
+    leds: bool = False,
 ) -> usb_hid.Device:
     """
     Create the ``usb_hid.Device`` required by ``usb_hid.enable()`` in ``boot.py``.
@@ -25,22 +49,47 @@ def create_joystick(
 
     :param axes: The number of axes to support, from 0 to 8.  (Default is 4)
     :type axes: int, optional
-    :param buttons: The number of buttons to support, from 0 to 128.  (Default is 16)
+    :param buttons: The number of buttons to support, from 0 to 1024.  The first
+        two are Phone Mute and Hook Switch, the rest generic buttons numbered from
+        1.  Buttons beyond the first 128 are sharded into extra reports of up to
+        128 buttons, each with its own report ID, so a change only sends the
+        affected shard.  (Default is 16)
     :type buttons: int, optional
     :param hats: The number of hat switches to support, from 0 to 4.  (Default is 1)
     :type hats: int, optional
     :param report_id: The USB HID report ID number to use.  (Default is 4)
     :type report_d: int, optional
+    :param reports: Additional input reports, each given as a
+        ``(report_id, length, items)`` tuple where ``items`` are the descriptor items
+        that describe the report's fields.  A ``REPORT_ID`` item is inserted before
+        them, inside the same application collection.  ``Joystick.report()`` returns
+        the buffer for each one.  (Default is none)
+    :type reports: Sequence[Tuple[int, int, bytes]], optional
+    :param leds: Set to ``True`` to add a 1-byte output report with the Mute,
+        Off-Hook and Ring LED usages, so the host can tell the device its call state
+        (see ``LED_MUTE``, ``LED_OFF_HOOK`` and ``LED_RING``).  (Default is ``False``)
+    :type leds: bool, optional
     :return: A ``usb_hid.Device`` object with a descriptor identifying it as a joystick
         with the specified number of buttons, axes and hat switches.
     :rtype: ``usb_hid.Device``
 
     """
-    _num_buttons = buttons
+    _num_buttons = min(buttons, SHARD_BUTTONS)
 
     # Validate the number of configured axes, buttons and hats.
-    if _num_buttons < 0 or _num_buttons > 128:
-        raise ValueError("Button count must be from 0-128.")
+    if buttons < 0 or buttons > SHARD_BUTTONS * MAX_SHARDS:
+        _limit = SHARD_BUTTONS * MAX_SHARDS
+        raise ValueError("Button count must be from 0-%d." % _limit)
+
+    _report_ids = [report_id]
+    for _id, _length, _ in reports:
+        if _id in _report_ids or not 1 <= _id <= 255:
+            raise ValueError("Report IDs must be unique and from 1-255.")
+        if _length < 1:
+            raise ValueError("Report length must be at least 1 byte.")
+        _report_ids.append(_id)
+
+    _shards = shard_layout(buttons, report_id, _report_ids)
 
 
     _report_length = 0
@@ -57,69 +106,147 @@ def create_joystick(
     ))
 
 
-#    if _num_buttons:
-#        _descriptor.extend(bytes((
-#            0x05, 0x09,                     # :     USAGE_PAGE (Button)
-#            0x19, 0x01,                     # :     USAGE_MINIMUM (Button 1)
-#            0x29, _num_buttons,             # :     USAGE_MAXIMUM (num_buttons)
-#            0x15, 0x00,                     # :     LOGICAL_MINIMUM (0)
-#            0x25, 0x01,                     # :     LOGICAL_MAXIMUM (1)
-#            0x95, _num_buttons,             # :     REPORT_COUNT (num_buttons)
-#            0x75, 0x01,                     # :     REPORT_SIZE (1)
-#            0x81, 0x02,                     # :     INPUT (Data,Var,Abs)
-#        )))
-
     if _num_buttons:
-        _descriptor.extend(bytes((
-            0x25, 0x01,                     # :     USAGE_PAGE (Button)
-            0x15, 0x00,                     # :     USAGE_MINIMUM (Button 1)
-            0x09, 0x2f
-            ,             # :     USAGE_MAXIMUM (num_buttons)
-            0x15, 0x00,                     # :     LOGICAL_MINIMUM (0)
-            0x75, 0x01,                     # :     LOGICAL_MAXIMUM (1)
-            0x95, 0x01,             # :     REPORT_COUNT (num_buttons)
-            0x81, 0x02,                     # :     REPORT_SIZE (1)
-            0x95, 0x07,                     # :     INPUT (Data,Var,Abs)
-            0x81, 0x03,
-
-        )))
-
+        # Phone Mute and Hook Switch take the first two bits, as in the prebuilt
+        # profiles; any further buttons are generic Button page usages from 1
+        _telephony = min(_num_buttons, 2)
+        _generic = _num_buttons - _telephony
+        if _telephony > 1:
+            # the shared telephony items, without their padding
+            _descriptor.extend(TELEPHONY_INPUTS[:-4])
+        else:
+            _descriptor.extend(bytes((
+                0x15, 0x00,                 # :     LOGICAL_MINIMUM (0)
+                0x25, 0x01,                 # :     LOGICAL_MAXIMUM (1)
+                0x75, 0x01,                 # :     REPORT_SIZE (1)
+                0x09, 0x2f,                 # :     USAGE (Phone Mute)
+                0x95, 0x01,                 # :     REPORT_COUNT (1)
+                0x81, 0x02,                 # :     INPUT (Data,Var,Abs)
+            )))
+        if _generic:
+            _descriptor.extend(bytes((
+                0x05, 0x09,                 # :     USAGE_PAGE (Button)
+                0x19, 0x01,                 # :     USAGE_MINIMUM (Button 1)
+                0x29, _generic,             # :     USAGE_MAXIMUM (_generic)
+                0x95, _generic,             # :     REPORT_COUNT (_generic)
+                0x81, 0x02,                 # :     INPUT (Data,Var,Abs)
+                0x05, 0x0b,                 # :     USAGE_PAGE (Telephony Devices)
+            )))
 
         _button_pad = _num_buttons % 8
         if _button_pad:
             _descriptor.extend(bytes((
-                0x75, 0x01,                 # :     REPORT_SIZE (1)
-                0x95, 8 - _button_pad,      # :     REPORT_COUNT (_button_pad)
+                0x95, 8 - _button_pad,      # :     REPORT_COUNT (padding)
                 0x81, 0x03,                 # :     INPUT (Cnst,Var,Abs)
             )))
 
         _report_length += ((_num_buttons // 8) + bool(_button_pad))
 
+    if leds:
+        _descriptor.extend(TELEPHONY_LEDS)
+
+    # shards carry on from the last Button page usage in the first report
+    _first = SHARD_BUTTONS - 1
+    for _id, _length in _shards:
+        _count = min(_length * 8, buttons - _first - 1)
+        _last = _first + _count - 1
+        _descriptor.extend(bytes((
+            0x85, _id,                      # :   REPORT_ID (_id)
+            0x05, 0x09,                     # :     USAGE_PAGE (Button)
+            0x1a, _first & 0xFF, _first >> 8,   # : USAGE_MINIMUM (_first)
+            0x2a, _last & 0xFF, _last >> 8,     # : USAGE_MAXIMUM (_last)
+            0x15, 0x00,                     # :     LOGICAL_MINIMUM (0)
+            0x25, 0x01,                     # :     LOGICAL_MAXIMUM (1)
+            0x75, 0x01,                     # :     REPORT_SIZE (1)
+            0x95, _count,                   # :     REPORT_COUNT (_count)
+            0x81, 0x02,                     # :     INPUT (Data,Var,Abs)
+        )))
+        if _count % 8:
+            _descriptor.extend(bytes((
+                0x95, 8 - _count % 8,       # :     REPORT_COUNT (padding)
+                0x81, 0x03,                 # :     INPUT (Cnst,Var,Abs)
+            )))
+        _descriptor.extend(bytes((
+            0x05, 0x0b,                     # :     USAGE_PAGE (Telephony Devices)
+        )))
+        _first = _last + 1
+
+    for _id, _, _items in reports:
+        _descriptor.extend(bytes((
+            0x85, _id,                      # :   REPORT_ID (_id)
+        )))
+        _descriptor.extend(_items)
+
     _descriptor.extend(bytes((
         0xC0,                               # : END_COLLECTION
     )))
     # fmt: on
 
     # write configuration data to boot.out using 'print'
+    _extra = list()
+    if reports or _shards:
+        _extra.extend(("id", report_id))
+        for _id, _length in _shards:
+            _extra.extend(("shard", _id, _length))
+        for _id, _length, _ in reports:
+            _extra.extend(("report", _id, _length))
     print(
         "+ Enabled JoystickXL",
         __version__,
-        _num_buttons,
+        buttons,
         "buttons",
         _report_length,
         "report bytes.",
+        *_extra
     )
 
     return usb_hid.Device(
         report_descriptor=bytes(_descriptor),
         usage_page=0x0b,  # same as USAGE_PAGE from descriptor above
         usage=0x05,  # same as USAGE from descriptor above
-        report_ids=(report_id,),  # report ID defined in descriptor
-        in_report_lengths=(_report_length,),  # length of reports to host
-        out_report_lengths=(0,),  # length of reports from host
+        # report IDs defined in descriptor: buttons, button shards, extra reports
+        report_ids=(report_id,) + tuple(s[0] for s in _shards) + tuple(_report_ids[1:]),
+        in_report_lengths=(_report_length,)
+        + tuple(s[1] for s in _shards)
+        + tuple(r[1] for r in reports),
+        out_report_lengths=(int(leds),) + (0,) * (len(_shards) + len(reports)),
     )
 
 
+def shard_layout(
+    buttons: int, report_id: int, used_ids: Sequence[int] = ()
+) -> List[Tuple[int, int]]:
+    """
+    Work out the extra button reports needed beyond the first ``SHARD_BUTTONS``.
+
+    Shards take the lowest free report IDs above ``report_id``, so ``boot.py`` and
+    ``Joystick`` arrive at the same layout from the same arguments.
+
+    :param buttons: The total number of buttons.
+    :type buttons: int
+    :param report_id: The report ID of the first button report.
+    :type report_id: int
+    :param used_ids: Report IDs already taken by other reports.  (Defaults to none)
+    :type used_ids: Sequence[int], optional
+    :raises ValueError: If there are not enough free report IDs.
+    :return: ``(report_id, length)`` for each extra shard, in button order.
+    :rtype: List[Tuple[int, int]]
+    """
+    shards = list()
+    remaining = buttons - SHARD_BUTTONS
+    next_id = report_id
+    while remaining > 0:
+        next_id += 1
+        while next_id in used_ids:
+            next_id += 1
+        if next_id > 255:
+            raise ValueError("Not enough free report IDs for the button shards.")
+        count = min(remaining, SHARD_BUTTONS)
+        shards.append((next_id, (count // 8) + bool(count % 8)))
+        remaining -= count
+    return shards
+
+
 def _get_device() -> usb_hid.Device:
     """Find a JoystickXL device in the list of active USB HID devices."""
     for device in usb_hid.devices:
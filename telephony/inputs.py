@@ -7,13 +7,15 @@ their raw states to values that are usable by JoystickXL.
 
 # These typing imports help during development in vscode but fail in CircuitPython
 try:
-    from typing import Union
+    from typing import List, Union
 except ImportError:
     pass
 
-# These are all CircuitPython built-ins
+import time
+
+# These are all CircuitPython built-ins.  analogio is imported when an analog source
+# is first created, so button-only devices never load it.
 try:
-    from analogio import AnalogIn  # type: ignore
     from digitalio import DigitalInOut, Direction, Pull  # type: ignore
     from microcontroller import Pin  # type: ignore
 except ImportError:
@@ -34,6 +36,241 @@ class VirtualInput:
         self.value = value
 
 
+class EdgeCounter:
+    """Latch button edges in the background so short presses are kept."""
+
+    def __init__(self, pin, active_low: bool = True, interval_ms: int = 1) -> None:
+        """
+        Provide a background edge-latching source for a button input.
+
+        The pin is scanned by ``keypad`` in the background, which queues every press
+        and release, so the current level is the last queued edge and any complete
+        press/release pulses that happened between two reads are latched in
+        ``.pulses`` rather than lost.  ``countio`` is not used: on the RP2040 it can
+        only count one edge direction, and the pin it claims can no longer be read
+        with ``DigitalInOut`` to recover the level.
+
+        :param pin: CircuitPython pin identifier (i.e. ``board.GP5``).  Any GPIO
+            works.
+        :type pin: Pin
+        :param active_low: Set to ``True`` if the input pin is active low (reads
+            ``False`` when the button is pressed), otherwise set to ``False``.
+            (defaults to ``True``)
+        :type active_low: bool, optional
+        :param interval_ms: Background scan interval.  Pulses shorter than this are
+            treated as contact bounce and may be missed.  (Defaults to ``1``)
+        :type interval_ms: int, optional
+        """
+        # keypad is only needed by edge-latching buttons, and is not on every port.
+        from keypad import Event, Keys  # type: ignore
+
+        self._keys = Keys(
+            (pin,),
+            value_when_pressed=not active_low,
+            pull=True,
+            interval=interval_ms / 1000,
+            max_events=64,
+        )
+        self._event = Event()
+        self._active_low = active_low
+        self._pressed = False
+
+        self.pulses = 0
+        """Complete pulses seen by the scanner but not yet reported."""
+
+    @property
+    def value(self) -> bool:
+        """
+        Get the current pin level, latching any pulses hidden between reads.
+
+        :return: The raw pin level, as ``DigitalInOut.value`` would report it.
+        :rtype: bool
+        """
+        events = self._keys.events
+        if events.overflowed:
+            # edges were lost; start again from the pin's current level
+            events.clear()
+            self._keys.reset()
+            self._pressed = False
+
+        edges = 0
+        while events.get_into(self._event):
+            self._pressed = self._event.pressed
+            edges += 1
+
+        # an even number of extra edges is a full pulse the loop never saw
+        if edges > 1:
+            self.pulses += edges // 2
+
+        return self._pressed != self._active_low
+
+    def deinit(self) -> None:
+        """Release the scanner and its pin."""
+        self._keys.deinit()
+
+
+class TouchPad:
+    """Capacitive touch source with baseline tracking and hysteresis thresholds."""
+
+    def __init__(
+        self,
+        pin,
+        scanner: "TouchScanner",
+        on_delta: int = 400,
+        off_delta: int = 200,
+    ) -> None:
+        """
+        Provide a capacitive touch source for a button input.
+
+        ``.value`` holds the state from the last time the pad was read by its
+        ``TouchScanner``, so reading it is as cheap as a ``VirtualInput``.
+
+        :param pin: CircuitPython pin identifier (i.e. ``board.GP6``), wired to the
+            pad with a 1M pull-down resistor.
+        :type pin: Pin
+        :param scanner: The scanner that reads this pad.
+        :type scanner: TouchScanner
+        :param on_delta: Raw counts above the baseline that register a touch.
+            (Defaults to ``400``)
+        :type on_delta: int, optional
+        :param off_delta: Raw counts above the baseline that a touch has to fall
+            below to be released.  (Defaults to ``200``)
+        :type off_delta: int, optional
+        """
+        # touchio is only needed by touch pads, and is not on every port.
+        from touchio import TouchIn  # type: ignore
+
+        self._touch = TouchIn(pin)
+        self._on = on_delta
+        self._off = off_delta
+        self._baseline = self._touch.raw_value
+
+        self.group = scanner
+        """The scanner that reads this pad."""
+
+        self.value = False
+        """``True`` while the pad is touched."""
+
+    @property
+    def baseline(self) -> int:
+        """
+        Get the tracked untouched raw reading.
+
+        :return: The current baseline in raw ``touchio`` counts.
+        :rtype: int
+        """
+        return self._baseline
+
+    def read(self) -> bool:
+        """
+        Take a fresh raw reading and update the touch state and baseline.
+
+        :return: ``True`` if the pad is touched.
+        :rtype: bool
+        """
+        raw = self._touch.raw_value
+        delta = raw - self._baseline
+
+        if self.value:
+            self.value = delta > self._off
+        else:
+            self.value = delta > self._on
+
+        # drift with temperature and humidity, but never learn a touch as idle
+        if not self.value:
+            if delta < 0:
+                self._baseline = raw
+            else:
+                self._baseline += delta // 16
+
+        return self.value
+
+    def deinit(self) -> None:
+        """Release the touch pin."""
+        self.group.remove(self)
+        self._touch.deinit()
+
+
+class TouchScanner:
+    """Read touch pads round-robin within a per-update time budget."""
+
+    def __init__(self, budget_us: int = 500) -> None:
+        """
+        Read touch pads round-robin within a per-update time budget.
+
+        Each ``touchio`` reading takes far longer than a digital read, so every
+        ``Joystick.update()`` reads as many pads as fit in the budget (always at
+        least one) and carries on from the next pad the following time.
+
+        .. code::
+
+           touch = TouchScanner(budget_us=300)
+           js.add_input(Button(board.GP4), touch.button(board.GP6))
+
+        :param budget_us: Time allowed for touch reads per update, in microseconds.
+            (Defaults to ``500``)
+        :type budget_us: int, optional
+        """
+        self._pads = list()
+        self._next = 0
+
+        self.budget_us = budget_us
+        """Time allowed for touch reads per update, in microseconds."""
+
+    def button(self, pin, bypass: bool = False, **kwargs) -> "Button":
+        """
+        Create a button backed by a new touch pad on this scanner.
+
+        :param pin: CircuitPython pin identifier (i.e. ``board.GP6``).
+        :type pin: Pin
+        :param bypass: Passed through to the ``Button``.  (Defaults to ``False``)
+        :type bypass: bool, optional
+        :param kwargs: ``on_delta`` and ``off_delta`` for the ``TouchPad``.
+        :return: A ``Button`` ready for ``Joystick.add_input``.
+        :rtype: Button
+        """
+        pad = TouchPad(pin, self, **kwargs)
+        self._pads.append(pad)
+        return Button(pad, active_low=False, bypass=bypass)
+
+    def remove(self, pad: TouchPad) -> None:
+        """
+        Stop scanning a touch pad.
+
+        :param pad: The pad to remove.
+        :type pad: TouchPad
+        """
+        if pad in self._pads:
+            self._pads.remove(pad)
+            self._next = 0
+
+    def scan(self) -> int:
+        """
+        Read pads, continuing from where the last scan stopped, until the budget
+        is used up or every pad has been read once.
+
+        :return: The number of pads that were read.
+        :rtype: int
+        """
+        count = len(self._pads)
+        if not count:
+            return 0
+
+        start = time.monotonic_ns()
+        deadline = start + self.budget_us * 1000
+        read = 0
+        while read < count:
+            self._pads[self._next].read()
+            self._next = (self._next + 1) % count
+            read += 1
+
+            # stop if another read of average length would overrun the budget
+            now = time.monotonic_ns()
+            if now + (now - start) // read > deadline:
+                break
+        return read
+
+
 class Axis:
     """Data source storage and scaling/deadband processing for an axis input."""
 
@@ -217,6 +454,8 @@ class Axis:
         if source is None:
             return VirtualInput(value=32768)
         elif isinstance(source, Pin):
+            from analogio import AnalogIn  # type: ignore
+
             return AnalogIn(source)
         elif hasattr(source, "value") and isinstance(source.value, int):
             return source
@@ -271,19 +510,27 @@ class Button:
 
         .. warning::
 
-            Accessing this property also updates the ``.was_pressed`` and
-            ``.was_released`` logic, which means accessing ``.value`` directly anywhere
-            other than in a call to ``Joystick.update_button()`` can make those
-            properties unreliable.  If you need to read the current state of a button
-            anywhere else in your input processing loop, you should be using
-            ``.is_pressed`` or ``.is_released`` rather than ``.value``.
+            Accessing this property samples the button with ``read()``, which also
+            updates the ``.was_pressed`` and ``.was_released`` logic, so accessing
+            ``.value`` on a button added to a ``Joystick`` makes those properties
+            unreliable.  Use ``.pressed`` for the state from the last scan, or a
+            ``Joystick.events`` cursor to follow presses and releases.
 
         :return: ``True`` if pressed, ``False`` if released or bypassed.
         :rtype: bool
         """
-        self._last_state = self._state
-        self._state = self._source.value != self._active_low
+        return self.read()
+
+    @property
+    def pressed(self) -> bool:
+        """
+        Get the processed value from the last ``read()``, without sampling again.
+
+        This is safe to check anywhere, any number of times per loop.
 
+        :return: ``True`` if pressed, ``False`` if released or bypassed.
+        :rtype: bool
+        """
         return self._state and not self.bypass
 
     @property
@@ -375,11 +622,31 @@ class Button:
         """
         return self._active_low
 
+    @property
+    def debounce_ms(self) -> int:
+        """
+        Get the time a new source state must be stable before it is reported.
+
+        *(This property can also be set, i.e. when reloading configuration.)*
+
+        :return: Debounce time in milliseconds, ``0`` if disabled.
+        :rtype: int
+        """
+        return self._debounce_ns // 1000000
+
+    @debounce_ms.setter
+    def debounce_ms(self, value: int) -> None:
+        """Set the debounce time in milliseconds."""
+        self._debounce_ns = value * 1000000
+
     def __init__(
         self,
         source=None,
         active_low: bool = True,
         bypass: bool = False,
+        count_edges: bool = False,
+        debounce_ms: int = 0,
+        scan_period_ms: int = 0,
     ) -> None:
         """
         Provide data source storage and value processing for a button input.
@@ -395,15 +662,89 @@ class Button:
         :param bypass: Set to ``True`` to make the button always appear ``released``
             in USB HID reports back to the host device.  (Defaults to ``False``)
         :type bypass: bool, optional
+        :param count_edges: Set to ``True`` to back a pin source with an
+            ``EdgeCounter`` so presses shorter than one ``Joystick.update()`` are
+            still reported.  Works on any GPIO.  (Defaults to ``False``)
+        :type count_edges: bool, optional
+        :param debounce_ms: How long a new source state must be stable before
+            ``.value`` reports it.  (Defaults to ``0``, which disables debouncing)
+        :type debounce_ms: int, optional
+        :param scan_period_ms: How often ``Joystick.update()`` reads this button.
+            Buttons with a period share the joystick's per-update scan budget, so
+            they never delay the ones read on every update.  (Defaults to ``0``,
+            which reads the button on every update)
+        :type scan_period_ms: int, optional
         """
+        if count_edges and isinstance(source, Pin):
+            source = EdgeCounter(source, active_low)
         self._source = Button._initialize_source(source, active_low)
         self._active_low = active_low
         self._state = False
         self._last_state = False
+        self._raw_state = False
+        self._raw_since = 0
 
         self.bypass = bypass
         """Set to ``True`` to make the button always appear ``released``."""
 
+        self.debounce_ms = debounce_ms
+
+        self.scan_period_ms = scan_period_ms
+        """Time between reads by ``Joystick.update()``, ``0`` for every update.
+        Changes take effect when the button is next added or replaced."""
+
+    def read(self, now: int = 0) -> bool:
+        """
+        Sample the source once, debounce it and update the button state.
+
+        ``Joystick.update()`` calls this exactly once per scan of the button; other
+        code should use ``.pressed`` or ``Joystick.events`` instead.
+
+        :param now: ``time.monotonic_ns()`` for this scan, so one clock read can be
+            shared by every button.  Only used for debouncing.  (Defaults to reading
+            the clock when needed)
+        :type now: int, optional
+        :return: ``True`` if pressed, ``False`` if released or bypassed.
+        :rtype: bool
+        """
+        self._last_state = self._state
+        state = self._source.value != self._active_low
+
+        # only accept a new state once it has been stable for the debounce time
+        if self._debounce_ns:
+            if not now:
+                now = time.monotonic_ns()
+            if state != self._raw_state:
+                self._raw_state = state
+                self._raw_since = now
+            if state != self._state and now - self._raw_since < self._debounce_ns:
+                state = self._state
+
+        self._state = state
+
+        return state and not self.bypass
+
+    def deinit(self) -> None:
+        """Release the source pin, if the source has one, so it can be reused."""
+        if hasattr(self._source, "deinit"):
+            self._source.deinit()
+
+    def take_pulses(self) -> int:
+        """
+        Return and clear the number of pulses latched since the last call.
+
+        Only ``EdgeCounter`` sources can latch pulses; every other source (and any
+        bypassed button) always returns ``0``.
+
+        :return: Complete press/release pulses that were too short to be sampled.
+        :rtype: int
+        """
+        if not isinstance(self._source, EdgeCounter):
+            return 0
+        pulses = self._source.pulses
+        self._source.pulses = 0
+        return 0 if self.bypass else pulses
+
     @staticmethod
     def _initialize_source(source, active_low: bool):
         """
@@ -434,6 +775,152 @@ class Button:
             raise TypeError("Incompatible button source specified.")
 
 
+class LadderTap:
+    """Provide a boolean ``.value`` for one button decoded by a ``ButtonLadder``."""
+
+    def __init__(self, ladder: "ButtonLadder", index: int) -> None:
+        """
+        Provide a boolean ``.value`` for one button decoded by a ``ButtonLadder``.
+
+        :param ladder: The ladder that decodes this button.
+        :type ladder: ButtonLadder
+        :param index: The 0-based position of the button in the ladder's levels.
+        :type index: int
+        """
+        self.group = ladder
+        """The ladder that must be scanned before this button is read."""
+
+        self._index = index
+
+    @property
+    def value(self) -> bool:
+        """
+        Get the button state from the ladder's last settled reading.
+
+        :return: ``True`` if this is the button the ladder decoded as pressed.
+        :rtype: bool
+        """
+        return self.group.pressed == self._index
+
+
+class ButtonLadder:
+    """Decode several buttons wired as a resistor ladder on one analog pin."""
+
+    @property
+    def pressed(self) -> int:
+        """
+        Get the button decoded from the last settled reading.
+
+        :return: The 0-based index of the pressed button, or ``-1`` if idle.
+        :rtype: int
+        """
+        return self._pressed
+
+    def __init__(
+        self,
+        source,
+        levels,
+        idle: int = 65535,
+        settle: int = 2,
+    ) -> None:
+        """
+        Decode several buttons wired as a resistor ladder on one analog pin.
+
+        Thresholds halfway between neighbouring levels are sorted once, so each
+        ``scan()`` is a single ``AnalogIn`` read and a binary search.  A new
+        button is only accepted after ``settle`` consecutive scans agree, which
+        rejects the intermediate voltages seen while a contact is bouncing.
+
+        .. code::
+
+           ladder = ButtonLadder(board.A0, (4096, 21800, 39300))
+           js.add_input(*ladder.buttons())
+
+        :param source: CircuitPython pin identifier (i.e. ``board.A0``) or any object
+            with an int ``.value`` attribute.
+        :type source: Any
+        :param levels: The raw ``0`` to ``65535`` reading expected while each button
+            is pressed, in button order.
+        :type levels: Sequence[int]
+        :param idle: The raw reading expected when no button is pressed.
+            (Defaults to ``65535``, for a ladder pulled up to 3.3V)
+        :type idle: int, optional
+        :param settle: Consecutive matching scans needed to accept a new state.
+            (Defaults to ``2``)
+        :type settle: int, optional
+        """
+        self._source = Axis._initialize_source(source)
+        self._settle = settle
+        self._pressed = -1
+        self._candidate = -1
+        self._count = 0
+        self._num_buttons = len(levels)
+
+        # sort (level, button) pairs and keep the midpoints between neighbours
+        points = sorted([(level, i) for i, level in enumerate(levels)] + [(idle, -1)])
+        self._bounds = [(a[0] + b[0]) // 2 for a, b in zip(points, points[1:])]
+        self._codes = [code for _, code in points]
+
+    def decode(self, raw: int) -> int:
+        """
+        Find the button whose level is closest to a raw reading.
+
+        :param raw: A raw ``0`` to ``65535`` analog reading.
+        :type raw: int
+        :return: The 0-based index of the button, or ``-1`` if idle.
+        :rtype: int
+        """
+        lo = 0
+        hi = len(self._bounds)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if raw < self._bounds[mid]:
+                hi = mid
+            else:
+                lo = mid + 1
+        return self._codes[lo]
+
+    def scan(self) -> int:
+        """
+        Take one analog reading and settle the decoded button.
+
+        This is called once per ``Joystick.update()`` for every ladder that has
+        buttons associated with the joystick.
+
+        :return: The 0-based index of the pressed button, or ``-1`` if idle.
+        :rtype: int
+        """
+        code = self.decode(self._source.value)
+        if code == self._pressed:
+            self._count = 0
+        elif code == self._candidate:
+            self._count += 1
+            if self._count >= self._settle:
+                self._pressed = code
+                self._count = 0
+        else:
+            self._candidate = code
+            self._count = 1
+            if self._settle <= 1:
+                self._pressed = code
+                self._count = 0
+        return self._pressed
+
+    def buttons(self, bypass: bool = False) -> List["Button"]:
+        """
+        Create a ``Button`` for every level on the ladder, in level order.
+
+        :param bypass: Passed through to each ``Button``.  (Defaults to ``False``)
+        :type bypass: bool, optional
+        :return: One ``Button`` per ladder level, ready for ``Joystick.add_input``.
+        :rtype: List[Button]
+        """
+        return [
+            Button(LadderTap(self, i), active_low=False, bypass=bypass)
+            for i in range(self._num_buttons)
+        ]
+
+
 class Hat:
     """Data source storage and value conversion for hat switch inputs."""
 
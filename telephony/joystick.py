@@ -5,17 +5,24 @@ This module provides the necessary functions to create a JoystickXL object,
 retrieve its input counts, associate input objects and update its input states.
 """
 
-import struct
 import time
 
 # These typing imports help during development in vscode but fail in CircuitPython
 try:
-    from typing import Tuple, Union
+    from typing import List, Optional, Sequence, Tuple, Union
 except ImportError:
     pass
 
-from telephony.hid import _get_device
-from telephony.inputs import Button
+from telephony import profiler
+from telephony.events import EventQueue
+from telephony.hid import SHARD_BUTTONS, _get_device, shard_layout
+from telephony.inputs import Button, EdgeCounter
+from telephony.report import Report, ReportQueue
+from telephony.scheduler import ScanScheduler
+from telephony.telemetry import INPUT, LOOP, REPORT
+
+SHARD_BYTES = SHARD_BUTTONS // 8
+"""Bytes of button states carried by each button report."""
 
 
 class Joystick:
@@ -28,6 +35,15 @@ class Joystick:
     _report_size = 0
     """The size (in bytes) of USB HID reports for this joystick."""
 
+    _report_id = None
+    """The button report ID, or ``None`` if the device only has one report ID."""
+
+    _extra_reports = ()
+    """``(report_id, length)`` pairs for additional reports in the descriptor."""
+
+    _shards = ()
+    """``(report_id, length)`` pairs for buttons beyond the first ``SHARD_BUTTONS``."""
+
 
 
     @property
@@ -36,7 +52,12 @@ class Joystick:
         return self._num_buttons
 
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        buttons: Optional[int] = None,
+        report_id: Optional[int] = None,
+        reports: Sequence[Tuple[int, int]] = (),
+    ) -> None:
         """
         Create a JoystickXL object with all inputs in idle states.
 
@@ -46,11 +67,116 @@ class Joystick:
 
            js = Joystick()
 
+        Passing the configuration used in ``boot.py`` skips reading
+        ``boot_out.txt``, so the first report goes out without any file I/O:
+
+        .. code::
+
+           js = Joystick(buttons=2)
+
         .. note:: A JoystickXL ``usb_hid.Device`` object has to be created in
            ``boot.py`` before creating a ``Joystick()`` object in ``code.py``,
            otherwise an exception will be thrown.
+
+        :param buttons: The ``buttons`` passed to ``create_joystick()``.
+            (Defaults to reading the configuration from ``boot_out.txt``)
+        :type buttons: int, optional
+        :param report_id: The ``report_id`` passed to ``create_joystick()``, only
+            needed along with ``reports``.
+        :type report_id: int, optional
+        :param reports: ``(report_id, length)`` for each of the extra ``reports``
+            passed to ``create_joystick()``.  (Defaults to none)
+        :type reports: Sequence[Tuple[int, int]], optional
         """
-        # load configuration from ``boot_out.txt``
+        if buttons is None:
+            Joystick._load_config()
+        else:
+            first = min(buttons, SHARD_BUTTONS)
+            Joystick._num_buttons = buttons
+            Joystick._report_size = (first // 8) + bool(first % 8)
+            if reports or buttons > SHARD_BUTTONS:
+                if report_id is None:
+                    report_id = 0x0B  # the create_joystick() default
+                Joystick._report_id = report_id
+                Joystick._extra_reports = tuple(reports)
+                Joystick._shards = tuple(
+                    shard_layout(buttons, report_id, [r[0] for r in reports])
+                )
+
+        self._device = _get_device()
+        profiler.mark("device")
+
+        # one buffer per report ID: the button report, button shards, then extras
+        self._reports = [Report(self._report_id, self._report_size)]
+        for report_id, length in self._shards:
+            self._reports.append(Report(report_id, length))
+        self._shard_reports = self._reports[:]
+        for report_id, length in self._extra_reports:
+            self._reports.append(Report(report_id, length))
+
+        # set by update_button() for each shard whose button bits changed
+        self._shard_dirty = bytearray(len(self._shard_reports))
+
+        self.queue = ReportQueue(
+            self._device, max_length=max(len(r.buffer) for r in self._reports)
+        )
+        """Outbound report queue, with ``sent``, ``retried``, ``coalesced``,
+        ``refused`` and ``dropped`` counters."""
+
+        self._report = self._reports[0].buffer
+        self._last_report = self._reports[0].last
+
+
+
+        self.button = list()
+        """List of button inputs associated with this joystick through ``add_input``."""
+
+        self._groups = list()
+        """Shared sources (i.e. ``GpioSampler``) that are scanned once per update."""
+
+        self._reported = list()
+        """``reported()`` of each shared source that wants to know when its sample
+        has gone out, called at the end of every update."""
+
+        self.scheduler = ScanScheduler()
+        """Decides which buttons each update reads, by their ``scan_period_ms``."""
+
+        self._counted = list()
+        """(index, button) pairs for buttons backed by an ``EdgeCounter``."""
+
+        self.host_report = None
+        """The last output report received from the host, or ``None``."""
+
+        self.host_reports = 0
+        """Count of output reports received, so consumers can spot new ones."""
+
+        self.host_report_handlers = list()
+        """Callables run as ``handler(report)`` by ``update()`` as soon as a new host
+        output report is latched, before any button is read."""
+
+        self.telemetry = None
+        """Optional ``Telemetry`` stream for input changes, reports and loop times."""
+
+        self.events = EventQueue()
+        """Every button edge scanned by ``update()``; read it with ``.cursor()``."""
+
+        self._telemetry_events = None
+
+        self.recovered_edges = 0
+        """Edges replayed from hardware counters that a level scan would have missed."""
+
+        self._button_states = list()
+        for _ in range((self.num_buttons // 8) + bool(self.num_buttons % 8)):
+            self._button_states.append(0)
+
+        # If the host is not ready yet, the idle report waits in the queue.
+        self.reset_all()
+        profiler.mark("first report" if self.queue.sent else "report queued")
+
+
+    @staticmethod
+    def _load_config() -> None:
+        """Load the configuration ``create_joystick()`` printed to ``boot_out.txt``."""
         try:
             with open("/boot_out.txt", "r") as boot_out:
                 for line in boot_out.readlines():
@@ -60,6 +186,13 @@ class Joystick:
                             raise (ValueError)
                         Joystick._num_buttons = config[0]
                         Joystick._report_size = config[1]
+                        if len(config) > 2:
+                            # shard pairs come first, one per extra 128 buttons
+                            shards = len(shard_layout(config[0], config[2]))
+                            pairs = list(zip(config[3::2], config[4::2]))
+                            Joystick._report_id = config[2]
+                            Joystick._shards = tuple(pairs[:shards])
+                            Joystick._extra_reports = tuple(pairs[shards:])
                         break
             if Joystick._report_size == 0:
                 raise (ValueError)
@@ -68,27 +201,25 @@ class Joystick:
         finally:
             pass
 
-        self._device = _get_device()
-        self._report = bytearray(self._report_size)
-        self._last_report = bytearray(self._report_size)
-        self._format = "<"
-
-
-
-        self.button = list()
-        """List of button inputs associated with this joystick through ``add_input``."""
+    def report(self, report_id: int) -> Report:
+        """
+        Get the buffer for one of the additional reports declared in ``boot.py``.
 
-        self._button_states = list()
-        for _ in range((self.num_buttons // 8) + bool(self.num_buttons % 8)):
-            self._button_states.append(0)
-            self._format += "B"
+        .. code::
 
-        try:
-            self.reset_all()
-        except OSError:
-            time.sleep(1)
-            self.reset_all()
+           status = js.report(0x03)
+           status.write(0, b"\x01")  # sent on the next ``update()``
 
+        :param report_id: The USB HID report ID passed to ``create_joystick``.
+        :type report_id: int
+        :raises ValueError: If the report ID is not part of the device descriptor.
+        :return: The ``Report`` object for the requested report ID.
+        :rtype: Report
+        """
+        for r in self._reports:
+            if r.report_id == report_id:
+                return r
+        raise ValueError("Specified report ID is not configured.")
 
     @staticmethod
     def _validate_button_number(button: int) -> bool:
@@ -134,6 +265,47 @@ class Joystick:
                     raise OverflowError("List is full, cannot add another button.")
             else:
                 raise TypeError("Input must be a Button, Axis or Hat object.")
+        self._register_sources()
+
+    def replace_input(self, index: int, input: Button) -> Button:
+        """
+        Swap one associated button for another without touching any other input.
+
+        The replaced button keeps its place in the report, so this can be used to
+        re-map an input at runtime without re-enumerating the USB device.
+
+        :param index: The 0-based index of the button in ``Joystick.button``.
+        :type index: int
+        :param input: The new ``Button`` object.
+        :type input: Button
+        :raises TypeError: If an object that is not a ``Button`` is passed in.
+        :raises IndexError: If no button has been added at ``index``.
+        :return: The button that was replaced, so its pin can be released.
+        :rtype: Button
+        """
+        if not isinstance(input, Button):
+            raise TypeError("Input must be a Button, Axis or Hat object.")
+        old = self.button[index]
+        self.button[index] = input
+        self._register_sources()
+        return old
+
+    def _register_sources(self) -> None:
+        """Collect the edge-counting buttons and shared sources that need scanning."""
+        self._counted = list()
+        self._groups = list()
+        self._reported = list()
+        self.scheduler.assign(self.button)
+        for n, b in enumerate(self.button):
+            if isinstance(b._source, EdgeCounter):
+                self._counted.append((n, b))
+            group = getattr(b._source, "group", None)
+            if group is not None and group not in self._groups:
+                self._groups.append(group)
+                # groups that time their samples are told when the report is out
+                reported = getattr(group, "reported", None)
+                if reported is not None:
+                    self._reported.append(reported)
 
     def update(self, always: bool = False, halt_on_error: bool = False) -> None:
         """
@@ -143,44 +315,151 @@ class Joystick:
             report that was sent out.  Defaults to ``False``.
         :type always: bool, optional
         :param halt_on_error: When ``True``, an exception will be raised and the program
-            will halt if an ``OSError`` occurs when the report is sent.  When ``False``,
-            the report will simply be dropped and no exception will be raised.  Defaults
-            to ``False``.
+            will halt if the report cannot be sent immediately.  When ``False``, the
+            report is held in ``Joystick.queue`` and retried on later updates.
+            Defaults to ``False``.
         :type halt_on_error: bool, optional
         """
+        if self.telemetry is not None:
+            started = time.monotonic_ns()
+            if self._telemetry_events is None:
+                self._telemetry_events = self.events.cursor()
+
+        # Retry anything the host could not accept earlier.
+        self.queue.flush()
+
+        # Latch any new output report (i.e. LED states) from the host.
+        host_report = self._device.get_last_received_report(self._report_id)
+        if host_report is not None:
+            self.host_report = host_report
+            self.host_reports += 1
+            for handler in self.host_report_handlers:
+                handler(host_report)
+
         # Update axis values but defer USB HID report generation.
     
-        # Update button states but defer USB HID report generation.
+        # Latch shared sources once, so their buttons read from a single sample.
+        for group in self._groups:
+            group.scan()
+
+        # Update button states but defer USB HID report generation.  Buttons with a
+        # scan period are only read when due, within the scheduler's budget.
+        button_values = ()
         if len(self.button):
-            button_values = [(i, b.value) for i, b in enumerate(self.button)]
+            button_values = self.scheduler.read()
+            if self._counted:
+                self._replay_pulses(halt_on_error)
+            self._latch_events(button_values)
             self.update_button(*button_values, defer=True, skip_validation=True)
 
         # Update hat switch values, but defer USB HID report generation.
       
-        # Generate a USB HID report.
-        report_data = list()
+        self._send(always, halt_on_error)
+        for reported in self._reported:
+            reported()
 
-      
-       
-        report_data.extend(self._button_states)
-
-        struct.pack_into(self._format, self._report, 0, *report_data)
-
-        # Send the USB HID report if required.
-        if always or self._last_report != self._report:
-            try:
-                self._device.send_report(self._report)
-                self._last_report[:] = self._report
-            except OSError:
-                # This can occur if the USB is busy, or the host never properly
-                # connected to the USB device.  We just drop the update and try later.
-                if halt_on_error:
-                    raise
+        if self.telemetry is not None:
+            self._record_changes()
+            elapsed = (time.monotonic_ns() - started) // 1000
+            self.telemetry.record(LOOP, 0, elapsed)
+            self.telemetry.flush()
+
+    def _send(self, always: bool = False, halt_on_error: bool = False) -> None:
+        """
+        Pack the current button states and send any USB HID reports that changed.
+
+        :param always: When ``True``, send every report even if it is identical to the
+            last one that was sent out.  Defaults to ``False``.
+        :type always: bool, optional
+        :param halt_on_error: When ``True``, raise an ``OSError`` if the report could
+            not be sent immediately.  Defaults to ``False``.
+        :type halt_on_error: bool, optional
+        :raises OSError: If ``halt_on_error`` is ``True`` and the report was queued.
+        """
+        # Copy button states into the shards they changed in, so an update only
+        # compares and sends the reports that were touched.
+        states = self._button_states
+        for k, report in enumerate(self._shard_reports):
+            if self._shard_dirty[k]:
+                self._shard_dirty[k] = 0
+                buffer = report.buffer
+                base = k * SHARD_BYTES
+                for j in range(len(buffer)):
+                    buffer[j] = states[base + j]
+                report.dirty = True
+
+        # Send only the USB HID reports whose contents changed.
+        for r in self._reports:
+            if always or r.changed:
+                # The USB can be busy, or the host may not have finished connecting
+                # to the device yet, in which case the queue holds it for a retry.
+                try:
+                    delivered = self.queue.send(r.buffer, r.report_id)
+                except OSError:
+                    # the queue is full; keep the report dirty and offer it
+                    # again on the next update
+                    delivered = False
+                else:
+                    r.mark_sent()
+                if self.telemetry is not None:
+                    self.telemetry.record(REPORT, r.report_id or 0, delivered)
+                if not delivered and halt_on_error:
+                    raise OSError("USB HID report could not be sent.")
+            else:
+                r.dirty = False
+
+    def _latch_events(self, button_values: List[Tuple[int, bool]]) -> None:
+        """Add an event for every button edge found by this scan."""
+        now = 0
+        for i, _ in button_values:
+            b = self.button[i]
+            if b._state != b._last_state:
+                if not now:
+                    now = time.monotonic_ns() // 1000
+                self.events.push(i, b._state, now)
+
+    def _record_changes(self) -> None:
+        """Add a telemetry record for every button edge since the last update."""
+        edges = self._telemetry_events
+        while edges.next():
+            self.telemetry.record(INPUT, edges.index, edges.pressed)
+
+    def _replay_pulses(self, halt_on_error: bool) -> None:
+        """
+        Report pulses latched by edge-counting buttons since the previous scan.
+
+        Each pulse is sent as a pair of reports that flip the button away from its
+        last reported state and back again, before the newly sampled states are
+        applied.  Buttons with several pulses pending are replayed in rounds.
+
+        :param halt_on_error: Passed through to ``_send()``.
+        :type halt_on_error: bool
+        """
+        pending = [(i, b.take_pulses()) for i, b in self._counted]
+        rounds = max(n for _, n in pending)
+        now = time.monotonic_ns() // 1000 if rounds else 0
+        for r in range(rounds):
+            flipped = [
+                (i, not (self._button_states[i // 8] >> (i % 8)) & 1)
+                for i, n in pending
+                if n > r
+            ]
+            self.update_button(*flipped, defer=True, skip_validation=True)
+            self._send(halt_on_error=halt_on_error)
+            restored = [(i, not v) for i, v in flipped]
+            self.update_button(*restored, defer=True, skip_validation=True)
+            self._send(halt_on_error=halt_on_error)
+            for i, v in flipped:
+                self.events.push(i, v, now)
+                self.events.push(i, not v, now)
+            self.recovered_edges += 2 * len(flipped)
 
     def reset_all(self) -> None:
         """Reset all inputs to their idle states."""
         for i in range(len(self._button_states)):
             self._button_states[i] = 0
+        for k in range(len(self._shard_dirty)):
+            self._shard_dirty[k] = 1
         self.update(always=True)
 
 
@@ -223,10 +502,14 @@ class Joystick:
             if skip_validation or self._validate_button_number(b):
                 _bank = b // 8
                 _bit = b % 8
+                _old = self._button_states[_bank]
                 if value:
-                    self._button_states[_bank] |= 1 << _bit
+                    _new = _old | (1 << _bit)
                 else:
-                    self._button_states[_bank] &= ~(1 << _bit)
+                    _new = _old & ~(1 << _bit)
+                if _new != _old:
+                    self._button_states[_bank] = _new
+                    self._shard_dirty[_bank // SHARD_BYTES] = 1
         if not defer:
             self.update()
   
\ No newline at end of file
@@ -0,0 +1,183 @@
+"""
+Two-way mute state reconciliation between the device button and the host.
+
+This module provides a ``MuteControl`` that turns presses of a physical button into
+Phone Mute reports, follows the host's Mute LED output report (so mute changes made
+in the call app's UI are picked up), and holds back the reports that would otherwise
+make the device and the host toggle each other back and forth.
+"""
+
+import time
+
+from telephony.hid import LED_MUTE
+from telephony.inputs import Button, VirtualInput
+
+
+class _MuteOutput(VirtualInput):
+    """Virtual source of ``MuteControl.output`` that owns the physical button."""
+
+    def __init__(self, source: Button) -> None:
+        """
+        Start released, holding on to the physical button.
+
+        :param source: The physical mute button read by ``MuteControl``.
+        :type source: Button
+        """
+        super().__init__(False)
+        self._physical = source
+
+    def deinit(self) -> None:
+        """Release the physical button's pin along with the output."""
+        self._physical.deinit()
+
+
+class MuteControl:
+    """Reconcile a physical mute button with the host's Mute LED state."""
+
+    TOGGLE = 0
+    """The host toggles mute on each Phone Mute press (i.e. Google Meet)."""
+
+    ON_OFF = 1
+    """The host follows the absolute Phone Mute state in each report."""
+
+    @property
+    def pending(self) -> bool:
+        """
+        Determine if a mute change has been sent but not yet confirmed by the host.
+
+        :return: ``True`` while waiting for the host's Mute LED to follow.
+        :rtype: bool
+        """
+        return self._pending is not None
+
+    def __init__(
+        self,
+        joystick,
+        source: Button,
+        mode: int = TOGGLE,
+        timeout_ms: int = 500,
+    ) -> None:
+        """
+        Reconcile a physical mute button with the host's Mute LED state.
+
+        Add ``output`` to the joystick in place of the physical button, and call
+        ``update()`` once per loop, before ``Joystick.update()``.  The host's Mute LED
+        is followed from inside ``Joystick.update()`` through
+        ``Joystick.host_report_handlers``, so a change made in the call app reaches
+        the report sent by that same update.
+
+        .. code::
+
+           mute = MuteControl(js, Button(board.GP4))
+           js.add_input(mute.output, Button(board.GP5))
+
+           while True:
+               mute.update()
+               js.update()
+
+        :param joystick: The joystick that receives the host's output reports.  It
+            must be created with ``create_joystick(leds=True)`` in ``boot.py``.
+        :type joystick: Joystick
+        :param source: The physical mute button.  It is read here, so it must not
+            also be added to the joystick.
+        :type source: Button
+        :param mode: ``MuteControl.TOGGLE`` or ``MuteControl.ON_OFF``, to match how
+            the host treats Phone Mute.  (Defaults to ``TOGGLE``)
+        :type mode: int, optional
+        :param timeout_ms: How long to wait for the host to confirm a change before
+            trusting its Mute LED again.  (Defaults to ``500``)
+        :type timeout_ms: int, optional
+        """
+        self._joystick = joystick
+        self._source = source
+        self._mode = mode
+        self._timeout = timeout_ms * 1000000
+        self._pending = None
+        self._deadline = 0
+        self._pulse = False
+
+        self.output = Button(_MuteOutput(source), active_low=False)
+        """Virtual button that drives the Phone Mute bit in the joystick's report.
+        Its ``deinit()`` also releases the physical button."""
+
+        self.muted = False
+        """The mute state last confirmed by the host."""
+
+        self.wanted = False
+        """The mute state the user asked for with the button."""
+
+        self.suppressed = 0
+        """Count of host reports and presses that were held back to avoid flapping."""
+
+        # keep one bound method, so deinit() can find it in the handler list
+        self._handler = self._host_report
+        joystick.host_report_handlers.append(self._handler)
+
+    def update(self) -> None:
+        """Read the button and set the Phone Mute output."""
+        now = time.monotonic_ns()
+
+        # end a one-update Phone Mute pulse from the previous call
+        if self._pulse:
+            self._pulse = False
+            self.output.source_value = False
+
+        if self._pending is not None and now >= self._deadline:
+            # the host never followed, so its LED is the truth again
+            self._pending = None
+            self.wanted = self.muted
+            if self._mode == MuteControl.ON_OFF:
+                self.output.source_value = self.muted
+
+        # .value is read exactly once per update, which keeps .was_pressed reliable
+        self._source.value
+        if self._source.was_pressed:
+            self.wanted = not self.wanted
+            if self._pending is None:
+                self._request(now)
+            else:
+                # a change is already in flight; send the rest once it lands
+                self.suppressed += 1
+
+    def deinit(self) -> None:
+        """Stop following the host and release the physical button."""
+        if self._handler in self._joystick.host_report_handlers:
+            self._joystick.host_report_handlers.remove(self._handler)
+        self.output.deinit()
+
+    def _host_report(self, report) -> None:
+        """Handle a new host output report, called from ``Joystick.update()``."""
+        self._host_led((report[0] >> LED_MUTE) & 1 == 1)
+
+    def _host_led(self, led: bool) -> None:
+        """Handle a Mute LED state reported by the host."""
+        if self._pending is not None:
+            if led != self._pending:
+                # stale report from before the host saw our change
+                self.suppressed += 1
+                return
+            self._pending = None
+            self.muted = led
+            if self.wanted != led:
+                self._request(time.monotonic_ns())
+            return
+
+        # the host changed mute on its own (i.e. from the call app's UI)
+        self.muted = led
+        self.wanted = led
+        if self._mode == MuteControl.ON_OFF:
+            # follow the host, so the next press asks for the opposite state; the
+            # host is already in this state, so the report this causes is a no-op
+            self.output.source_value = led
+
+    def _request(self, now: int) -> None:
+        """Ask the host to move to ``wanted`` and wait for it to confirm."""
+        if self.wanted == self.muted:
+            return
+        self._pending = self.wanted
+        self._deadline = now + self._timeout
+        if self._mode == MuteControl.ON_OFF:
+            self.output.source_value = self.wanted
+        else:
+            self.output.source_value = True
+            self._pulse = True
@@ -0,0 +1,263 @@
+"""
+Wear-levelled persistent state in ``microcontroller.nvm``.
+
+This module provides a ``Store`` that keeps a small set of integer settings (i.e.
+mute mode, axis calibration, per-input debounce times) across resets.  Every save
+appends a complete, versioned and checksummed snapshot to the next slot of a
+circular log, so writes are spread over the whole region and a save interrupted by a
+reset leaves the previous snapshot intact.  Changes are coalesced in RAM and only
+written after they have settled, because NVM writes stall the input loop.
+
+.. code::
+
+   MUTE_MODE = 0  # keys are chosen by the application
+
+   store = Store()
+   mute = MuteControl(js, Button(board.GP4), mode=store.get(MUTE_MODE, 0))
+
+   while True:
+       js.update()
+       store.update()
+
+.. note::
+
+   On the RP2040, every write to ``microcontroller.nvm`` erases and reprograms the
+   whole 4 KB flash sector behind it, so the log mainly protects against torn writes
+   there; the rate limiting is what saves flash wear.  Ports with EEPROM-backed NVM
+   also get the wear levelling.
+"""
+
+import struct
+import time
+
+# These typing imports help during development in vscode but fail in CircuitPython
+try:
+    from typing import Dict
+except ImportError:
+    pass
+
+import microcontroller  # type: ignore (this is a CircuitPython built-in)
+
+from telephony.supervisor import SUMMARY_SIZE
+
+HEADER_FORMAT = "<2sBBH"
+"""Slot header layout: magic, version, entry count, sequence number."""
+
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+"""Size of a slot header in bytes."""
+
+ENTRY_FORMAT = "<Bi"
+"""Entry layout: key, signed 32-bit value."""
+
+ENTRY_SIZE = struct.calcsize(ENTRY_FORMAT)
+"""Size of one stored value in bytes."""
+
+_MAGIC = b"TS"
+
+
+class Store:
+    """Integer settings kept in a wear-levelled log in ``microcontroller.nvm``."""
+
+    @property
+    def dirty(self) -> bool:
+        """
+        Determine if there are changes waiting to be written.
+
+        :return: ``True`` if ``update()`` or ``flush()`` still has to save.
+        :rtype: bool
+        """
+        return self._dirty_since is not None
+
+    def __init__(
+        self,
+        version: int = 1,
+        slot_size: int = 64,
+        settle_ms: int = 2000,
+        min_interval_ms: int = 30000,
+        reserved: int = SUMMARY_SIZE,
+    ) -> None:
+        """
+        Load the newest snapshot from ``microcontroller.nvm``.
+
+        :param version: Layout version of the stored values.  Snapshots saved with
+            another version are ignored, so changing the meaning of a key should
+            come with a new version.  (Defaults to ``1``)
+        :type version: int, optional
+        :param slot_size: Bytes per snapshot.  Each key takes 5 bytes after a
+            6 byte header and 2 byte checksum.  (Defaults to ``64``, 11 keys)
+        :type slot_size: int, optional
+        :param settle_ms: How long values must stop changing before they are
+            written.  (Defaults to ``2000``)
+        :type settle_ms: int, optional
+        :param min_interval_ms: Minimum time between writes.
+            (Defaults to ``30000``)
+        :type min_interval_ms: int, optional
+        :param reserved: Bytes at the end of NVM to leave alone.  (Defaults to
+            ``SUMMARY_SIZE``, the loop supervisor's overrun summary)
+        :type reserved: int, optional
+        :raises ValueError: If NVM is missing or too small for two slots.
+        """
+        nvm = microcontroller.nvm
+        if nvm is None:
+            raise ValueError("This board has no microcontroller.nvm.")
+        self._nvm = nvm
+        self._version = version
+        self._slot_size = slot_size
+        self._slots = (len(nvm) - reserved) // slot_size
+        if self._slots < 2:
+            raise ValueError("NVM is too small for two %d byte slots." % slot_size)
+        self._capacity = (slot_size - HEADER_SIZE - 2) // ENTRY_SIZE
+        self._settle = settle_ms * 1000000
+        self._interval = min_interval_ms * 1000000
+        self._buffer = bytearray(slot_size)
+        self._values = dict()  # key -> value
+        self._saved = dict()
+        self._dirty_since = None
+        self._changed_at = 0
+        self._written_at = -self._interval
+        self._sequence = 0
+        self._next_slot = 0
+
+        self.writes = 0
+        """Snapshots written since start-up."""
+
+        self._load()
+
+    def get(self, key: int, default: int = 0) -> int:
+        """
+        Get a stored value.
+
+        :param key: The setting's key, ``0`` to ``255``.
+        :type key: int
+        :param default: Returned if the key was never stored.  (Defaults to ``0``)
+        :type default: int, optional
+        :return: The current value, including changes not yet written.
+        :rtype: int
+        """
+        return self._values.get(key, default)
+
+    def set(self, key: int, value: int) -> None:
+        """
+        Change a value.  It is written by a later ``update()`` or ``flush()``.
+
+        :param key: The setting's key, ``0`` to ``255``.
+        :type key: int
+        :param value: The new value, a signed 32-bit integer.
+        :type value: int
+        :raises ValueError: If a new key would not fit in a slot.
+        """
+        if self._values.get(key) == value:
+            return
+        if key not in self._values and len(self._values) >= self._capacity:
+            message = "No room for another key in a %d byte slot."
+            raise ValueError(message % self._slot_size)
+        self._values[key] = value
+        now = time.monotonic_ns()
+        self._changed_at = now
+        if self._dirty_since is None:
+            self._dirty_since = now
+
+    def values(self) -> Dict[int, int]:
+        """
+        Get every stored value.
+
+        :return: A copy of the current ``{key: value}`` settings.
+        :rtype: Dict[int, int]
+        """
+        return dict(self._values)
+
+    def update(self) -> bool:
+        """
+        Write pending changes once they have settled and the write interval passed.
+
+        Cheap enough to call on every pass through the input loop.
+
+        :return: ``True`` if a snapshot was written.
+        :rtype: bool
+        """
+        if self._dirty_since is None:
+            return False
+        now = time.monotonic_ns()
+        if now - self._changed_at < self._settle:
+            return False
+        if now - self._written_at < self._interval:
+            return False
+        return self.flush()
+
+    def flush(self) -> bool:
+        """
+        Write pending changes now.
+
+        :return: ``True`` if a snapshot was written, ``False`` if nothing changed.
+        :rtype: bool
+        """
+        self._dirty_since = None
+        if self._values == self._saved:
+            return False
+
+        buffer = self._buffer
+        self._sequence = (self._sequence + 1) & 0xFFFF
+        struct.pack_into(
+            HEADER_FORMAT, buffer, 0, _MAGIC, self._version, len(self._values),
+            self._sequence,
+        )
+        offset = HEADER_SIZE
+        for key, value in self._values.items():
+            struct.pack_into(ENTRY_FORMAT, buffer, offset, key, value)
+            offset += ENTRY_SIZE
+        struct.pack_into("<H", buffer, offset, _checksum(buffer, offset))
+
+        start = self._next_slot * self._slot_size
+        self._nvm[start : start + offset + 2] = buffer[: offset + 2]
+        self._next_slot = (self._next_slot + 1) % self._slots
+
+        self._saved = dict(self._values)
+        self._written_at = time.monotonic_ns()
+        self.writes += 1
+        return True
+
+    def _load(self) -> None:
+        """Find the newest valid snapshot in one pass over the log."""
+        data = self._nvm[0 : self._slots * self._slot_size]
+        candidates = list()  # (sequence, slot) with a plausible header
+        for slot in range(self._slots):
+            start = slot * self._slot_size
+            magic, version, count, sequence = struct.unpack_from(
+                HEADER_FORMAT, data, start
+            )
+            if magic == _MAGIC and version == self._version:
+                if count <= self._capacity:
+                    candidates.append((sequence, slot))
+
+        # only checksum the newest candidate, falling back if it was torn
+        while candidates:
+            newest = candidates[0]
+            for candidate in candidates:
+                # sequence numbers wrap, so compare them modulo 2**16
+                if (candidate[0] - newest[0]) & 0xFFFF < 0x8000:
+                    newest = candidate
+            sequence, slot = newest
+            start = slot * self._slot_size
+            count = data[start + 3]
+            end = start + HEADER_SIZE + count * ENTRY_SIZE
+            if struct.unpack_from("<H", data, end)[0] == _checksum(data, end, start):
+                break
+            candidates.remove(newest)
+        else:
+            return
+
+        self._sequence = sequence
+        self._next_slot = (slot + 1) % self._slots
+        for offset in range(start + HEADER_SIZE, end, ENTRY_SIZE):
+            key, value = struct.unpack_from(ENTRY_FORMAT, data, offset)
+            self._values[key] = value
+        self._saved = dict(self._values)
+
+
+def _checksum(data, end: int, start: int = 0) -> int:
+    """Fletcher-style checksum of ``data[start:end]``, with sums modulo 256."""
+    a = b = 0
+    for i in range(start, end):
+        a = (a + data[i]) & 0xFF
+        b = (b + a) & 0xFF
+    return (b << 8) | a
@@ -0,0 +1,406 @@
+"""
+USB host passthrough from a downstream HID device to telephony buttons.
+
+This module lets an existing HID foot pedal or headset, plugged into the board's USB
+host port, drive the Phone Mute and Hook Switch bits of the telephony report.
+The downstream report descriptor is parsed once with ``telephony.descriptor`` and
+compiled into one 256-entry lookup table per report byte that carries a mapped
+usage, so translating a report is a single table lookup per byte.
+
+.. code::
+
+   import usb_host
+
+   usb_host.Port(board.USB_HOST_DP, board.USB_HOST_DM)
+   pedal = Passthrough(HostDevice())
+   # add them in bit order, so each lands on its own usage in the report
+   js.add_input(
+       Button(pedal.input(PHONE_MUTE), active_low=False),
+       Button(pedal.input(HOOK_SWITCH), active_low=False),
+   )
+
+``RecordedDevice`` replays a captured descriptor and reports through the same code
+path, so mappings and latency can be checked without the hardware.
+"""
+
+import time
+
+# These typing imports help during development in vscode but fail in CircuitPython
+try:
+    from typing import Dict, List, Optional, Sequence, Tuple
+except ImportError:
+    pass
+
+from telephony.descriptor import (
+    INPUT,
+    TELEPHONY_REPORT_DESCRIPTOR,
+    parse_descriptor,
+    report_lengths,
+)
+
+
+def telephony_bit(usage: int, descriptor: bytes = TELEPHONY_REPORT_DESCRIPTOR) -> int:
+    """
+    Find the input report bit of a Telephony Devices usage.
+
+    :param usage: The usage ID, i.e. ``0x2F`` for Phone Mute.
+    :type usage: int
+    :param descriptor: The descriptor of the device the bits are sent from.
+        (Defaults to ``TELEPHONY_REPORT_DESCRIPTOR``, the layout of every device
+        this package builds)
+    :type descriptor: bytes, optional
+    :raises ValueError: If the descriptor has no input with that usage.
+    :return: The bit offset, which is also the ``Joystick.button`` index.
+    :rtype: int
+    """
+    for f in parse_descriptor(descriptor):
+        if f.kind != INPUT or f.constant or f.usage_page != 0x0B:
+            continue
+        for n in range(f.count):
+            if f.usage(n) == usage:
+                return f.offset + n * f.size
+    raise ValueError("Telephony usage 0x%02X is not in the descriptor." % usage)
+
+
+PHONE_MUTE = telephony_bit(0x2F)
+"""Bit of the Phone Mute usage in the telephony input report."""
+
+HOOK_SWITCH = telephony_bit(0x20)
+"""Bit of the Hook Switch usage in the telephony input report."""
+
+DEFAULT_MAPPING = {
+    (0x0B, 0x20): HOOK_SWITCH,  # Telephony: Hook Switch
+    (0x0B, 0x2F): PHONE_MUTE,  # Telephony: Phone Mute
+    (0x0B, 0x21): PHONE_MUTE,  # Telephony: Flash, used as mute by some headsets
+    (0x09, 0x01): PHONE_MUTE,  # Button 1, i.e. a foot pedal's main switch
+    (0x09, 0x02): HOOK_SWITCH,  # Button 2
+    (0x0C, 0xE2): PHONE_MUTE,  # Consumer: Mute
+}
+"""``(usage_page, usage)`` to telephony bit, for common pedals and headsets."""
+
+
+class RecordedDevice:
+    """Stand-in for a downstream HID device that replays captured reports."""
+
+    def __init__(self, descriptor: bytes, reports: Sequence[bytes] = ()) -> None:
+        """
+        Replay a recorded report descriptor and input reports.
+
+        :param descriptor: The downstream device's raw report descriptor.
+        :type descriptor: bytes
+        :param reports: Input reports to return, one per ``read()``, including the
+            report ID byte if the descriptor uses report IDs.  (Defaults to none)
+        :type reports: Sequence[bytes], optional
+        """
+        self.descriptor = descriptor
+        """The downstream report descriptor."""
+
+        self.reports = list(reports)
+        """Reports still to be returned by ``read()``; append to feed more."""
+
+    def read(self, buffer: bytearray) -> int:
+        """
+        Copy the next recorded report into ``buffer``.
+
+        :param buffer: Where to put the report.
+        :type buffer: bytearray
+        :return: The report length, ``0`` if no report is waiting.
+        :rtype: int
+        """
+        if not self.reports:
+            return 0
+        report = self.reports.pop(0)
+        buffer[: len(report)] = report
+        return len(report)
+
+
+class HostDevice:
+    """The first HID interface found on a device attached to the USB host port."""
+
+    def __init__(
+        self,
+        vid: Optional[int] = None,
+        pid: Optional[int] = None,
+        timeout_ms: int = 1,
+    ) -> None:
+        """
+        Find a downstream HID device, claim it and read its report descriptor.
+
+        :param vid: Only use a device with this USB vendor ID.  (Defaults to any)
+        :type vid: int, optional
+        :param pid: Only use a device with this USB product ID.  (Defaults to any)
+        :type pid: int, optional
+        :param timeout_ms: How long each ``read()`` waits for a report.  This time
+            is spent inside ``Joystick.update()`` whenever the device is idle.  It
+            must not be ``0``, which makes ``usb.core`` wait forever.
+            (Defaults to ``1``)
+        :type timeout_ms: int, optional
+        :raises ValueError: If ``timeout_ms`` is ``0``, or no HID device is
+            attached.
+        """
+        import usb.core  # type: ignore (this is a CircuitPython built-in)
+        import adafruit_usb_host_descriptors as descriptors
+
+        if timeout_ms < 1:
+            raise ValueError("timeout_ms must be at least 1; 0 waits forever.")
+        self._timeout_error = usb.core.USBTimeoutError
+        self._timeout = timeout_ms
+
+        for device in usb.core.find(find_all=True):
+            if vid is not None and device.idVendor != vid:
+                continue
+            if pid is not None and device.idProduct != pid:
+                continue
+            found = _find_hid(descriptors.get_configuration_descriptor(device, 0))
+            if found is not None:
+                break
+        else:
+            raise ValueError("No USB HID device found on the host port.")
+
+        interface, endpoint, length = found
+        device.set_configuration()
+        if device.is_kernel_driver_active(interface):
+            device.detach_kernel_driver(interface)
+
+        # GET_DESCRIPTOR (Report) from the interface
+        descriptor = bytearray(length)
+        device.ctrl_transfer(0x81, 0x06, 0x2200, interface, descriptor)
+
+        self._device = device
+        self._endpoint = endpoint
+
+        self.descriptor = bytes(descriptor)
+        """The downstream report descriptor."""
+
+    def read(self, buffer: bytearray) -> int:
+        """
+        Read one input report from the interrupt endpoint.
+
+        :param buffer: Where to put the report.
+        :type buffer: bytearray
+        :return: The report length, ``0`` if none arrived within the timeout.
+        :rtype: int
+        """
+        try:
+            return self._device.read(self._endpoint, buffer, timeout=self._timeout)
+        except self._timeout_error:
+            return 0
+
+
+class PassthroughInput:
+    """One telephony bit of a ``Passthrough``, as a ``Button`` source."""
+
+    def __init__(self, passthrough: "Passthrough", bit: int) -> None:
+        """
+        Provide one telephony bit of a ``Passthrough`` as a ``Button`` source.
+
+        :param passthrough: The passthrough that translates the reports.
+        :type passthrough: Passthrough
+        :param bit: ``PHONE_MUTE``, ``HOOK_SWITCH`` or another mapped bit.
+        :type bit: int
+        """
+        self._mask = 1 << bit
+
+        self.group = passthrough
+        """Read once per update by ``Joystick.update()`` before this source."""
+
+    @property
+    def value(self) -> bool:
+        """
+        Get the bit from the last translated report.
+
+        :return: ``True`` while any usage mapped to the bit is active.
+        :rtype: bool
+        """
+        return bool(self.group.bits & self._mask)
+
+
+class Passthrough:
+    """Translate a downstream HID device's reports into telephony bits."""
+
+    def __init__(
+        self,
+        device,
+        mapping: Optional[Dict[Tuple[int, int], int]] = None,
+        buffer_size: int = 64,
+    ) -> None:
+        """
+        Compile a downstream device's descriptor into per-byte lookup tables.
+
+        :param device: A ``HostDevice`` or ``RecordedDevice``.
+        :type device: HostDevice or RecordedDevice
+        :param mapping: ``(usage_page, usage)`` to telephony bit.
+            (Defaults to ``DEFAULT_MAPPING``)
+        :type mapping: Dict[Tuple[int, int], int], optional
+        :param buffer_size: Largest report expected.  (Defaults to ``64``)
+        :type buffer_size: int, optional
+        :raises ValueError: If no usage in the descriptor is mapped.
+        """
+        self._device = device
+        self._buffer = bytearray(buffer_size)
+        fields = parse_descriptor(device.descriptor)
+        self._uses_ids = 0 not in report_lengths(fields)
+        self._tables = compile_tables(fields, mapping or DEFAULT_MAPPING)
+        if not self._tables:
+            raise ValueError("No usage of the HID device is mapped.")
+        self._by_id = dict()  # report ID -> bits from its last report
+
+        self.bits = 0
+        """Telephony bits from the latest reports, one bit per mapped input."""
+
+        self.reports = 0
+        """Downstream reports translated since start-up."""
+
+        self.received_ns = 0
+        """``time.monotonic_ns()`` when the last report was read."""
+
+        self.latency_us = [0, 0, 0]  # count, total, max
+        """Time from a downstream report being read to the end of the
+        ``Joystick.update()`` that sent its bits upstream, as ``[count, total,
+        max]`` in microseconds."""
+
+        self._received = 0  # read time of a report not yet sent upstream
+
+    def input(self, bit: int) -> PassthroughInput:
+        """
+        Get a ``Button`` source for one telephony bit.
+
+        :param bit: ``PHONE_MUTE``, ``HOOK_SWITCH`` or another mapped bit.
+        :type bit: int
+        :return: A source whose ``.value`` follows the bit (active high).
+        :rtype: PassthroughInput
+        """
+        return PassthroughInput(self, bit)
+
+    def scan(self) -> bool:
+        """
+        Read and translate one waiting report.
+
+        Called once per update by ``Joystick.update()``; the translated bits go out
+        in the report sent by the same update.  Only one report is taken per update,
+        so a press and release that arrive together are still both reported.
+
+        :return: ``True`` if a report was translated.
+        :rtype: bool
+        """
+        buffer = self._buffer
+        length = self._device.read(buffer)
+        if not length:
+            return False
+        received = time.monotonic_ns()
+
+        report_id = buffer[0] if self._uses_ids else 0
+        tables = self._tables.get(report_id)
+        if tables is not None:
+            bits = 0
+            for index, table in tables:
+                if index < length:
+                    bits |= table[buffer[index]]
+            self._by_id[report_id] = bits
+            bits = 0
+            for value in self._by_id.values():
+                bits |= value
+            self.bits = bits
+
+        self.reports += 1
+        self.received_ns = received
+        self._received = received
+        return True
+
+    def reported(self) -> None:
+        """
+        Time the last translated report, once ``Joystick.update()`` has sent it.
+
+        Called by ``Joystick.update()`` after its reports go out.
+        """
+        if not self._received:
+            return
+        elapsed = (time.monotonic_ns() - self._received) // 1000
+        self._received = 0
+        stats = self.latency_us
+        stats[0] += 1
+        stats[1] += elapsed
+        if elapsed > stats[2]:
+            stats[2] = elapsed
+
+
+def compile_tables(
+    fields: List, mapping: Dict[Tuple[int, int], int]
+) -> Dict[int, List[Tuple[int, bytearray]]]:
+    """
+    Build a 256-entry lookup table for every report byte that holds a mapped usage.
+
+    A report's telephony bits are the OR of ``table[report[index]]`` over its
+    tables.  Variable fields set their bit while non-zero, and array fields set the
+    bit of each mapped usage they list.
+
+    :param fields: Fields returned by ``parse_descriptor``.
+    :type fields: List[Field]
+    :param mapping: ``(usage_page, usage)`` to telephony bit.
+    :type mapping: Dict[Tuple[int, int], int]
+    :raises ValueError: If a mapped element straddles a byte boundary.
+    :return: ``(byte index, table)`` pairs for each report ID.  Byte indexes count
+        the report ID byte, if there is one.
+    :rtype: Dict[int, List[Tuple[int, bytearray]]]
+    """
+    uses_ids = any(f.report_id for f in fields)
+    tables = dict()  # report ID -> {byte index: table}
+    for f in fields:
+        if f.kind != INPUT or f.constant:
+            continue
+        for n in range(f.count):
+            start = f.offset + n * f.size
+            if f.variable:
+                bit = mapping.get((f.usage_page, f.usage(n)))
+                if bit is None:
+                    continue
+                selects = None
+            else:
+                selects = dict()  # logical value -> telephony bit
+                for i, usage in enumerate(f.usages):
+                    bit = mapping.get((f.usage_page, usage))
+                    if bit is not None:
+                        selects[f.logical_min + i] = bit
+                if not selects:
+                    continue
+
+            if start // 8 != (start + f.size - 1) // 8:
+                raise ValueError("Mapped HID field spans a byte boundary.")
+            index = start // 8 + uses_ids
+            shift = start % 8
+            mask = (1 << f.size) - 1
+            by_index = tables.setdefault(f.report_id, dict())
+            table = by_index.setdefault(index, bytearray(256))
+            for value in range(256):
+                raw = (value >> shift) & mask
+                if selects is None:
+                    if raw:
+                        table[value] |= 1 << bit
+                elif raw in selects:
+                    table[value] |= 1 << selects[raw]
+    return {i: sorted(t.items()) for i, t in tables.items()}
+
+
+def _find_hid(config: bytes) -> Optional[Tuple[int, int, int]]:
+    """Find the first HID interface, its IN endpoint and report descriptor length."""
+    interface = endpoint = length = None
+    i = 0
+    while i < len(config):
+        descriptor_length = config[i]
+        descriptor_type = config[i + 1]
+        if descriptor_type == 0x04:  # INTERFACE
+            if interface is not None and endpoint is not None:
+                break
+            interface = config[i + 2] if config[i + 5] == 0x03 else None
+            endpoint = length = None
+        elif descriptor_type == 0x21 and interface is not None:  # HID
+            length = config[i + 7] | (config[i + 8] << 8)
+        elif descriptor_type == 0x05 and interface is not None:  # ENDPOINT
+            if config[i + 2] & 0x80 and endpoint is None:
+                endpoint = config[i + 2]
+        if not descriptor_length:
+            break
+        i += descriptor_length
+    if interface is None or endpoint is None or not length:
+        return None
+    return interface, endpoint, length
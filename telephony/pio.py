@@ -0,0 +1,157 @@
+"""
+RP2040 PIO backend for sampling a contiguous range of GPIO pins in one read.
+
+This module provides a ``GpioSampler`` that runs a one-instruction PIO program to
+latch a block of pins at a fixed, hardware-timed rate.  ``Joystick.update()`` then
+reads every pin in the block as a single word instead of one ``DigitalInOut`` call
+per button.
+"""
+
+import array
+
+# These typing imports help during development in vscode but fail in CircuitPython
+try:
+    from typing import List
+except ImportError:
+    pass
+
+# This is a CircuitPython built-in that only exists on RP2040 ports
+try:
+    import rp2pio  # type: ignore
+except ImportError:
+    print("*** WARNING: rp2pio is not available on this board. ***")
+
+from telephony.inputs import Button
+
+
+class SampledPin:
+    """Provide a boolean ``.value`` for one pin of a ``GpioSampler`` block."""
+
+    def __init__(self, sampler: "GpioSampler", offset: int) -> None:
+        """
+        Provide a boolean ``.value`` for one pin of a ``GpioSampler`` block.
+
+        :param sampler: The sampler that owns the pin.
+        :type sampler: GpioSampler
+        :param offset: The 0-based position of the pin within the sampled block.
+        :type offset: int
+        """
+        self.group = sampler
+        """The sampler that must be scanned before this pin is read."""
+
+        self._mask = 1 << offset
+
+    @property
+    def value(self) -> bool:
+        """
+        Get the pin level from the most recently latched sample word.
+
+        :return: The raw pin level, as ``DigitalInOut.value`` would report it.
+        :rtype: bool
+        """
+        return (self.group.word & self._mask) != 0
+
+
+class GpioSampler:
+    """Sample a contiguous block of GPIO pins with a PIO state machine."""
+
+    def __init__(
+        self,
+        first_pin,
+        pin_count: int,
+        frequency: int = 10000,
+        active_low: bool = True,
+    ) -> None:
+        """
+        Sample a contiguous block of GPIO pins with a PIO state machine.
+
+        .. code::
+
+           sampler = GpioSampler(board.GP2, 8)
+           js.add_input(*sampler.buttons())
+
+        :param first_pin: CircuitPython pin identifier for the lowest pin in the
+            block (i.e. ``board.GP2``).
+        :type first_pin: Pin
+        :param pin_count: The number of consecutive pins to sample, from 1 to 32.
+        :type pin_count: int
+        :param frequency: Samples per second.  The RP2040 clock divider limits this
+            to roughly 2kHz and up.  (Defaults to ``10000``)
+        :type frequency: int, optional
+        :param active_low: Set to ``True`` if the pins are active low, which also
+            enables their pull-ups, otherwise pull-downs are enabled.
+            (Defaults to ``True``)
+        :type active_low: bool, optional
+        :raises ValueError: If ``pin_count`` is not from 1 to 32.
+        """
+        if not 1 <= pin_count <= 32:
+            raise ValueError("Pin count must be from 1-32.")
+
+        self._pin_count = pin_count
+        self._active_low = active_low
+        mask = (1 << pin_count) - 1
+
+        # in pins, <pin_count>  (autopush hands each sample straight to the FIFO)
+        program = array.array("H", (0x4000 | (pin_count & 0x1F),))
+
+        self._sm = rp2pio.StateMachine(
+            program,
+            frequency=frequency,
+            first_in_pin=first_pin,
+            in_pin_count=pin_count,
+            pull_in_pin_up=mask if active_low else 0,
+            pull_in_pin_down=0 if active_low else mask,
+            in_shift_right=False,
+            auto_push=True,
+            push_threshold=pin_count,
+        )
+
+        self._buffer = array.array("L", (mask if active_low else 0,))
+
+        # Newer CircuitPython releases can DMA samples into the buffer forever,
+        # otherwise the FIFO is cleared and one fresh sample is read per scan.
+        self._background = hasattr(self._sm, "background_read")
+        if self._background:
+            self._sm.background_read(loop=self._buffer)
+
+        self.word = self._buffer[0]
+        """The raw pin levels latched by the most recent ``scan()``."""
+
+        self.changed = 0
+        """Bit mask of the pins whose level changed in the most recent ``scan()``."""
+
+    def scan(self) -> int:
+        """
+        Latch the newest sample word and diff it against the previous one.
+
+        This is called once per ``Joystick.update()`` for every sampler that has
+        buttons associated with the joystick.
+
+        :return: Bit mask of the pins whose level changed since the last scan.
+        :rtype: int
+        """
+        if not self._background:
+            self._sm.clear_rxfifo()
+            self._sm.readinto(self._buffer)
+        word = self._buffer[0]
+        self.changed = word ^ self.word
+        self.word = word
+        return self.changed
+
+    def buttons(self, bypass: bool = False) -> List[Button]:
+        """
+        Create a ``Button`` for every pin in the sampled block, lowest pin first.
+
+        :param bypass: Passed through to each ``Button``.  (Defaults to ``False``)
+        :type bypass: bool, optional
+        :return: One ``Button`` per sampled pin, ready for ``Joystick.add_input``.
+        :rtype: List[Button]
+        """
+        return [
+            Button(SampledPin(self, offset), self._active_low, bypass)
+            for offset in range(self._pin_count)
+        ]
+
+    def deinit(self) -> None:
+        """Stop the state machine and release the sampled pins."""
+        self._sm.deinit()
@@ -0,0 +1,133 @@
+"""
+Startup profiling from power-on to the first USB HID report.
+
+This module timestamps each startup phase with ``time.monotonic_ns()``, which counts
+from power-on and keeps running across the ``boot.py`` to ``code.py`` reload.  The
+first phase is recorded when this module is imported, so import it first in
+``code.py``.  Nothing here touches the filesystem until ``report()`` is called, which
+should be after the first report has gone out.
+
+.. code::
+
+   from telephony import profiler  # records "code.py"
+   from telephony.joystick import Joystick
+   profiler.mark("imports")
+   js = Joystick(buttons=2)  # records "device" and "first report"
+   js.telemetry = Telemetry()
+   profiler.send(js.telemetry)
+
+.. note::
+
+   ``boot.py`` runs in an earlier VM, so it prints its own finish time into
+   ``boot_out.txt``, as a ``+`` line like the joystick's configuration line, when
+   ``TELEPHONY_PROFILE_BOOT = 1`` is set in ``settings.toml``.
+   It is off by default, since a changed ``boot_out.txt`` is rewritten to flash on
+   every boot.
+"""
+
+import time
+
+# These typing imports help during development in vscode but fail in CircuitPython
+try:
+    from typing import List, Tuple
+except ImportError:
+    pass
+
+BOOT_MARKER = "+ boot.py done"
+"""Start of the line ``boot.py`` prints with its finish time in microseconds."""
+
+MAX_MARKS = 16
+"""Phases recorded before further marks are ignored."""
+
+PHASES = ("boot.py", "code.py", "imports", "device", "first report", "report queued")
+"""Phase names by ``PHASE`` telemetry index, shared with ``tools/telemetry_decode.py``.
+Only ever add to the end, so recorded indexes keep their meaning."""
+
+OTHER_PHASE = 0xFF
+"""``PHASE`` telemetry index of a phase that is not in ``PHASES``."""
+
+_marks = [("code.py", time.monotonic_ns())]
+
+
+def mark(phase: str) -> None:
+    """
+    Record the end of a startup phase.
+
+    Only the first mark for each phase is kept, so library code can call this on
+    every start-up without growing the list.
+
+    :param phase: The phase name.
+    :type phase: str
+    """
+    if len(_marks) >= MAX_MARKS:
+        return
+    for name, _ in _marks:
+        if name == phase:
+            return
+    _marks.append((phase, time.monotonic_ns()))
+
+
+def marks() -> List[Tuple[str, int]]:
+    """
+    Get the recorded phases.
+
+    :return: ``(phase, nanoseconds since power-on)`` pairs, in order.
+    :rtype: List[Tuple[str, int]]
+    """
+    return list(_marks)
+
+
+def report(boot_out: str = "/boot_out.txt") -> str:
+    """
+    Describe the startup phases, including ``boot.py`` if it recorded its time.
+
+    :param boot_out: Where to look for the ``boot.py`` line.
+        (Defaults to ``/boot_out.txt``)
+    :type boot_out: str, optional
+    :return: One line per phase, with its finish time and duration in
+        milliseconds.
+    :rtype: str
+    """
+    lines = list()
+    previous = 0
+    for name, stamp in _phases(boot_out):
+        lines.append(
+            "%-14s %8.1f ms  (+%.1f ms)" % (name, stamp / 1e6, (stamp - previous) / 1e6)
+        )
+        previous = stamp
+    return "\n".join(lines)
+
+
+def send(telemetry, boot_out: str = "/boot_out.txt") -> None:
+    """
+    Record each startup phase as a ``PHASE`` telemetry record.
+
+    This is the on-device alternative to ``report()``, which is meant for the
+    REPL; it keeps the console free of profiling output.
+
+    :param telemetry: The stream to record to.
+    :type telemetry: Telemetry
+    :param boot_out: Where to look for the ``boot.py`` line.
+        (Defaults to ``/boot_out.txt``)
+    :type boot_out: str, optional
+    """
+    from telephony.telemetry import PHASE  # not at the top, to keep the first mark
+
+    for name, stamp in _phases(boot_out):
+        index = PHASES.index(name) if name in PHASES else OTHER_PHASE
+        telemetry.record(PHASE, index, stamp // 1000000)
+
+
+def _phases(boot_out: str) -> List[Tuple[str, int]]:
+    """Get the ``boot.py`` phase, if it recorded its time, then every mark."""
+    phases = list()
+    try:
+        with open(boot_out, "r") as f:
+            for line in f:
+                if line.startswith(BOOT_MARKER):
+                    phases.append(("boot.py", int(line.split()[3]) * 1000))
+                    break
+    except (OSError, ValueError, IndexError):
+        pass
+    phases.extend(_marks)
+    return phases
@@ -0,0 +1,272 @@
+"""
+Prebuilt USB HID profiles, selected at boot.
+
+This module holds complete, precomputed report descriptors for each desk type, so
+``boot.py`` only has to pick one and pass it to ``usb_hid.enable()`` instead of
+building a descriptor on every boot.  The choice comes from a button held at
+power-on, ``TELEPHONY_PROFILE`` in ``settings.toml`` or the last choice remembered
+in NVM, in that order, and ``code.py`` reads it back with ``active()`` without
+touching the filesystem.
+
+.. code::
+
+   # boot.py
+   profile = select(held=((board.GP8, TELEPHONY_KEYBOARD), (board.GP9, JOYSTICK)))
+   profile.enable()
+
+   # code.py
+   js = active().joystick()
+"""
+
+import os
+
+# These typing imports help during development in vscode but fail in CircuitPython
+try:
+    from typing import Optional, Sequence, Tuple
+except ImportError:
+    pass
+
+from telephony import __version__
+from telephony.descriptor import TELEPHONY_LEDS, TELEPHONY_REPORT_DESCRIPTOR
+
+REPORT_ID = 0x0B
+"""Report ID of the joystick report in every profile."""
+
+PROFILE_KEY = 0xF0
+"""``telephony.nvm.Store`` key holding the index of the selected profile."""
+
+TELEPHONY_DESCRIPTOR = (
+    TELEPHONY_REPORT_DESCRIPTOR[: -len(TELEPHONY_LEDS) - 1]
+    + b"\xc0"  # END_COLLECTION
+)
+"""Phone Mute and Hook Switch buttons, one input report byte."""
+
+TELEPHONY_LED_DESCRIPTOR = TELEPHONY_REPORT_DESCRIPTOR
+"""Phone Mute and Hook Switch, plus the Mute, Off-Hook and Ring LED output report."""
+
+# fmt: off
+JOYSTICK_DESCRIPTOR = TELEPHONY_DESCRIPTOR[:-5] + bytes((
+    0x05, 0x09,  #   USAGE_PAGE (Button)
+    0x19, 0x01,  #   USAGE_MINIMUM (Button 1)
+    0x29, 0x7e,  #   USAGE_MAXIMUM (Button 126)
+    0x95, 0x7e,  #   REPORT_COUNT (126)
+    0x81, 0x02,  #   INPUT (Data,Var,Abs)
+    0xc0,        # END_COLLECTION
+))
+"""Phone Mute, Hook Switch and 126 generic buttons, 16 input report bytes."""
+# fmt: on
+
+
+class Profile:
+    """One prebuilt set of USB HID devices."""
+
+    @property
+    def report_length(self) -> int:
+        """
+        Get the size of the joystick input report.
+
+        :return: The report length in bytes, not counting the report ID.
+        :rtype: int
+        """
+        return (self.buttons // 8) + bool(self.buttons % 8)
+
+    def __init__(
+        self,
+        name: str,
+        descriptor: bytes,
+        buttons: int,
+        leds: bool = False,
+        standard: Sequence[str] = (),
+    ) -> None:
+        """
+        Describe one prebuilt set of USB HID devices.
+
+        :param name: The name used for ``TELEPHONY_PROFILE`` in ``settings.toml``.
+        :type name: str
+        :param descriptor: The joystick's complete report descriptor.
+        :type descriptor: bytes
+        :param buttons: Buttons in the joystick report.
+        :type buttons: int
+        :param leds: ``True`` if the descriptor has the LED output report.
+            (Defaults to ``False``)
+        :type leds: bool, optional
+        :param standard: Names of CircuitPython's built-in ``usb_hid.Device``
+            objects (i.e. ``"KEYBOARD"``) to enable alongside.  (Defaults to none)
+        :type standard: Sequence[str], optional
+        """
+        self.name = name
+        self.descriptor = descriptor
+        self.buttons = buttons
+        self.leds = leds
+        self.standard = tuple(standard)
+
+    def devices(self) -> Tuple:
+        """
+        Create the devices to pass to ``usb_hid.enable()``.
+
+        :return: The joystick device, followed by any standard devices.
+        :rtype: Tuple[usb_hid.Device]
+        """
+        import usb_hid  # type: ignore (this is a CircuitPython built-in)
+
+        joystick = usb_hid.Device(
+            report_descriptor=self.descriptor,
+            usage_page=0x0b,  # same as USAGE_PAGE from the descriptor
+            usage=0x05,  # same as USAGE from the descriptor
+            report_ids=(REPORT_ID,),
+            in_report_lengths=(self.report_length,),
+            out_report_lengths=(int(self.leds),),
+        )
+        return (joystick,) + tuple(getattr(usb_hid.Device, n) for n in self.standard)
+
+    def enable(self) -> None:
+        """Enable the profile's devices.  Only call this from ``boot.py``."""
+        import usb_hid  # type: ignore (this is a CircuitPython built-in)
+
+        # the same boot_out.txt line as create_joystick(), so Joystick() still works
+        print(
+            "+ Enabled JoystickXL",
+            __version__,
+            self.buttons,
+            "buttons",
+            self.report_length,
+            "report bytes.",
+            "profile",
+            self.name,
+        )
+        usb_hid.enable(self.devices())
+
+    def joystick(self):
+        """
+        Create the ``Joystick`` for this profile, without reading ``boot_out.txt``.
+
+        :return: A new joystick with all inputs idle.
+        :rtype: Joystick
+        """
+        from telephony.joystick import Joystick
+
+        return Joystick(buttons=self.buttons)
+
+
+TELEPHONY = Profile("telephony", TELEPHONY_DESCRIPTOR, buttons=2)
+"""Phone Mute and Hook Switch only."""
+
+TELEPHONY_KEYBOARD = Profile(
+    "keyboard",
+    TELEPHONY_LED_DESCRIPTOR,
+    buttons=2,
+    leds=True,
+    standard=("KEYBOARD", "CONSUMER_CONTROL"),
+)
+"""Telephony with host LEDs, plus a keyboard and media keys for shortcuts."""
+
+JOYSTICK = Profile("joystick", JOYSTICK_DESCRIPTOR, buttons=128)
+"""Phone Mute, Hook Switch and 126 generic buttons."""
+
+PROFILES = (TELEPHONY, TELEPHONY_KEYBOARD, JOYSTICK)
+"""Every profile, in the order their indexes are stored in NVM."""
+
+
+def find(name: str) -> Profile:
+    """
+    Look up a profile by name.
+
+    :param name: The profile's name.
+    :type name: str
+    :raises ValueError: If there is no profile with that name.
+    :return: The matching profile.
+    :rtype: Profile
+    """
+    for profile in PROFILES:
+        if profile.name == name:
+            return profile
+    raise ValueError("Unknown HID profile: %s" % name)
+
+
+def select(
+    held: Sequence[Tuple[object, Profile]] = (),
+    default: Profile = TELEPHONY,
+) -> Profile:
+    """
+    Choose the profile to enable, and remember it for ``active()``.
+
+    Only call this from ``boot.py``.  The first profile whose button is held at
+    power-on wins, then ``TELEPHONY_PROFILE`` from ``settings.toml``, then the last
+    choice stored in NVM, then ``default``.  NVM is only written when the choice
+    changes.
+
+    Every pin in ``held`` is released again before this returns, so it is free for
+    ``code.py``.  Give them buttons of their own all the same: a pin that is also an
+    input in ``code.py`` (i.e. Phone Mute) switches profile whenever it happens to
+    be held at power-on.
+
+    :param held: ``(pin, profile)`` pairs for active-low buttons checked at boot.
+        (Defaults to none)
+    :type held: Sequence[Tuple[Pin, Profile]], optional
+    :param default: The profile used when nothing else picks one.
+        (Defaults to ``TELEPHONY``)
+    :type default: Profile, optional
+    :return: The chosen profile.
+    :rtype: Profile
+    """
+    chosen = None
+    if held:
+        from digitalio import DigitalInOut, Pull  # type: ignore
+
+        for pin, profile in held:
+            button = DigitalInOut(pin)
+            try:
+                button.pull = Pull.UP
+                pressed = not button.value
+            finally:
+                button.deinit()
+            if pressed:
+                chosen = profile
+                break
+
+    if chosen is None:
+        name = os.getenv("TELEPHONY_PROFILE")
+        if name:
+            chosen = find(name)
+
+    store = _store()
+    stored = _stored(store)
+    if chosen is None:
+        chosen = stored or default
+
+    if store is not None and chosen is not stored:
+        store.set(PROFILE_KEY, PROFILES.index(chosen))
+        store.flush()
+    return chosen
+
+
+def active(default: Profile = TELEPHONY) -> Profile:
+    """
+    Get the profile ``boot.py`` enabled, from NVM rather than ``boot_out.txt``.
+
+    :param default: Returned if no choice was stored.  (Defaults to ``TELEPHONY``)
+    :type default: Profile, optional
+    :return: The active profile.
+    :rtype: Profile
+    """
+    return _stored(_store()) or default
+
+
+def _store():
+    """Open the NVM settings store, or return ``None`` if the board has no NVM."""
+    from telephony.nvm import Store
+
+    try:
+        return Store()
+    except ValueError:
+        return None
+
+
+def _stored(store) -> Optional[Profile]:
+    """Return the profile stored in NVM, if there is a valid one."""
+    if store is None:
+        return None
+    index = store.get(PROFILE_KEY, -1)
+    if 0 <= index < len(PROFILES):
+        return PROFILES[index]
+    return None
@@ -0,0 +1,296 @@
+"""
+Outbound USB HID report handling for JoystickXL devices.
+
+This module provides a ``Report`` buffer with dirty tracking for each report ID, and
+a bounded, preallocated ``ReportQueue`` that holds reports the host could not accept
+yet and retries them without blocking the input loop.
+"""
+
+import time
+
+# These typing imports help during development in vscode but fail in CircuitPython
+try:
+    from typing import Optional
+except ImportError:
+    pass
+
+
+class Report:
+    """Report buffer and dirty tracking for a single USB HID report ID."""
+
+    def __init__(self, report_id: Optional[int], length: int) -> None:
+        """
+        Provide a report buffer and dirty tracking for a single USB HID report ID.
+
+        Writers change ``buffer`` through ``write()`` or ``set_bit()`` (or modify it
+        directly and set ``dirty``), and ``Joystick.update()`` only compares and sends
+        reports that are dirty.
+
+        :param report_id: The USB HID report ID, or ``None`` if the device only has
+            a single report ID.
+        :type report_id: int
+        :param length: The report length in bytes, not counting the report ID.
+        :type length: int
+        """
+        self.report_id = report_id
+        """The USB HID report ID this buffer is sent with."""
+
+        self.buffer = bytearray(length)
+        """The report contents that will be sent on the next update."""
+
+        self.last = bytearray(length)
+        """The report contents that were last handed to the host."""
+
+        self.dirty = True
+        """``True`` if ``buffer`` may differ from ``last``."""
+
+    @property
+    def changed(self) -> bool:
+        """
+        Determine if this report needs to be sent.
+
+        :return: ``True`` if the report is dirty and differs from the last one sent.
+        :rtype: bool
+        """
+        return self.dirty and self.buffer != self.last
+
+    def write(self, offset: int, data) -> None:
+        """
+        Copy data into the report buffer and mark it dirty.
+
+        :param offset: The byte offset to start writing at.
+        :type offset: int
+        :param data: The bytes to copy.
+        :type data: bytes
+        """
+        self.buffer[offset : offset + len(data)] = data
+        self.dirty = True
+
+    def set_bit(self, bit: int, value: bool) -> None:
+        """
+        Set or clear a single bit in the report buffer and mark it dirty.
+
+        :param bit: The 0-based bit position, counting from the LSB of byte 0.
+        :type bit: int
+        :param value: ``True`` to set the bit, ``False`` to clear it.
+        :type value: bool
+        """
+        if value:
+            self.buffer[bit // 8] |= 1 << (bit % 8)
+        else:
+            self.buffer[bit // 8] &= ~(1 << (bit % 8))
+        self.dirty = True
+
+    def mark_sent(self) -> None:
+        """Record the current buffer as the last report sent to the host."""
+        self.last[:] = self.buffer
+        self.dirty = False
+
+
+class ReportQueue:
+    """Bounded, preallocated queue of USB HID reports with non-blocking retry."""
+
+    def __init__(
+        self,
+        device,
+        size: int = 8,
+        max_length: int = 64,
+        backoff_ms: int = 1,
+        max_backoff_ms: int = 64,
+    ) -> None:
+        """
+        Create a bounded, preallocated queue of USB HID reports.
+
+        When ``send_report`` fails (USB busy, or the host has not finished
+        enumerating the device) the report is copied into a preallocated slot and
+        retried from later calls to ``flush()``, with the delay between attempts
+        doubling up to ``max_backoff_ms``.
+
+        No edge is ever dropped.  A new report replaces the newest queued report
+        with the same report ID only when no bit changes twice across the two, so
+        the queue keeps the latest level per report ID while every press and release
+        still reaches the host; reports for different IDs are never merged.  If the
+        queue is full and the report cannot be merged, ``send()`` refuses it straight
+        away with an ``OSError``, so the caller can keep it and offer it again later;
+        it never waits for the host.
+
+        :param device: The ``usb_hid.Device`` to send reports through.
+        :type device: usb_hid.Device
+        :param size: The number of reports that can be held.  (Defaults to ``8``)
+        :type size: int, optional
+        :param max_length: The largest report length that will be queued.
+            (Defaults to ``64``)
+        :type max_length: int, optional
+        :param backoff_ms: Delay before the first retry.  (Defaults to ``1``)
+        :type backoff_ms: int, optional
+        :param max_backoff_ms: Upper limit for the retry delay.  (Defaults to ``64``)
+        :type max_backoff_ms: int, optional
+        """
+        self._device = device
+        self._slots = [bytearray(max_length) for _ in range(size)]
+        self._lengths = [0] * size
+        self._ids = [None] * size
+        self._head = 0
+        self._count = 0
+        self._max_length = max_length
+        self._delivered = dict()  # report ID -> last report delivered for it
+
+        self._backoff_min = backoff_ms * 1000000
+        self._backoff_max = max_backoff_ms * 1000000
+        self._backoff = 0
+        self._retry_at = 0
+
+        self.sent = 0
+        """Number of reports delivered to the host."""
+
+        self.retried = 0
+        """Number of failed delivery attempts that were scheduled for a retry."""
+
+        self.coalesced = 0
+        """Number of reports merged into a queued report with the same report ID."""
+
+        self.refused = 0
+        """Number of reports refused because the queue was full."""
+
+        self.dropped = 0
+        """Number of queued reports discarded by ``clear()``."""
+
+    @property
+    def pending(self) -> int:
+        """
+        Get the number of reports waiting to be delivered.
+
+        :return: ``0`` to the queue size.
+        :rtype: int
+        """
+        return self._count
+
+    def send(self, report, report_id: Optional[int] = None) -> bool:
+        """
+        Send a report now if nothing is queued, otherwise queue it behind the rest
+        (or merge it into a queued report with the same ID, if no edge is lost).
+
+        :param report: The report data.  It is copied if it has to be queued, so the
+            caller can reuse the buffer straight away.
+        :type report: bytearray
+        :param report_id: The report ID to send with, or ``None`` for devices with a
+            single report ID.  (Defaults to ``None``)
+        :type report_id: int, optional
+        :raises OSError: If the queue is full and the report could not be merged
+            into a queued one.  It was not queued.
+        :return: ``True`` if the report was delivered immediately, ``False`` if it
+            was queued or merged into a queued report.
+        :rtype: bool
+        """
+        if self._count:
+            self.flush()
+
+        if not self._count:
+            try:
+                self._device.send_report(report, report_id)
+            except OSError:
+                self._schedule_retry()
+            else:
+                self.sent += 1
+                self._remember(report, report_id)
+                return True
+
+        if self._coalesce(report, report_id):
+            self.coalesced += 1
+            return False
+
+        if self._count == len(self._slots):
+            # merging would lose an edge; hand the report back rather than wait
+            self.refused += 1
+            raise OSError("USB HID report queue is full.")
+
+        slot = (self._head + self._count) % len(self._slots)
+        self._count += 1
+        length = len(report)
+        self._slots[slot][:length] = report
+        self._lengths[slot] = length
+        self._ids[slot] = report_id
+        return False
+
+    def flush(self) -> int:
+        """
+        Retry queued reports, oldest first, if the current backoff has elapsed.
+
+        At most one failed attempt is made per call, so this never blocks the loop.
+
+        :return: The number of reports still waiting to be delivered.
+        :rtype: int
+        """
+        if not self._count or time.monotonic_ns() < self._retry_at:
+            return self._count
+
+        while self._count:
+            head = self._head
+            try:
+                self._device.send_report(
+                    memoryview(self._slots[head])[: self._lengths[head]],
+                    self._ids[head],
+                )
+            except OSError:
+                self._schedule_retry()
+                break
+            self.sent += 1
+            self._remember(self._slots[head], self._ids[head], self._lengths[head])
+            self._head = (head + 1) % len(self._slots)
+            self._count -= 1
+            self._backoff = 0
+
+        return self._count
+
+    def clear(self) -> None:
+        """Discard all queued reports and reset the retry backoff."""
+        self.dropped += self._count
+        self._count = 0
+        self._backoff = 0
+        self._retry_at = 0
+
+    def _coalesce(self, report, report_id: Optional[int]) -> bool:
+        """Merge a report into the newest queued one for its ID, if no edge is lost."""
+        size = len(self._slots)
+        newest = previous = None
+        for k in range(self._count - 1, -1, -1):
+            slot = (self._head + k) % size
+            if self._ids[slot] == report_id:
+                if newest is None:
+                    newest = slot
+                else:
+                    previous = slot
+                    break
+        if newest is None or self._lengths[newest] != len(report):
+            return False
+
+        queued = self._slots[newest]
+        if previous is not None:
+            before = self._slots[previous]
+        else:
+            before = self._delivered.get(report_id)
+        for j in range(len(report)):
+            old = before[j] if before is not None else 0
+            # a bit that flips into the queued report and back again is an edge
+            if (old ^ queued[j]) & (queued[j] ^ report[j]):
+                return False
+
+        queued[: len(report)] = report
+        return True
+
+    def _remember(self, report, report_id: Optional[int], length: int = -1) -> None:
+        """Keep a copy of the last report delivered for each report ID."""
+        if length < 0:
+            length = len(report)
+        delivered = self._delivered.get(report_id)
+        if delivered is None:
+            delivered = self._delivered[report_id] = bytearray(self._max_length)
+        delivered[:length] = memoryview(report)[:length]
+
+    def _schedule_retry(self) -> None:
+        """Double the retry delay (within limits) and record the failed attempt."""
+        self.retried += 1
+        self._backoff = min(
+            max(self._backoff * 2, self._backoff_min), self._backoff_max
+        )
+        self._retry_at = time.monotonic_ns() + self._backoff
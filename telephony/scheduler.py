@@ -0,0 +1,95 @@
+"""
+Per-input scan scheduling for ``Joystick.update()``.
+
+This module provides a ``ScanScheduler`` that splits a joystick's buttons into those
+read on every update (i.e. mute, hook) and those with a ``Button.scan_period_ms``
+(i.e. settings buttons every 10 ms, analog-backed inputs every 20 ms).  Periodic
+buttons are read round-robin, only when due and only while a per-update time budget
+lasts, so attaching more of them never delays the every-update buttons.
+"""
+
+import time
+
+# These typing imports help during development in vscode but fail in CircuitPython
+try:
+    from typing import List, Tuple
+except ImportError:
+    pass
+
+
+class ScanScheduler:
+    """Decide which buttons ``Joystick.update()`` reads on each pass."""
+
+    def __init__(self, budget_us: int = 500) -> None:
+        """
+        Decide which buttons ``Joystick.update()`` reads on each pass.
+
+        :param budget_us: Time allowed per update for reading periodic buttons.
+            Buttons read on every update are not counted against it.
+            (Defaults to ``500``)
+        :type budget_us: int, optional
+        """
+        self.budget_us = budget_us
+        """Time allowed per update for reading periodic buttons, in microseconds."""
+
+        self.deferred = 0
+        """Updates on which the budget pushed due buttons to a later update."""
+
+        self._every = list()  # (index, button) read on every update
+        self._periodic = list()  # [index, button, period_ns, next_due]
+        self._next = 0
+
+    def assign(self, buttons: List) -> None:
+        """
+        Sort buttons by their ``scan_period_ms``.
+
+        Called by ``Joystick`` whenever its button list changes.  Periodic buttons
+        are all due straight away.
+
+        :param buttons: The joystick's buttons, in report order.
+        :type buttons: List[Button]
+        """
+        self._every = list()
+        self._periodic = list()
+        for i, b in enumerate(buttons):
+            period = getattr(b, "scan_period_ms", 0)
+            if period:
+                self._periodic.append([i, b, period * 1000000, 0])
+            else:
+                self._every.append((i, b))
+        self._next = 0
+
+    def read(self) -> List[Tuple[int, bool]]:
+        """
+        Read every button due on this update.
+
+        :return: ``(index, value)`` for each button that was read.  Buttons that
+            were not read keep their previous state.
+        :rtype: List[Tuple[int, bool]]
+        """
+        now = time.monotonic_ns()
+        values = [(i, b.read(now)) for i, b in self._every]
+
+        count = len(self._periodic)
+        if not count:
+            return values
+
+        now = start = time.monotonic_ns()
+        deadline = start + self.budget_us * 1000
+        read = 0
+        for _ in range(count):
+            entry = self._periodic[self._next]
+            if now >= entry[3]:
+                if read and now + (now - start) // read > deadline:
+                    # another read of average length would overrun the budget
+                    self.deferred += 1
+                    break
+                values.append((entry[0], entry[1].read(now)))
+                read += 1
+                # stay on the period grid, but never try to catch up a backlog
+                entry[3] += entry[2]
+                now = time.monotonic_ns()
+                if entry[3] < now:
+                    entry[3] = now + entry[2]
+            self._next = (self._next + 1) % count
+        return values
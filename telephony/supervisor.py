@@ -0,0 +1,262 @@
+"""
+Loop-time budget enforcement and watchdog stall recovery.
+
+This module provides a ``Supervisor`` that runs ``Joystick.update()`` (and any other
+per-loop tasks), measures every iteration against a time budget, records overruns
+and only feeds ``microcontroller.watchdog`` while the loop is healthy.  If the loop
+wedges, or keeps overrunning, the watchdog resets the board, and an overrun summary
+kept at the end of ``microcontroller.nvm`` survives the reset.
+"""
+
+import struct
+import time
+
+# These typing imports help during development in vscode but fail in CircuitPython
+try:
+    from typing import Callable, Optional, Sequence, Tuple
+except ImportError:
+    pass
+
+import microcontroller  # type: ignore (this is a CircuitPython built-in)
+
+from telephony.telemetry import OVERRUN, RESTART
+
+SUMMARY_FORMAT = "<4sIIIBxxx"
+"""Summary layout: magic, iterations, overruns, worst iteration (us), reason."""
+
+SUMMARY_SIZE = struct.calcsize(SUMMARY_FORMAT)
+"""Bytes reserved for the summary at the very end of ``microcontroller.nvm``."""
+
+_MAGIC = b"SUP1"
+
+PERIODIC = 0
+"""Summary reason: saved on the regular ``persist_s`` schedule."""
+
+UNHEALTHY = 1
+"""Summary reason: saved just before the watchdog was deliberately starved."""
+
+
+class Supervisor:
+    """Run the input loop under a time budget, guarded by the watchdog."""
+
+    @property
+    def healthy(self) -> bool:
+        """
+        Determine if the loop is still within its overrun limits.
+
+        :return: ``False`` once the watchdog is being starved.
+        :rtype: bool
+        """
+        return self._healthy
+
+    def __init__(
+        self,
+        joystick,
+        budget_ms: float = 5,
+        watchdog_s: float = 2,
+        overrun_limit: int = 100,
+        persist_s: int = 60,
+        develop: Optional[bool] = None,
+    ) -> None:
+        """
+        Run the input loop under a time budget, guarded by the watchdog.
+
+        .. code::
+
+           supervisor = Supervisor(js, budget_ms=2)
+           supervisor.run(mute.update)
+
+        :param joystick: The joystick to update on each iteration.
+        :type joystick: Joystick
+        :param budget_ms: Time allowed for one iteration.  (Defaults to ``5``)
+        :type budget_ms: float, optional
+        :param watchdog_s: Watchdog timeout.  The board resets if the loop does not
+            complete a healthy iteration for this long.  (Defaults to ``2``)
+        :type watchdog_s: float, optional
+        :param overrun_limit: Consecutive overruns after which the loop is treated as
+            wedged and the watchdog is starved.  (Defaults to ``100``)
+        :type overrun_limit: int, optional
+        :param persist_s: Minimum time between summary writes to NVM.  Writes only
+            happen when the overrun count changed.  (Defaults to ``60``)
+        :type persist_s: int, optional
+        :param develop: Use ``WatchDogMode.RAISE`` instead of ``RESET``.  A stall
+            then raises ``watchdog.WatchDogTimeout`` in the loop instead of
+            resetting the board, and ``stop()`` can turn the watchdog off, so the
+            REPL stays usable.  (Defaults to ``True`` while a serial console is
+            connected)
+        :type develop: bool, optional
+        """
+        self._joystick = joystick
+        self._budget = int(budget_ms * 1000000)
+        self._limit = overrun_limit
+        self._persist = persist_s * 1000000000
+        self._next_persist = 0
+        self._persisted = 0
+        self._consecutive = 0
+        self._healthy = True
+
+        self.iterations = 0
+        """Iterations run since start-up."""
+
+        self.overruns = 0
+        """Iterations that took longer than the budget."""
+
+        self.worst_us = 0
+        """Longest iteration since start-up, in microseconds."""
+
+        self.previous = self._load_summary()
+        """``(iterations, overruns, worst_us, reason)`` from before the last reset,
+        or ``None``."""
+
+        self.watchdog_reset = False
+        """``True`` if the last reset was caused by the watchdog."""
+        try:
+            from microcontroller import ResetReason  # type: ignore
+
+            reason = microcontroller.cpu.reset_reason
+            self.watchdog_reset = reason == ResetReason.WATCHDOG
+        except (ImportError, NotImplementedError):
+            pass
+
+        telemetry = joystick.telemetry
+        if self.previous is not None and telemetry is not None:
+            reason = self.previous[3] | (0x80 if self.watchdog_reset else 0)
+            telemetry.record(RESTART, reason, self.previous[1])
+
+        if develop is None:
+            import supervisor  # type: ignore (this is a CircuitPython built-in)
+
+            develop = supervisor.runtime.serial_connected
+        from watchdog import WatchDogMode  # type: ignore
+
+        self.develop = develop
+        """``True`` if the watchdog raises instead of resetting the board."""
+
+        self._watchdog = microcontroller.watchdog
+        self._watchdog.timeout = watchdog_s
+        self._watchdog.mode = WatchDogMode.RAISE if develop else WatchDogMode.RESET
+        self._watchdog.feed()
+
+    def run_once(
+        self, *tasks: Callable[[], None], before: Sequence[Callable[[], None]] = ()
+    ) -> int:
+        """
+        Run one iteration: update the joystick, run each task and check the budget.
+
+        :param tasks: Extra callables to run after ``Joystick.update()``.
+        :type tasks: Callable
+        :param before: Callables to run before ``Joystick.update()``, i.e.
+            ``MuteControl.update``.  They count against the budget too.
+            (Defaults to none)
+        :type before: Sequence[Callable], optional
+        :return: The iteration time in microseconds.
+        :rtype: int
+        """
+        start = time.monotonic_ns()
+        for task in before:
+            task()
+        self._joystick.update()
+        for task in tasks:
+            task()
+        end = time.monotonic_ns()
+        elapsed = end - start
+
+        self.iterations += 1
+        elapsed_us = elapsed // 1000
+        if elapsed_us > self.worst_us:
+            self.worst_us = elapsed_us
+
+        if elapsed > self._budget:
+            self.overruns += 1
+            self._consecutive += 1
+            telemetry = self._joystick.telemetry
+            if telemetry is not None:
+                telemetry.record(OVERRUN, 0, elapsed_us)
+        else:
+            self._consecutive = 0
+
+        if self._healthy and self._consecutive >= self._limit:
+            # stop feeding, so the watchdog resets the board
+            self._healthy = False
+            self.save_summary(UNHEALTHY)
+
+        if self._healthy:
+            self._watchdog.feed()
+            if end >= self._next_persist and self.overruns != self._persisted:
+                self._next_persist = end + self._persist
+                self.save_summary(PERIODIC)
+
+        return elapsed_us
+
+    def run(
+        self, *tasks: Callable[[], None], before: Sequence[Callable[[], None]] = ()
+    ) -> None:
+        """
+        Run iterations forever.
+
+        A ``KeyboardInterrupt`` (Ctrl-C at the REPL) calls ``stop()`` before it is
+        re-raised.  Only a ``develop`` supervisor's watchdog can be stopped; in
+        ``RESET`` mode the RP2040 keeps it running, so the board resets
+        ``watchdog_s`` after breaking into the REPL.
+
+        :param tasks: Extra callables to run after ``Joystick.update()``.
+        :type tasks: Callable
+        :param before: Callables to run before ``Joystick.update()``.
+            (Defaults to none)
+        :type before: Sequence[Callable], optional
+        """
+        try:
+            while True:
+                self.run_once(*tasks, before=before)
+        except KeyboardInterrupt:
+            self.stop()
+            raise
+
+    def stop(self) -> None:
+        """
+        Stop the watchdog, where the port allows it.
+
+        A ``RESET`` mode watchdog cannot be stopped on the RP2040, so without
+        ``develop`` the board still resets ``watchdog_s`` after the last feed.
+        """
+        try:
+            self._watchdog.deinit()
+        except (NotImplementedError, RuntimeError, ValueError):
+            pass
+
+    def save_summary(self, reason: int = PERIODIC) -> None:
+        """
+        Write the overrun summary to the end of ``microcontroller.nvm``.
+
+        NVM writes stall the loop, so this only happens on the ``persist_s``
+        schedule or just before a deliberate watchdog reset.
+
+        :param reason: ``PERIODIC`` or ``UNHEALTHY``.  (Defaults to ``PERIODIC``)
+        :type reason: int, optional
+        """
+        nvm = microcontroller.nvm
+        if nvm is None:
+            return
+        start = len(nvm) - SUMMARY_SIZE
+        nvm[start:] = struct.pack(
+            SUMMARY_FORMAT,
+            _MAGIC,
+            self.iterations & 0xFFFFFFFF,
+            self.overruns & 0xFFFFFFFF,
+            min(self.worst_us, 0xFFFFFFFF),
+            reason,
+        )
+        self._persisted = self.overruns
+
+    @staticmethod
+    def _load_summary() -> Optional[Tuple[int, int, int, int]]:
+        """Read the summary saved before the last reset, if there is one."""
+        nvm = microcontroller.nvm
+        if nvm is None or len(nvm) < SUMMARY_SIZE:
+            return None
+        magic, iterations, overruns, worst, reason = struct.unpack(
+            SUMMARY_FORMAT, nvm[len(nvm) - SUMMARY_SIZE :]
+        )
+        if magic != _MAGIC:
+            return None
+        return (iterations, overruns, worst, reason)
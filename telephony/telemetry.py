@@ -0,0 +1,150 @@
+"""
+Compact binary telemetry over the ``usb_cdc`` data channel.
+
+This module provides a ``Telemetry`` object that packs fixed-size records (input
+changes, reports sent, loop timings, drops) into a preallocated ring buffer and
+writes them to ``usb_cdc.data`` without ever blocking the input loop.  When the host
+is not keeping up, new records are dropped and the number lost is reported in a
+``LOST`` record once there is room again.  ``tools/telemetry_decode.py`` turns the
+stream back into readable logs and rate statistics.
+
+.. note::
+
+   The data channel has to be enabled in ``boot.py`` with
+   ``usb_cdc.enable(console=True, data=True)``.
+"""
+
+import struct
+import time
+
+RECORD_FORMAT = "<BBHI"
+"""Record layout: kind, index, value, timestamp (microseconds, wrapping)."""
+
+RECORD_SIZE = struct.calcsize(RECORD_FORMAT)
+"""Size of one record in bytes."""
+
+INPUT = 0xA1
+"""A button changed state.  ``index`` is the button, ``value`` is ``1`` if pressed."""
+
+REPORT = 0xA2
+"""A report was handed to the queue.  ``value`` is ``1`` if it was sent straight
+away, ``0`` if it had to wait for a retry.  ``index`` is the report ID."""
+
+LOOP = 0xA3
+"""Time spent in one ``Joystick.update()``, in microseconds (capped at 65535)."""
+
+LOST = 0xA4
+"""Records dropped because the ring buffer was full (capped at 65535)."""
+
+OVERRUN = 0xA5
+"""A loop iteration exceeded its time budget.  ``value`` is its length in
+microseconds (capped at 65535)."""
+
+FAULT = 0xA6
+"""An input was bypassed by ``telephony.health``.  ``index`` is the button (or
+watched input), ``value`` is ``1`` for chatter, ``2`` for stuck, ``0`` recovered."""
+
+PHASE = 0xA7
+"""A startup phase ended.  ``index`` is its position in ``profiler.PHASES`` (or
+``profiler.OTHER_PHASE``), ``value`` its finish time in milliseconds since power-on."""
+
+RESTART = 0xA8
+"""Sent once at start-up when an overrun summary survived the last reset (see
+``telephony.supervisor``).  ``index`` is the summary's reason, plus ``0x80`` if the
+watchdog caused the reset; ``value`` is the overruns counted before it."""
+
+
+class Telemetry:
+    """Non-blocking binary telemetry stream with a preallocated ring buffer."""
+
+    def __init__(self, serial=None, records: int = 128) -> None:
+        """
+        Create a telemetry stream.
+
+        :param serial: The ``usb_cdc.Serial`` to write to.  (Defaults to
+            ``usb_cdc.data``)
+        :type serial: usb_cdc.Serial, optional
+        :param records: The ring buffer size, in records.  (Defaults to ``128``)
+        :type records: int, optional
+        :raises ValueError: If no serial channel is available.
+        """
+        if serial is None:
+            import usb_cdc  # type: ignore (this is a CircuitPython built-in)
+
+            serial = usb_cdc.data
+        if serial is None:
+            raise ValueError("usb_cdc data channel is not enabled - check boot.py.")
+
+        serial.write_timeout = 0
+        self._serial = serial
+        self._size = RECORD_SIZE
+        self._ring = bytearray(records * self._size)
+        self._view = memoryview(self._ring)
+        self._head = 0  # next byte to write out
+        self._count = 0  # bytes waiting in the ring
+        self._lost = 0
+
+        self.dropped = 0
+        """Total records dropped because the ring buffer was full."""
+
+    def record(self, kind: int, index: int = 0, value: int = 0) -> bool:
+        """
+        Add a record to the ring buffer.
+
+        :param kind: ``INPUT``, ``REPORT``, ``LOOP``, ``LOST`` or ``OVERRUN``.
+        :type kind: int
+        :param index: An input index or report ID, ``0`` to ``255``.
+            (Defaults to ``0``)
+        :type index: int, optional
+        :param value: ``0`` to ``65535``; larger values are capped.
+            (Defaults to ``0``)
+        :type value: int, optional
+        :return: ``True`` if the record was stored, ``False`` if it was dropped.
+        :rtype: bool
+        """
+        free = len(self._ring) - self._count
+        if self._lost:
+            if free < 2 * self._size:
+                self._lost += 1
+                self.dropped += 1
+                return False
+            lost = self._lost
+            self._lost = 0
+            self._store(LOST, 0, lost)
+        elif free < self._size:
+            self._lost += 1
+            self.dropped += 1
+            return False
+        self._store(kind, index, value)
+        return True
+
+    def flush(self) -> int:
+        """
+        Write as much of the ring buffer as the host will take without waiting.
+
+        :return: The number of bytes still waiting in the ring buffer.
+        :rtype: int
+        """
+        if not self._count or not self._serial.connected:
+            return self._count
+
+        # write up to the end of the ring, then wrap on the next call
+        end = min(self._head + self._count, len(self._ring))
+        written = self._serial.write(self._view[self._head : end]) or 0
+        self._head = (self._head + written) % len(self._ring)
+        self._count -= written
+        return self._count
+
+    def _store(self, kind: int, index: int, value: int) -> None:
+        """Pack one record at the tail of the ring buffer."""
+        tail = (self._head + self._count) % len(self._ring)
+        struct.pack_into(
+            RECORD_FORMAT,
+            self._ring,
+            tail,
+            kind,
+            index & 0xFF,
+            min(value, 0xFFFF),
+            (time.monotonic_ns() // 1000) & 0xFFFFFFFF,
+        )
+        self._count += self._size
@@ -0,0 +1,204 @@
+"""
+Non-blocking tone sequencer for a piezo buzzer, driven by the host's Ring LED.
+
+This module provides a ``ToneSequencer`` that plays precompiled note tables on a
+``pwmio.PWMOut`` by checking ``time.monotonic_ns()`` once per loop, never sleeping,
+and a ``Ringer`` that starts and stops it when the host sets or clears the Ring
+usage of the LED output report.  Input scanning carries on at full rate while the
+buzzer rings.
+
+.. code::
+
+   ringer = Ringer(js, ToneSequencer(board.GP15))
+
+   while True:
+       js.update()
+       ringer.update()
+"""
+
+import time
+from array import array
+
+# These typing imports help during development in vscode but fail in CircuitPython
+try:
+    from typing import Optional, Sequence, Tuple
+except ImportError:
+    pass
+
+from telephony.hid import LED_RING
+
+
+class Tune:
+    """A note table compiled into flat arrays, ready for ``ToneSequencer``."""
+
+    def __init__(self, notes: Sequence[Tuple[int, int]]) -> None:
+        """
+        Compile ``(frequency, duration)`` pairs.
+
+        :param notes: Frequency in Hz (``0`` for a rest) and duration in
+            milliseconds of each note, in order.
+        :type notes: Sequence[Tuple[int, int]]
+        :raises ValueError: If the table is empty or a note has no duration.
+        """
+        if not notes:
+            raise ValueError("A tune needs at least one note.")
+        self.frequency = array("H", [f for f, _ in notes])
+        """Frequency of each note in Hz, ``0`` for a rest."""
+
+        self.duration_ms = array("H", [d for _, d in notes])
+        """Length of each note in milliseconds."""
+
+        if min(self.duration_ms) == 0:
+            raise ValueError("Every note needs a duration.")
+
+    def __len__(self) -> int:
+        """Return the number of notes."""
+        return len(self.frequency)
+
+
+RING = Tune(((1000, 25), (1250, 25)) * 20 + ((0, 2000),))
+"""A one-second warble then two seconds of silence, like a desk phone's ringer."""
+
+BEEP = Tune(((2000, 80), (0, 80), (2000, 80)))
+"""A short double beep."""
+
+
+class ToneSequencer:
+    """Play ``Tune`` tables on a PWM pin without blocking the input loop."""
+
+    @property
+    def playing(self) -> bool:
+        """
+        Determine if a tune is playing.
+
+        :return: ``True`` from ``play()`` until ``stop()`` or the end of a
+            non-repeating tune.
+        :rtype: bool
+        """
+        return self._tune is not None
+
+    def __init__(self, pin, volume: float = 0.5) -> None:
+        """
+        Drive a piezo buzzer from a PWM-capable pin.
+
+        :param pin: The pin the buzzer is connected to (i.e. ``board.GP15``).
+        :type pin: microcontroller.Pin
+        :param volume: Duty cycle while a note sounds, from ``0`` to ``0.5``; a
+            piezo is loudest at ``0.5``.  (Defaults to ``0.5``)
+        :type volume: float, optional
+        """
+        import pwmio  # type: ignore (this is a CircuitPython built-in)
+
+        self._pwm = pwmio.PWMOut(
+            pin, frequency=440, duty_cycle=0, variable_frequency=True
+        )
+        self._duty = int(min(max(volume, 0), 0.5) * 65535)
+        self._tune = None
+        self._repeat = False
+        self._index = 0
+        self._frequency = 0
+        self._next = 0
+
+    def play(self, tune: Tune, repeat: bool = True) -> None:
+        """
+        Start a tune from its first note, replacing whatever is playing.
+
+        :param tune: The notes to play.
+        :type tune: Tune
+        :param repeat: Loop until ``stop()``.  (Defaults to ``True``)
+        :type repeat: bool, optional
+        """
+        self._tune = tune
+        self._repeat = repeat
+        self._index = 0
+        now = time.monotonic_ns()
+        self._sound(now)
+
+    def stop(self) -> None:
+        """Silence the buzzer straight away."""
+        self._tune = None
+        self._frequency = 0
+        self._pwm.duty_cycle = 0
+
+    def update(self) -> None:
+        """Move on to the next note once the current one is over.  Call every loop."""
+        if self._tune is None:
+            return
+        now = time.monotonic_ns()
+        if now < self._next:
+            return
+
+        self._index += 1
+        if self._index >= len(self._tune):
+            if not self._repeat:
+                self.stop()
+                return
+            self._index = 0
+        if now - self._next >= self._tune.duration_ms[self._index] * 1000000:
+            # the loop stalled for longer than a note; restart timing from now
+            self._sound(now)
+        else:
+            # stay on the note grid, so short loop delays don't stretch the tune
+            self._sound(self._next)
+
+    def deinit(self) -> None:
+        """Release the PWM pin."""
+        self.stop()
+        self._pwm.deinit()
+
+    def _sound(self, start: int) -> None:
+        """Set the PWM for the current note, which began at ``start``."""
+        tune = self._tune
+        frequency = tune.frequency[self._index]
+        if frequency:
+            if frequency != self._frequency:
+                self._pwm.frequency = frequency
+            self._pwm.duty_cycle = self._duty
+        else:
+            self._pwm.duty_cycle = 0
+        self._frequency = frequency
+        self._next = start + tune.duration_ms[self._index] * 1000000
+
+
+class Ringer:
+    """Ring a buzzer while the host sets the Ring LED usage."""
+
+    def __init__(
+        self, joystick, sequencer: ToneSequencer, tune: Optional[Tune] = None
+    ) -> None:
+        """
+        Follow the host's Ring LED with a ``ToneSequencer``.
+
+        Call ``update()`` once per loop, after ``Joystick.update()``.
+
+        :param joystick: The joystick that receives the host's output reports.  It
+            must be created with ``create_joystick(leds=True)`` in ``boot.py``, or
+            use a profile with LEDs.
+        :type joystick: Joystick
+        :param sequencer: The buzzer to ring.
+        :type sequencer: ToneSequencer
+        :param tune: The ring tone.  (Defaults to ``RING``)
+        :type tune: Tune, optional
+        """
+        self._joystick = joystick
+        self._seen = joystick.host_reports
+        self._tune = tune or RING
+
+        self.sequencer = sequencer
+        """The buzzer being rung."""
+
+        self.ringing = False
+        """The Ring state last reported by the host."""
+
+    def update(self) -> None:
+        """Start or stop ringing on a new host report, and advance the tone."""
+        if self._joystick.host_reports != self._seen:
+            self._seen = self._joystick.host_reports
+            ring = (self._joystick.host_report[0] >> LED_RING) & 1 == 1
+            if ring != self.ringing:
+                self.ringing = ring
+                if ring:
+                    self.sequencer.play(self._tune)
+                else:
+                    self.sequencer.stop()
+        self.sequencer.update()
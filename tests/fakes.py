@@ -0,0 +1,127 @@
+"""
+Fakes for the CircuitPython built-ins, shared by the host tests.
+
+``install()`` puts them in ``sys.modules``; call it before importing anything from
+``telephony``.  Each fake only does what the tests need, but keeps the behaviour
+of the real module that matters here (i.e. a pin can only be claimed once).
+"""
+
+import sys
+import types
+
+LEVELS = dict()
+"""Level read by a ``DigitalInOut`` on each pin number; pins default to high."""
+
+CLAIMED = set()
+"""Pin numbers currently claimed by a ``DigitalInOut`` or ``keypad.Keys``."""
+
+
+class Pin:
+    def __init__(self, n):
+        self.n = n
+
+
+def _claim(pin):
+    if pin.n in CLAIMED:
+        raise ValueError("GP%d in use" % pin.n)
+    CLAIMED.add(pin.n)
+
+
+class DigitalInOut:
+    def __init__(self, pin):
+        _claim(pin)
+        self._pin = pin
+        self.direction = 0
+        self.pull = None
+
+    @property
+    def value(self):
+        return LEVELS.get(self._pin.n, True)
+
+    def deinit(self):
+        CLAIMED.discard(self._pin.n)
+
+
+class Event:
+    def __init__(self, key_number=0, pressed=True):
+        self.key_number = key_number
+        self.pressed = pressed
+
+
+class EventQueue:
+    def __init__(self):
+        self.queued = list()
+        self.overflowed = False
+
+    def get_into(self, event):
+        if not self.queued:
+            return False
+        event.pressed = self.queued.pop(0)
+        return True
+
+    def clear(self):
+        self.queued = list()
+        self.overflowed = False
+
+
+class Keys:
+    def __init__(
+        self, pins, value_when_pressed, pull=True, interval=0.02, max_events=64
+    ):
+        for pin in pins:
+            _claim(pin)
+        self._pins = pins
+        self.events = EventQueue()
+
+    def reset(self):
+        pass
+
+    def deinit(self):
+        for pin in self._pins:
+            CLAIMED.discard(pin.n)
+
+
+class Device:
+    """A ``usb_hid.Device`` that keeps its arguments and the reports sent to it."""
+
+    def __init__(self, **kwargs):
+        self.usage_page = 0x0B
+        self.usage = 0x05
+        self.sent = list()
+        self.host = None
+        self.__dict__.update(kwargs)
+
+    def send_report(self, report, report_id=None):
+        self.sent.append(bytes(report))
+
+    def get_last_received_report(self, report_id=None):
+        report, self.host = self.host, None
+        return report
+
+
+def install():
+    """Put the fakes in ``sys.modules``, once."""
+    if "usb_hid" in sys.modules:
+        return
+    digitalio = types.ModuleType("digitalio")
+    digitalio.DigitalInOut = DigitalInOut
+    digitalio.Direction = types.SimpleNamespace(INPUT=0, OUTPUT=1)
+    digitalio.Pull = types.SimpleNamespace(UP=1, DOWN=2)
+    microcontroller = types.ModuleType("microcontroller")
+    microcontroller.Pin = Pin
+    microcontroller.nvm = bytearray(4096)
+    keypad = types.ModuleType("keypad")
+    keypad.Keys = Keys
+    keypad.Event = Event
+    usb_hid = types.ModuleType("usb_hid")
+    usb_hid.Device = Device
+    usb_hid.devices = ()
+    for module in (digitalio, microcontroller, keypad, usb_hid):
+        sys.modules[module.__name__] = module
+
+
+def device():
+    """Make a fresh joystick device the only one ``usb_hid`` has enabled."""
+    hid = Device()
+    sys.modules["usb_hid"].devices = (hid,)
+    return hid
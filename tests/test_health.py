@@ -0,0 +1,77 @@
+"""
+Host tests for ``telephony.health``, run with ``python -m pytest`` from the repo root.
+
+The CircuitPython built-ins are replaced by small fakes, and the clock the monitor
+reads is moved forward by hand so a held input turns stuck straight away.
+"""
+
+import time
+import unittest
+from unittest import mock
+
+import fakes
+
+fakes.install()
+
+from telephony.health import STUCK, HealthMonitor  # noqa: E402
+from telephony.inputs import Button, VirtualInput  # noqa: E402
+from telephony.joystick import Joystick  # noqa: E402
+from telephony.mute import MuteControl  # noqa: E402
+
+
+class _Clock:
+    def __init__(self):
+        self.now = time.monotonic_ns()
+
+    def monotonic_ns(self):
+        return self.now
+
+
+class MuteOutputTest(unittest.TestCase):
+    def setUp(self):
+        self.device = fakes.device()
+        self.js = Joystick(buttons=2)
+        physical = Button(VirtualInput(False), active_low=False)
+        self.mute = MuteControl(self.js, physical, mode=MuteControl.ON_OFF)
+        self.addCleanup(self.mute.deinit)
+        self.js.add_input(self.mute.output)
+        self.clock = _Clock()
+        patcher = mock.patch("telephony.health.time", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _hold_mute(self, health):
+        # muted from the call app: ON_OFF holds the Phone Mute bit high meanwhile
+        self.device.host = bytes((1,))
+        self.js.update()
+        self.js.update()
+        self.assertTrue(self.mute.output.pressed)
+        health.update()
+        self.clock.now += 2000000000
+        health.update()
+
+    def test_held_mute_output_counts_as_stuck(self):
+        # without the exclusion the monitor fights MuteControl
+        health = HealthMonitor(self.js, window_ms=1000, stuck_ms=1000)
+        self._hold_mute(health)
+        self.assertEqual(health.faulted(), [(0, STUCK)])
+        self.assertTrue(self.mute.output.bypass)
+
+    def test_excluded_mute_output_is_left_alone(self):
+        health = HealthMonitor(self.js, window_ms=1000, stuck_ms=1000)
+        health.exclude(0)
+        self._hold_mute(health)
+        self.assertEqual(health.faulted(), [])
+        self.assertFalse(self.mute.output.bypass)
+        self.assertEqual(self.device.sent[-1], b"\x01")
+
+    def test_exclude_lifts_an_existing_bypass(self):
+        health = HealthMonitor(self.js, window_ms=1000, stuck_ms=1000)
+        self._hold_mute(health)
+        health.exclude(0)
+        self.assertEqual(health.faulted(), [])
+        self.assertFalse(self.mute.output.bypass)
+
+
+if __name__ == "__main__":
+    unittest.main()
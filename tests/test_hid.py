@@ -0,0 +1,79 @@
+"""
+Host tests for ``telephony.hid``, run with ``python -m pytest`` from the repo root.
+
+``usb_hid`` is replaced by a fake that keeps the arguments each device was created
+with, so the generated descriptor can be parsed back and checked against them.
+"""
+
+import contextlib
+import io
+import unittest
+
+import fakes
+
+fakes.install()
+
+from telephony.descriptor import (  # noqa: E402
+    INPUT,
+    OUTPUT,
+    parse_descriptor,
+    report_lengths,
+)
+from telephony.hid import create_joystick  # noqa: E402
+from telephony.profiles import JOYSTICK, TELEPHONY, TELEPHONY_KEYBOARD  # noqa: E402
+
+
+def _create(**kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return create_joystick(**kwargs)
+
+
+def _buttons(fields):
+    """Return ``(report ID, bit, usage page, usage)`` for every input button."""
+    found = list()
+    for f in fields:
+        if f.kind == INPUT and not f.constant:
+            for n in range(f.count):
+                bit = f.offset + n * f.size
+                found.append((f.report_id, bit, f.usage_page, f.usage(n)))
+    return found
+
+
+class CreateJoystickTest(unittest.TestCase):
+    def test_descriptor_matches_report_lengths(self):
+        for buttons in (1, 2, 3, 8, 9, 16, 127, 128, 129, 300, 1024):
+            for leds in (False, True):
+                device = _create(buttons=buttons, leds=leds)
+                fields = parse_descriptor(device.report_descriptor)
+                lengths = report_lengths(fields)
+                for report_id, length in zip(
+                    device.report_ids, device.in_report_lengths
+                ):
+                    self.assertEqual(lengths.get(report_id), length, (buttons, leds))
+                outputs = report_lengths(fields, OUTPUT)
+                self.assertEqual(
+                    outputs.get(device.report_ids[0], 0),
+                    device.out_report_lengths[0],
+                )
+
+    def test_every_button_has_its_own_usage(self):
+        device = _create(buttons=300)
+        found = _buttons(parse_descriptor(device.report_descriptor))
+        self.assertEqual(len(found), 300)
+        self.assertEqual(found[0][2:], (0x0B, 0x2F))  # Phone Mute
+        self.assertEqual(found[1][2:], (0x0B, 0x20))  # Hook Switch
+        generic = [usage for _, _, page, usage in found[2:] if page == 0x09]
+        self.assertEqual(generic, list(range(1, 299)))
+
+    def test_profiles_match_create_joystick(self):
+        for profile in (TELEPHONY, TELEPHONY_KEYBOARD, JOYSTICK):
+            device = _create(buttons=profile.buttons, leds=profile.leds)
+            self.assertEqual(
+                _buttons(parse_descriptor(profile.descriptor)),
+                _buttons(parse_descriptor(device.report_descriptor)),
+                profile.name,
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
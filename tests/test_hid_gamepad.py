@@ -0,0 +1,111 @@
+"""
+Host tests for ``lib/hid_gamepad.py``, run with ``python -m pytest`` from the repo root.
+
+Every report is decoded with ``telephony.descriptor`` against the descriptor
+``LayoutGamepad.report_descriptor()`` built for the same layout, so the packer and
+the descriptor are checked against each other.  ``adafruit_hid`` only ships as
+``.mpy`` files, so its ``find_device`` is replaced by a fake.
+"""
+
+import os
+import sys
+import types
+import unittest
+
+import fakes
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, "lib"))
+
+
+def _find_device(devices, *, usage_page, usage):
+    if hasattr(devices, "send_report"):
+        devices = [devices]
+    for device in devices:
+        if device.usage_page == usage_page and device.usage == usage:
+            return device
+    raise ValueError("Could not find matching HID device.")
+
+
+adafruit_hid = types.ModuleType("adafruit_hid")
+adafruit_hid.find_device = _find_device
+sys.modules.setdefault("adafruit_hid", adafruit_hid)
+
+from hid_gamepad import LayoutGamepad  # noqa: E402
+
+from telephony.descriptor import (  # noqa: E402
+    decode_report,
+    parse_descriptor,
+    report_lengths,
+)
+
+_BUTTONS = 3
+_WIDTHS = (12, 5, 16, 2)
+"""Axes that straddle bytes, a full 16-bit one and the narrowest allowed."""
+
+_X, _Y, _Z, _RZ = 0x30, 0x31, 0x32, 0x35
+
+
+class LayoutGamepadTest(unittest.TestCase):
+    def setUp(self):
+        self.device = fakes.Device(usage_page=0x01, usage=0x05)
+        self.gamepad = LayoutGamepad(
+            self.device, buttons=_BUTTONS, axes=len(_WIDTHS), axis_bits=_WIDTHS
+        )
+        self.fields = parse_descriptor(
+            LayoutGamepad.report_descriptor(_BUTTONS, len(_WIDTHS), _WIDTHS)
+        )
+
+    def _decoded(self):
+        report = self.device.sent[-1]
+        return {usage: value for _, usage, value in decode_report(self.fields, report)}
+
+    def test_descriptor_matches_report(self):
+        length = len(self.gamepad._report)
+        self.assertEqual(length, (8 + sum(_WIDTHS) + 7) // 8)
+        self.assertEqual(report_lengths(self.fields), {0: length})
+        with_id = parse_descriptor(
+            LayoutGamepad.report_descriptor(_BUTTONS, len(_WIDTHS), _WIDTHS, 4)
+        )
+        self.assertEqual(report_lengths(with_id), {4: length})
+
+        axes = [f for f in self.fields if f.usage_page == 0x01 and not f.constant]
+        self.assertEqual([f.size for f in axes], list(_WIDTHS))
+        for f, bits in zip(axes, _WIDTHS):
+            limit = (1 << (bits - 1)) - 1
+            self.assertEqual((f.logical_min, f.logical_max), (-limit, limit))
+
+    def test_axes_round_trip(self):
+        for values in ((2047, -15, 32767, 1), (-2047, 15, -32767, -1), (1, -1, 0, 0)):
+            self.gamepad.move_axes(*values)
+            decoded = self._decoded()
+            self.assertEqual([decoded[u] for u in (_X, _Y, _Z, _RZ)], list(values))
+        with self.assertRaises(ValueError):
+            self.gamepad.move_axes(2048)
+
+    def test_update_axis_leaves_neighbours_alone(self):
+        # every bit around the Y axis set: buttons pressed, neighbours at -1
+        self.gamepad.press_buttons(1, 2, 3)
+        self.gamepad.move_axes(-1, -1, -1, -1)
+        self.gamepad.update_axis(1, 0)
+        self.gamepad.update_axis(3, 1)
+        self.gamepad.send()
+        decoded = self._decoded()
+        self.assertEqual([decoded[u] for u in (1, 2, 3)], [1, 1, 1])
+        self.assertEqual([decoded[u] for u in (_X, _Y, _Z, _RZ)], [-1, 0, -1, 1])
+
+    def test_none_keeps_axis(self):
+        self.gamepad.move_axes(100, -10, 1000, 1)
+        sent = len(self.device.sent)
+        self.gamepad.move_axes(None, 5)
+        decoded = self._decoded()
+        self.assertEqual([decoded[u] for u in (_X, _Y, _Z, _RZ)], [100, 5, 1000, 1])
+
+        # nothing changed: no report
+        self.gamepad.move_axes(None, None, None, None)
+        self.assertEqual(len(self.device.sent), sent + 1)
+        with self.assertRaises(ValueError):
+            self.gamepad.move_axes(None, None, None, None, None)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+"""
+Host tests for ``telephony.inputs``, run with ``python -m pytest`` from the repo root.
+
+The CircuitPython built-ins are replaced by small fakes.  ``keypad`` events are
+queued by hand, to stand in for edges the hardware latched between two scans.
+"""
+
+import unittest
+
+import fakes
+
+fakes.install()
+
+from telephony.inputs import Button, EdgeCounter  # noqa: E402
+from telephony.joystick import Joystick  # noqa: E402
+
+
+class EdgeCounterTest(unittest.TestCase):
+    def _button(self):
+        button = Button(fakes.Pin(5), count_edges=True)
+        self.addCleanup(button.deinit)
+        return button
+
+    def test_pulses_between_scans_are_replayed(self):
+        device = fakes.device()
+        js = Joystick(buttons=2)
+        button = self._button()
+        self.assertIsInstance(button._source, EdgeCounter)
+        js.add_input(button)
+        js.update()
+        before = len(device.sent)
+        events = js.events.cursor()
+
+        # a tap that starts and ends between two scans never shows as a level
+        button._source._keys.events.queued.extend((True, False, True, False))
+        js.update()
+        self.assertFalse(button.pressed)
+        self.assertEqual(device.sent[before:], [b"\x01", b"\x00"] * 2)
+        self.assertEqual(js.recovered_edges, 4)
+        edges = list()
+        while events.next():
+            edges.append((events.index, events.pressed))
+        self.assertEqual(edges, [(0, True), (0, False)] * 2)
+
+    def test_level_follows_last_edge(self):
+        button = self._button()
+        queue = button._source._keys.events
+        self.assertFalse(button.read())
+        queue.queued.append(True)
+        self.assertTrue(button.read())
+        queue.queued.append(False)
+        self.assertFalse(button.read())
+
+    def test_short_pulse_is_latched(self):
+        button = self._button()
+        queue = button._source._keys.events
+        queue.queued.extend((True, False))
+        self.assertFalse(button.read())
+        self.assertEqual(button.take_pulses(), 1)
+        self.assertEqual(button.take_pulses(), 0)
+
+    def test_overflow_resynchronises(self):
+        button = self._button()
+        queue = button._source._keys.events
+        queue.queued.append(True)
+        button.read()
+        queue.overflowed = True
+        self.assertFalse(button.read())
+        self.assertFalse(queue.overflowed)
+
+
+if __name__ == "__main__":
+    unittest.main()
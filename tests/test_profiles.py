@@ -0,0 +1,74 @@
+"""
+Host tests for ``telephony.profiles``, run with ``python -m pytest`` from the repo root.
+
+The CircuitPython built-ins are replaced by small fakes.  A pin is held by setting
+its level low in ``fakes.LEVELS``, and NVM is a blank ``bytearray``.
+"""
+
+import os
+import unittest
+from unittest import mock
+
+import fakes
+
+fakes.install()
+
+import microcontroller  # noqa: E402
+
+from telephony.inputs import Button  # noqa: E402
+from telephony.profiles import (  # noqa: E402
+    JOYSTICK,
+    TELEPHONY,
+    TELEPHONY_KEYBOARD,
+    active,
+    select,
+)
+
+_KEYBOARD_PIN = fakes.Pin(8)
+_JOYSTICK_PIN = fakes.Pin(9)
+_HELD = ((_KEYBOARD_PIN, TELEPHONY_KEYBOARD), (_JOYSTICK_PIN, JOYSTICK))
+
+
+class SelectTest(unittest.TestCase):
+    def setUp(self):
+        microcontroller.nvm[:] = bytes(len(microcontroller.nvm))
+        fakes.LEVELS.clear()
+        self.addCleanup(fakes.LEVELS.clear)
+        environ = mock.patch.dict(os.environ)
+        environ.start()
+        self.addCleanup(environ.stop)
+        os.environ.pop("TELEPHONY_PROFILE", None)
+
+    def test_held_button_picks_and_remembers_profile(self):
+        fakes.LEVELS[_JOYSTICK_PIN.n] = False
+        self.assertIs(select(held=_HELD), JOYSTICK)
+        self.assertIs(active(), JOYSTICK)
+
+        # released on the next boot: the stored choice is kept
+        fakes.LEVELS.clear()
+        self.assertIs(select(held=_HELD), JOYSTICK)
+
+    def test_pins_are_released_for_code_py(self):
+        fakes.LEVELS[_KEYBOARD_PIN.n] = False
+        self.assertIs(select(held=_HELD), TELEPHONY_KEYBOARD)
+        self.assertFalse(fakes.CLAIMED)
+        for pin in (_KEYBOARD_PIN, _JOYSTICK_PIN):
+            button = Button(pin)
+            self.addCleanup(button.deinit)
+
+    def test_settings_then_default(self):
+        os.environ["TELEPHONY_PROFILE"] = "keyboard"
+        self.assertIs(select(held=_HELD), TELEPHONY_KEYBOARD)
+        # a held button still wins over settings.toml
+        fakes.LEVELS[_JOYSTICK_PIN.n] = False
+        self.assertIs(select(held=_HELD), JOYSTICK)
+
+        microcontroller.nvm[:] = bytes(len(microcontroller.nvm))
+        fakes.LEVELS.clear()
+        del os.environ["TELEPHONY_PROFILE"]
+        self.assertIs(select(held=_HELD), TELEPHONY)
+        self.assertIs(active(JOYSTICK), TELEPHONY)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+"""
+Host tests for ``telephony.report``, run with ``python -m pytest`` from the repo root.
+
+The ``usb_hid.Device`` is a fake that can be made busy, and the clock the retry
+backoff reads is replaced so the tests control time.
+"""
+
+import unittest
+from unittest import mock
+
+from telephony.report import ReportQueue
+
+
+class _Device:
+    def __init__(self):
+        self.busy = False
+        self.sent = list()
+        self.attempts = 0
+
+    def send_report(self, report, report_id=None):
+        self.attempts += 1
+        if self.busy:
+            raise OSError("USB busy")
+        self.sent.append((report_id, bytes(report)))
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0
+
+    def monotonic_ns(self):
+        return self.now
+
+
+class ReportQueueTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = _Clock()
+        patcher = mock.patch("telephony.report.time", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.device = _Device()
+
+    def test_full_queue_refuses_without_waiting(self):
+        queue = ReportQueue(self.device, size=2, max_length=1)
+        self.device.busy = True
+        queue.send(b"\x01")  # press, queued
+        queue.send(b"\x00")  # release, cannot merge into the press
+        attempts = self.device.attempts
+        with self.assertRaises(OSError):
+            queue.send(b"\x01")
+        # refused at once: no retries against the busy device, no time spent
+        self.assertEqual(self.device.attempts, attempts)
+        self.assertEqual(queue.refused, 1)
+        self.assertEqual(queue.pending, 2)
+
+        # once the host catches up the queued edges go out in order
+        self.device.busy = False
+        self.clock.now += 1000000000
+        self.assertEqual(queue.flush(), 0)
+        self.assertEqual(self.device.sent, [(None, b"\x01"), (None, b"\x00")])
+
+    def test_coalesce_keeps_press_release_pairs(self):
+        queue = ReportQueue(self.device, size=4, max_length=1)
+        self.device.busy = True
+        queue.send(b"\x01", 3)  # button 0 pressed
+        queue.send(b"\x00", 3)  # and released: merging would hide the press
+        self.assertEqual(queue.pending, 2)
+        self.assertEqual(queue.coalesced, 0)
+
+        queue.send(b"\x02", 3)  # button 1 pressed: no bit flips twice, so merge
+        self.assertEqual(queue.pending, 2)
+        self.assertEqual(queue.coalesced, 1)
+
+        queue.send(b"\x01", 4)  # another report ID is never merged
+        self.assertEqual(queue.pending, 3)
+
+        self.device.busy = False
+        self.clock.now += 1000000000
+        queue.flush()
+        self.assertEqual(
+            self.device.sent, [(3, b"\x01"), (3, b"\x02"), (4, b"\x01")]
+        )
+
+    def test_backoff_doubles_up_to_the_limit(self):
+        queue = ReportQueue(
+            self.device, size=2, max_length=1, backoff_ms=1, max_backoff_ms=4
+        )
+        self.device.busy = True
+        queue.send(b"\x01")
+        delays = list()
+        for _ in range(4):
+            start = self.clock.now
+            # no attempt is made before the backoff has elapsed
+            attempts = self.device.attempts
+            queue.flush()
+            self.assertEqual(self.device.attempts, attempts)
+            self.clock.now = queue._retry_at
+            queue.flush()
+            self.assertEqual(self.device.attempts, attempts + 1)
+            delays.append((self.clock.now - start) // 1000000)
+        self.assertEqual(delays, [1, 2, 4, 4])
+        self.assertEqual(queue.retried, 5)
+
+        # a delivery resets the backoff
+        self.device.busy = False
+        self.clock.now = queue._retry_at
+        queue.flush()
+        self.assertEqual(queue._backoff, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
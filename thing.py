@@ -1,20 +1,90 @@
-import board
-from telephony.inputs import Button
-from telephony.joystick import Joystick
-joystick = Joystick()
+import os
+import time
 
-joystick.add_input(
-    Button(board.GP4),
-    Button(board.GP5),
-)
+from telephony import profiler  # first, so it timestamps the start of code.py
+from telephony.config import Config
+from telephony.health import HealthMonitor
+from telephony.mute import MuteControl
+from telephony.profiles import active
+from telephony.supervisor import Supervisor
+from telephony.telemetry import Telemetry
+profiler.mark("imports")
+
+# the profile boot.py enabled, so no boot_out.txt read before the first report
+joystick = active().joystick()
+
+# binary telemetry on the data port boot.py enables (see tools/telemetry_decode.py)
+try:
+    joystick.telemetry = Telemetry()
+except ValueError:
+    pass
+if os.getenv("TELEPHONY_PROFILE_BOOT") and joystick.telemetry is not None:
+    profiler.send(joystick.telemetry)
+
+# pins and timing come from settings.toml, and are re-applied when it changes
+config = Config()
+config.apply(joystick)
+
+# reset through the watchdog if the loop wedges; the summary from before a reset
+# goes out as a RESTART telemetry record
+supervisor = Supervisor(joystick, budget_ms=5)
+
+# bypass a chattering or stuck switch instead of letting it hold mute forever; each
+# fault goes out as a FAULT telemetry record
+health = HealthMonitor(joystick)
+
+tasks = (health.update,)
+
+
+def follow_mute(previous):
+    """Put a MuteControl between button 0 (Phone Mute) and the report."""
+    if previous is not None:
+        previous.deinit()
+    control = MuteControl(joystick, joystick.button[0])
+    joystick.replace_input(0, control.output)
+    return control
+
+
+# keep the mute button in step with the call app's mute (profiles with LEDs)
+mute = follow_mute(None) if active().leds and joystick.button else None
+# run ahead of Joystick.update(), inside the supervised iteration
+before = () if mute is None else (mute.update,)
+if mute is not None:
+    # MuteControl holds its output down on purpose; it is not a stuck switch
+    health.exclude(0)
+
+# ring a piezo on this pin while the host sets the Ring LED (profiles with LEDs)
+if os.getenv("TELEPHONY_BUZZER"):
+    import board
+    from telephony.tones import Ringer, ToneSequencer
+
+    buzzer = ToneSequencer(getattr(board, os.getenv("TELEPHONY_BUZZER")))
+    tasks += (Ringer(joystick, buzzer).update,)
 
 #while True:
 #    joystick.update()
 
+# follow button edges without reading .value, which would upset the joystick's scan
+changes = joystick.events.cursor()
+
+next_scan = time.monotonic_ns()
 while True:
-    joystick.update()
+    supervisor.run_once(*tasks, before=before)
+    if config.poll(joystick) and mute is not None:
+        if joystick.button[0] is not mute.output:
+            # settings.toml moved the mute button; wrap the new one
+            mute = follow_mute(mute)
+            before = (mute.update,)
     #if the value of the button changes, print the value
-    button = joystick.button[0]
-    if button.value != joystick._last_report[0]:
-        print("Button changed to", button.value)
+    while changes.next():
+        if changes.index == 0:
+            print("Button changed to", changes.pressed)
 
+    # hold the configured scan rate, if there is one, by sleeping off the rest
+    next_scan += config.scan_period_ns
+    remaining = next_scan - time.monotonic_ns()
+    if remaining > 0:
+        time.sleep(remaining / 1000000000)
+    else:
+        # running late (or unlimited); don't try to catch up
+        next_scan = time.monotonic_ns()
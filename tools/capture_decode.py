@@ -0,0 +1,492 @@
+"""
+Host-side bulk decoder and statistics for captured report streams.
+
+This runs on the desktop, not on the board, and needs NumPy (``pip install numpy``).
+It compiles a report descriptor into a column layout once, then decodes a whole
+capture (a hidraw dump, a usbmon text log or a timestamped trace) with array-wide
+bit operations instead of one ``decode_report`` call per report.  From the decoded
+columns it works out report rates, inter-report gaps and how long every button was
+held.
+
+.. code::
+
+   python -m tools.capture_decode dump.bin --telephony --interval-us 1000
+   python -m tools.capture_decode usbmon.txt --format usbmon --profile joystick
+   python -m tools.capture_decode trace.bin --format timed \\
+       --descriptor /sys/class/hidraw/hidraw3/device/report_descriptor
+
+Capture formats:
+
+- ``raw``: reports back to back, as read from ``/dev/hidraw*``.  There are no
+  timestamps, so times are only known if ``--interval-us`` gives the polling
+  interval.
+- ``timed``: each report preceded by its time in microseconds, as an unsigned 64-bit
+  little-endian integer.
+- ``usbmon``: the text interface of Linux ``usbmon``
+  (``/sys/kernel/debug/usb/usbmon/<bus>u``); completed interrupt IN transfers are
+  taken as reports.
+
+The descriptor of a board running ``create_joystick()`` can be read from sysfs, as
+above, since the host sees exactly the descriptor it built.
+"""
+
+import argparse
+import sys
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from telephony.descriptor import (
+    INPUT,
+    TELEPHONY_REPORT_DESCRIPTOR,
+    parse_descriptor,
+    report_lengths,
+)
+
+NAMES = {
+    (0x0B, 0x20): "hook_switch",
+    (0x0B, 0x21): "flash",
+    (0x0B, 0x2F): "phone_mute",
+    (0x0C, 0xE2): "mute",
+}
+"""Readable column names for common usages; buttons become ``button_<n>``."""
+
+
+class Column:
+    """Where one decoded value lives in a report."""
+
+    def __init__(
+        self,
+        name: str,
+        offset: int,
+        size: int,
+        signed: bool,
+        selects: Optional[int] = None,
+    ) -> None:
+        """
+        Describe one decoded value.
+
+        :param name: The column name, from ``NAMES`` or the usage page and usage.
+        :type name: str
+        :param offset: Bit offset in the report, counting the report ID byte.
+        :type offset: int
+        :param size: Width in bits.
+        :type size: int
+        :param signed: ``True`` if the logical range is signed.
+        :type signed: bool
+        :param selects: For array fields, the raw value that lists this usage;
+            ``None`` for variable fields.  (Defaults to ``None``)
+        :type selects: int, optional
+        """
+        self.name = name
+        self.offset = offset
+        self.size = size
+        self.signed = signed
+        self.selects = selects
+
+
+class Layout:
+    """A report descriptor compiled into columns for bulk decoding."""
+
+    def __init__(self, descriptor: bytes, report_id: Optional[int] = None) -> None:
+        """
+        Compile the input fields of one report into columns.
+
+        :param descriptor: The raw report descriptor.
+        :type descriptor: bytes
+        :param report_id: The report to decode.  (Defaults to the first input
+            report in the descriptor)
+        :type report_id: int, optional
+        :raises ValueError: If the descriptor has no such input report.
+        """
+        fields = parse_descriptor(descriptor)
+        self.lengths = report_lengths(fields)
+        """Input report lengths by report ID, not counting the report ID byte."""
+
+        self.uses_ids = 0 not in self.lengths
+        """``True`` if every report starts with a report ID byte."""
+
+        if report_id is None:
+            report_id = next(iter(self.lengths), None)
+        if report_id not in self.lengths:
+            raise ValueError("Descriptor has no input report %s." % report_id)
+
+        self.report_id = report_id
+        """The report ID decoded, ``0`` if the descriptor uses none."""
+
+        self.size = self.lengths[report_id] + self.uses_ids
+        """Bytes per report, including the report ID byte if there is one."""
+
+        self.columns = list()  # type: List[Column]
+        """The decoded values, in report order."""
+
+        for f in fields:
+            if f.kind != INPUT or f.report_id != report_id or f.constant:
+                continue
+            signed = f.logical_min < 0
+            for n in range(f.count):
+                offset = f.offset + n * f.size + 8 * self.uses_ids
+                if f.variable:
+                    name = _name(f.usage_page, f.usage(n))
+                    self.columns.append(Column(name, offset, f.size, signed))
+                    continue
+                # an array slot lists one usage at a time; give each usage a column
+                for i, usage in enumerate(f.usages):
+                    if usage:
+                        name = _name(f.usage_page, usage)
+                        raw = (f.logical_min + i) & ((1 << f.size) - 1)
+                        self.columns.append(Column(name, offset, f.size, False, raw))
+
+    def decode(self, reports: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Decode every report at once.
+
+        :param reports: A ``(count, size)`` ``uint8`` array, one report per row.
+        :type reports: numpy.ndarray
+        :return: One array per column name.  Single-bit and array-usage columns are
+            ``bool``; wider fields are ``int64``.  Array usages listed in several
+            slots are OR-ed into one column.
+        :rtype: Dict[str, numpy.ndarray]
+        """
+        bits = None
+        decoded = dict()
+        for c in self.columns:
+            if c.size == 1 and c.selects is None:
+                if bits is None:
+                    bits = np.unpackbits(reports, axis=1, bitorder="little")
+                value = bits[:, c.offset].astype(bool)
+            else:
+                value = _extract(reports, c.offset, c.size)
+                if c.selects is not None:
+                    value = value == c.selects
+                elif c.signed:
+                    value = value.astype(np.int64)
+                    value[value >= 1 << (c.size - 1)] -= 1 << c.size
+                else:
+                    value = value.astype(np.int64)
+            if c.name in decoded and value.dtype == bool:
+                value = decoded[c.name] | value
+            decoded[c.name] = value
+        return decoded
+
+
+def load_raw(data: bytes, layout: Layout) -> np.ndarray:
+    """
+    Split a back-to-back report dump into rows.
+
+    Reports with other report IDs are skipped.  Nothing is done per report: when
+    every report ID has the same length the dump is cut into rows and grouped by
+    ID, otherwise the report boundaries are found with array-wide jumps.
+
+    :param data: The captured bytes.
+    :type data: bytes
+    :param layout: The compiled report layout.
+    :type layout: Layout
+    :return: A ``(count, layout.size)`` ``uint8`` array.
+    :rtype: numpy.ndarray
+    """
+    buffer = np.frombuffer(data, dtype=np.uint8)
+    size = layout.size
+    if not layout.uses_ids or len(set(layout.lengths.values())) == 1:
+        count = len(buffer) // size
+        rows = buffer[: count * size].reshape(count, size)
+        if not layout.uses_ids or len(layout.lengths) == 1:
+            return rows
+        ids = np.unique(rows[:, 0])
+        if all(int(i) in layout.lengths for i in ids):
+            return rows[rows[:, 0] == layout.report_id]
+        # an unknown ID means a torn dump; find the boundaries the long way
+
+    # step from every byte to where the next report would start if a report began
+    # there; an unknown report ID resynchronises on the next byte
+    step = np.ones(256, dtype=np.int64)
+    for report_id, length in layout.lengths.items():
+        step[report_id] = length + 1
+    end = len(buffer)
+    jump = np.minimum(np.arange(end) + step[buffer], end)
+    jump = np.append(jump, end)
+    # double the jump length each round, so the chain of report starts from byte 0
+    # is marked in log2(len) array operations rather than one step per report
+    start = np.zeros(end + 1, dtype=bool)
+    start[0] = True
+    span = 1
+    while span <= end:
+        start[jump[start]] = True
+        jump = jump[jump]
+        span *= 2
+    starts = np.flatnonzero(start[:end])
+    starts = starts[(buffer[starts] == layout.report_id) & (starts + size <= end)]
+    index = starts[:, None] + np.arange(size)
+    return buffer[index]
+
+
+def load_timed(data: bytes, layout: Layout) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Split a timestamped trace of fixed-size records into times and rows.
+
+    Every record must hold this report; use a trace per report ID.
+
+    :param data: The captured bytes.
+    :type data: bytes
+    :param layout: The compiled report layout.
+    :type layout: Layout
+    :return: ``(time_us, reports)``, as ``int64`` and ``(count, layout.size)``
+        ``uint8`` arrays.
+    :rtype: Tuple[numpy.ndarray, numpy.ndarray]
+    """
+    record = np.dtype([("time", "<u8"), ("report", np.uint8, (layout.size,))])
+    count = len(data) // record.itemsize
+    records = np.frombuffer(data, dtype=record, count=count)
+    return records["time"].astype(np.int64), records["report"]
+
+
+def load_usbmon(
+    lines: Iterable[str], layout: Layout, device: Optional[str] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Collect completed interrupt IN transfers from a ``usbmon`` text log.
+
+    :param lines: The log lines.
+    :type lines: Iterable[str]
+    :param layout: The compiled report layout.
+    :type layout: Layout
+    :param device: Only use transfers whose address (i.e. ``"1:004:1"``, bus,
+        device and endpoint) matches.  (Defaults to any)
+    :type device: str, optional
+    :return: ``(time_us, reports)``, as ``int64`` and ``(count, layout.size)``
+        ``uint8`` arrays.
+    :rtype: Tuple[numpy.ndarray, numpy.ndarray]
+    """
+    times = list()
+    payload = bytearray()
+    size = layout.size
+    for line in lines:
+        words = line.split()
+        # tag, time, C, Ii:bus:dev:ep, status, length, =, data...
+        if len(words) < 8 or words[2] != "C" or not words[3].startswith("Ii:"):
+            continue
+        if device is not None and words[3][3:] != device:
+            continue
+        if words[6] != "=":
+            continue
+        report = bytes.fromhex("".join(words[7:]))
+        if len(report) < size:
+            continue
+        if layout.uses_ids and report[0] != layout.report_id:
+            continue
+        times.append(int(words[1]))
+        payload += report[:size]
+    reports = np.frombuffer(bytes(payload), dtype=np.uint8).reshape(-1, size)
+    return np.asarray(times, dtype=np.int64), reports
+
+
+def gap_stats(time_us: np.ndarray) -> Dict[str, float]:
+    """
+    Summarise the time between consecutive reports.
+
+    :param time_us: Report times in microseconds, in capture order.
+    :type time_us: numpy.ndarray
+    :return: ``reports``, ``seconds`` and ``rate`` (reports per second), and gap
+        ``min``, ``mean``, ``median``, ``p99`` and ``max`` in microseconds.
+    :rtype: Dict[str, float]
+    """
+    stats = {"reports": float(len(time_us)), "seconds": 0.0, "rate": 0.0}
+    if len(time_us) < 2:
+        return stats
+    gaps = np.diff(time_us)
+    seconds = (time_us[-1] - time_us[0]) / 1e6
+    stats.update(
+        seconds=seconds,
+        rate=(len(time_us) - 1) / seconds if seconds else 0.0,
+        min=float(gaps.min()),
+        mean=float(gaps.mean()),
+        median=float(np.median(gaps)),
+        p99=float(np.percentile(gaps, 99)),
+        max=float(gaps.max()),
+    )
+    return stats
+
+
+def rate_per_second(time_us: np.ndarray) -> np.ndarray:
+    """
+    Count reports in each whole second of the capture.
+
+    :param time_us: Report times in microseconds, in capture order.
+    :type time_us: numpy.ndarray
+    :return: Reports per second, starting at the first report.
+    :rtype: numpy.ndarray
+    """
+    if not len(time_us):
+        return np.zeros(0, dtype=np.int64)
+    return np.bincount((time_us - time_us[0]) // 1000000)
+
+
+def press_durations(
+    pressed: np.ndarray, time_us: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Find every complete press of a button column.
+
+    A press already held when the capture starts, or still held when it ends, has
+    no known length and is left out.
+
+    :param pressed: The decoded ``bool`` column.
+    :type pressed: numpy.ndarray
+    :param time_us: Report times in microseconds, or report numbers when the
+        capture has no timestamps.
+    :type time_us: numpy.ndarray
+    :return: ``(start, duration)`` arrays, in the units of ``time_us``.
+    :rtype: Tuple[numpy.ndarray, numpy.ndarray]
+    """
+    edges = np.diff(pressed.astype(np.int8))
+    down = np.flatnonzero(edges == 1) + 1
+    up = np.flatnonzero(edges == -1) + 1
+    if len(up) and (not len(down) or up[0] < down[0]):
+        up = up[1:]
+    count = min(len(down), len(up))
+    start = time_us[down[:count]]
+    return start, time_us[up[:count]] - start
+
+
+def summarise(
+    columns: Dict[str, np.ndarray], time_us: np.ndarray, timed: bool = True
+) -> List[str]:
+    """
+    Describe a decoded capture in readable lines.
+
+    :param columns: Columns returned by ``Layout.decode``.
+    :type columns: Dict[str, numpy.ndarray]
+    :param time_us: Report times in microseconds, or report numbers.
+    :type time_us: numpy.ndarray
+    :param timed: ``False`` if ``time_us`` holds report numbers.  (Defaults to
+        ``True``)
+    :type timed: bool, optional
+    :return: Report rate and gap lines (if timed), then one line per button that
+        was pressed.
+    :rtype: List[str]
+    """
+    lines = list()
+    if timed:
+        s = gap_stats(time_us)
+        line = "%(reports)d reports over %(seconds).1fs, %(rate).1f reports/s"
+        lines.append(line % s)
+        if "max" in s:
+            lines.append(
+                "gaps min %(min).0fus mean %(mean).0fus median %(median).0fus"
+                " p99 %(p99).0fus max %(max).0fus" % s
+            )
+            per_second = rate_per_second(time_us)
+            lines.append(
+                "per second min %d max %d" % (per_second.min(), per_second.max())
+            )
+    else:
+        lines.append("%d reports, no timestamps" % len(time_us))
+
+    unit = "ms" if timed else " reports"
+    scale = 1000.0 if timed else 1.0
+    for name, column in columns.items():
+        if column.dtype != bool:
+            continue
+        _, durations = press_durations(column, time_us)
+        if not len(durations):
+            continue
+        durations = durations / scale
+        lines.append(
+            "%s: %d presses, held min %.1f%s median %.1f%s max %.1f%s"
+            % (
+                name,
+                len(durations),
+                durations.min(),
+                unit,
+                np.median(durations),
+                unit,
+                durations.max(),
+                unit,
+            )
+        )
+    return lines
+
+
+def _extract(reports: np.ndarray, offset: int, size: int) -> np.ndarray:
+    """Pull a ``size``-bit little-endian field at ``offset`` out of every row."""
+    first = offset // 8
+    last = (offset + size - 1) // 8
+    value = np.zeros(len(reports), dtype=np.uint64)
+    for n, byte in enumerate(range(first, last + 1)):
+        value |= reports[:, byte].astype(np.uint64) << np.uint64(8 * n)
+    value >>= np.uint64(offset % 8)
+    return value & np.uint64((1 << size) - 1)
+
+
+def _name(usage_page: int, usage: int) -> str:
+    """Name a column after its usage."""
+    if (usage_page, usage) in NAMES:
+        return NAMES[(usage_page, usage)]
+    if usage_page == 0x09:
+        return "button_%d" % usage
+    return "0x%02x:0x%02x" % (usage_page, usage)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("path", help="captured reports")
+    parser.add_argument(
+        "--format",
+        choices=("raw", "timed", "usbmon"),
+        default="raw",
+        help="capture format (default raw)",
+    )
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--descriptor", help="file holding the raw report descriptor")
+    source.add_argument(
+        "--profile", help="use the descriptor of a telephony.profiles profile"
+    )
+    source.add_argument(
+        "--telephony",
+        action="store_true",
+        help="decode against TELEPHONY_REPORT_DESCRIPTOR (the default)",
+    )
+    parser.add_argument("--report-id", type=int, help="report to decode")
+    parser.add_argument(
+        "--interval-us", type=float, help="polling interval of a raw capture"
+    )
+    parser.add_argument("--device", help="usbmon address to keep, i.e. 1:004:1")
+    args = parser.parse_args(argv)
+
+    if args.descriptor:
+        with open(args.descriptor, "rb") as f:
+            descriptor = f.read()
+    elif args.profile:
+        from telephony.profiles import find
+
+        descriptor = find(args.profile).descriptor
+    else:
+        descriptor = TELEPHONY_REPORT_DESCRIPTOR
+    layout = Layout(descriptor, args.report_id)
+
+    timed = True
+    if args.format == "usbmon":
+        with open(args.path) as f:
+            time_us, reports = load_usbmon(f, layout, args.device)
+    else:
+        with open(args.path, "rb") as f:
+            data = f.read()
+        if args.format == "timed":
+            time_us, reports = load_timed(data, layout)
+        else:
+            reports = load_raw(data, layout)
+            time_us = np.arange(len(reports), dtype=np.int64)
+            if args.interval_us:
+                time_us = (time_us * args.interval_us).astype(np.int64)
+            else:
+                timed = False
+
+    for line in summarise(layout.decode(reports), time_us, timed):
+        print(line)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,276 @@
+"""
+Host-side listener for the device's reports on Linux, via hidraw and epoll.
+
+This runs on the desktop, not on the board.  It opens the device's ``/dev/hidraw*``
+node, waits for reports with ``epoll`` instead of polling, decodes each report
+against the device's report descriptor and dispatches every changed usage to the
+registered handlers, while keeping per-report-ID decode and dispatch latency stats.
+
+.. code::
+
+   python -m tools.hidraw_listener                  # first telephony device found
+   python -m tools.hidraw_listener /dev/hidraw3
+
+Any readable file descriptor works as a stand-in for hidraw, such as a pipe or the
+slave side of a pty.  Pass ``--telephony`` (or ``--descriptor FILE``) to choose the
+descriptor to decode against when the path is not a real hidraw node.
+"""
+
+import argparse
+import fcntl
+import glob
+import os
+import select
+import sys
+import time
+
+from typing import Callable, List, Optional
+
+from telephony.descriptor import (
+    TELEPHONY_REPORT_DESCRIPTOR,
+    decode_report,
+    parse_descriptor,
+    report_lengths,
+)
+
+HIDIOCGRDESCSIZE = 0x80044801
+"""``_IOR('H', 0x01, int)``: read the report descriptor size from a hidraw node."""
+
+HIDIOCGRDESC = 0x90044802
+"""``_IOR('H', 0x02, struct hidraw_report_descriptor)``: read the descriptor."""
+
+
+def find_hidraw(usage_page: int = 0x0B) -> Optional[str]:
+    """
+    Find the first hidraw node whose descriptor starts with the given usage page.
+
+    :param usage_page: The top-level usage page to look for.  (Defaults to ``0x0B``,
+        Telephony Devices)
+    :type usage_page: int, optional
+    :return: The ``/dev/hidraw*`` path, or ``None`` if no device matched.
+    :rtype: str
+    """
+    for path in sorted(glob.glob("/sys/class/hidraw/hidraw*/device/report_descriptor")):
+        with open(path, "rb") as f:
+            descriptor = f.read()
+        if _first_usage_page(descriptor) == usage_page:
+            return "/dev/" + path.split("/")[4]
+    return None
+
+
+def read_descriptor(fd: int) -> Optional[bytes]:
+    """
+    Read the report descriptor from an open hidraw node.
+
+    :param fd: A file descriptor for a ``/dev/hidraw*`` node.
+    :type fd: int
+    :return: The raw descriptor, or ``None`` if ``fd`` is not a hidraw node.
+    :rtype: bytes
+    """
+    try:
+        size = bytearray(4)
+        fcntl.ioctl(fd, HIDIOCGRDESCSIZE, size)
+        buffer = bytearray(4100)
+        buffer[:4] = size
+        fcntl.ioctl(fd, HIDIOCGRDESC, buffer)
+    except OSError:
+        return None
+    return bytes(buffer[4 : 4 + int.from_bytes(size, "little")])
+
+
+class ReportListener:
+    """Decode and dispatch input reports read from a hidraw (or stand-in) descriptor."""
+
+    def __init__(self, fd: int, descriptor: bytes) -> None:
+        """
+        Decode and dispatch input reports read from a file descriptor.
+
+        :param fd: An open, readable file descriptor.  It is switched to
+            non-blocking mode.
+        :type fd: int
+        :param descriptor: The report descriptor to decode against.
+        :type descriptor: bytes
+        """
+        self._fd = fd
+        os.set_blocking(fd, False)
+        self._epoll = select.epoll()
+        self._epoll.register(fd, select.EPOLLIN)
+
+        self._fields = parse_descriptor(descriptor)
+        self._lengths = report_lengths(self._fields)
+        self._uses_ids = 0 not in self._lengths
+        self._pending = b""
+        self._last = dict()  # (usage_page, usage) -> value
+        self._handlers = list()
+
+        self.stats = dict()
+        """Per report ID ``[reports, decode ns, max decode, dispatch ns, max]``."""
+
+    def on(
+        self,
+        callback: Callable[[int, int, int, int], None],
+        usage_page: Optional[int] = None,
+        usage: Optional[int] = None,
+    ) -> None:
+        """
+        Register a handler for changed usages.
+
+        :param callback: Called as ``callback(usage_page, usage, value, timestamp)``
+            with the ``time.monotonic_ns()`` timestamp the report was read at.
+        :type callback: Callable
+        :param usage_page: Only dispatch usages on this page.  (Defaults to all)
+        :type usage_page: int, optional
+        :param usage: Only dispatch this usage.  (Defaults to all)
+        :type usage: int, optional
+        """
+        self._handlers.append((usage_page, usage, callback))
+
+    def poll(self, timeout: float = -1) -> int:
+        """
+        Wait for reports, then decode and dispatch every complete report read.
+
+        :param timeout: Seconds to wait, or ``-1`` to wait indefinitely.
+        :type timeout: float, optional
+        :return: The number of reports processed.
+        :rtype: int
+        """
+        processed = 0
+        for _, _ in self._epoll.poll(timeout):
+            try:
+                data = os.read(self._fd, 4096)
+            except BlockingIOError:
+                continue
+            stamp = time.monotonic_ns()
+            for report in self._split(data):
+                self._process(report, stamp)
+                processed += 1
+        return processed
+
+    def run(self, stats_every: float = 0) -> None:
+        """
+        Process reports until interrupted, printing stats periodically and on exit.
+
+        :param stats_every: Seconds between stats summaries, ``0`` to only print
+            them on exit.  (Defaults to ``0``)
+        :type stats_every: float, optional
+        """
+        next_stats = time.monotonic() + stats_every
+        try:
+            while True:
+                self.poll(stats_every or -1)
+                if stats_every and time.monotonic() >= next_stats:
+                    next_stats += stats_every
+                    self.print_stats()
+        except KeyboardInterrupt:
+            pass
+        self.print_stats()
+
+    def print_stats(self, file=sys.stderr) -> None:
+        """Print a one-line latency summary for each report ID."""
+        for report_id, (n, dec, dec_max, dis, dis_max) in sorted(self.stats.items()):
+            print(
+                "report %d: %d reports, decode %.1f/%.1fus, dispatch %.1f/%.1fus"
+                " (mean/max)"
+                % (report_id, n, dec / n / 1000, dec_max / 1000, dis / n / 1000,
+                   dis_max / 1000),
+                file=file,
+            )
+
+    def _split(self, data: bytes) -> List[bytes]:
+        """Split a read into whole reports, keeping any partial report for later."""
+        data = self._pending + data
+        reports = list()
+        while data:
+            if self._uses_ids:
+                length = self._lengths.get(data[0])
+                if length is None:
+                    # unknown report ID, resynchronise on the next byte
+                    data = data[1:]
+                    continue
+                length += 1
+            else:
+                length = self._lengths[0]
+            if len(data) < length:
+                break
+            reports.append(data[:length])
+            data = data[length:]
+        self._pending = data
+        return reports
+
+    def _process(self, report: bytes, stamp: int) -> None:
+        """Decode one report, dispatch its changed usages and record latencies."""
+        t0 = time.perf_counter_ns()
+        values = decode_report(self._fields, report)
+        t1 = time.perf_counter_ns()
+
+        for page, usage, value in values:
+            key = (page, usage)
+            if self._last.get(key) == value:
+                continue
+            self._last[key] = value
+            for want_page, want_usage, callback in self._handlers:
+                if want_page in (None, page) and want_usage in (None, usage):
+                    callback(page, usage, value, stamp)
+        t2 = time.perf_counter_ns()
+
+        report_id = report[0] if self._uses_ids else 0
+        s = self.stats.setdefault(report_id, [0, 0, 0, 0, 0])
+        s[0] += 1
+        s[1] += t1 - t0
+        s[2] = max(s[2], t1 - t0)
+        s[3] += t2 - t1
+        s[4] = max(s[4], t2 - t1)
+
+
+def _first_usage_page(descriptor: bytes) -> Optional[int]:
+    """Return the data of the first USAGE_PAGE item in a descriptor."""
+    if descriptor[:1] == b"\x05":
+        return descriptor[1]
+    if descriptor[:1] == b"\x06":
+        return descriptor[1] | (descriptor[2] << 8)
+    return None
+
+
+def _print_event(usage_page: int, usage: int, value: int, stamp: int) -> None:
+    """Default handler: print each changed usage."""
+    line = "%.6f page 0x%02x usage 0x%02x = %d"
+    print(line % (stamp / 1e9, usage_page, usage, value))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("path", nargs="?", help="hidraw node, pipe or pty to read")
+    parser.add_argument("--descriptor", help="file holding the raw report descriptor")
+    parser.add_argument(
+        "--telephony",
+        action="store_true",
+        help="decode against TELEPHONY_REPORT_DESCRIPTOR",
+    )
+    parser.add_argument(
+        "--stats-every", type=float, default=0, help="seconds between stats lines"
+    )
+    args = parser.parse_args(argv)
+
+    path = args.path or find_hidraw()
+    if path is None:
+        parser.error("no telephony hidraw device found, give a path")
+    fd = os.open(path, os.O_RDONLY | os.O_NONBLOCK)
+
+    if args.descriptor:
+        with open(args.descriptor, "rb") as f:
+            descriptor = f.read()
+    elif args.telephony:
+        descriptor = TELEPHONY_REPORT_DESCRIPTOR
+    else:
+        descriptor = read_descriptor(fd) or TELEPHONY_REPORT_DESCRIPTOR
+
+    listener = ReportListener(fd, descriptor)
+    listener.on(_print_event)
+    listener.run(args.stats_every)
+    os.close(fd)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,203 @@
+"""
+Host-side decoder for the device's binary telemetry stream.
+
+This runs on the desktop, not on the board.  It reads the fixed-size records written
+by ``telephony/telemetry.py`` from the ``usb_cdc`` data port (or a file captured from
+it), prints them as readable log lines and keeps per-kind rate statistics, loop time
+figures and the number of records the device had to drop.
+
+.. code::
+
+   python -m tools.telemetry_decode /dev/ttyACM1
+   python -m tools.telemetry_decode capture.bin --quiet --stats-every 0
+"""
+
+import argparse
+import os
+import struct
+import sys
+import termios
+import time
+import tty
+from typing import Iterator, List, Optional, Tuple
+
+from telephony.profiler import PHASES
+from telephony.telemetry import (
+    FAULT,
+    INPUT,
+    LOOP,
+    LOST,
+    OVERRUN,
+    PHASE,
+    RECORD_FORMAT,
+    RECORD_SIZE,
+    REPORT,
+    RESTART,
+)
+
+NAMES = {
+    INPUT: "input",
+    REPORT: "report",
+    LOOP: "loop",
+    LOST: "lost",
+    OVERRUN: "overrun",
+    FAULT: "fault",
+    PHASE: "phase",
+    RESTART: "restart",
+}
+"""Readable names for each record kind."""
+
+
+class TelemetryDecoder:
+    """Reassemble, decode and summarise telemetry records."""
+
+    def __init__(self) -> None:
+        """Create a decoder with empty statistics."""
+        self._pending = b""
+        self._last_stamp = None
+        self._time_us = 0
+        self._window_start = 0
+
+        self.counts = dict()  # kind -> records in the current stats window
+        """Records of each kind seen since the last ``summary()``."""
+
+        self.lost = 0
+        """Records the device reported as dropped."""
+
+        self.skipped = 0
+        """Bytes discarded while resynchronising on a record boundary."""
+
+        self.loop_us = [0, 0, 0]  # count, total, max
+        """Loop time ``[count, total, max]`` in microseconds for the current window."""
+
+    def feed(self, data: bytes) -> Iterator[Tuple[int, int, int, int]]:
+        """
+        Decode every complete record in a chunk of the stream.
+
+        Timestamps are unwrapped, so they keep counting up past the 32-bit
+        microsecond wrap on the device (about every 71 minutes).
+
+        :param data: Bytes read from the port or capture file.
+        :type data: bytes
+        :return: ``(kind, index, value, time_us)`` for each record.
+        :rtype: Iterator[Tuple[int, int, int, int]]
+        """
+        data = self._pending + data
+        offset = 0
+        while len(data) - offset >= RECORD_SIZE:
+            if data[offset] not in NAMES:
+                # not on a record boundary, skip a byte and try again
+                offset += 1
+                self.skipped += 1
+                continue
+            kind, index, value, stamp = struct.unpack_from(RECORD_FORMAT, data, offset)
+            offset += RECORD_SIZE
+
+            if self._last_stamp is not None:
+                self._time_us += (stamp - self._last_stamp) & 0xFFFFFFFF
+            self._last_stamp = stamp
+
+            self.counts[kind] = self.counts.get(kind, 0) + 1
+            if kind == LOST:
+                self.lost += value
+            elif kind == LOOP:
+                self.loop_us[0] += 1
+                self.loop_us[1] += value
+                self.loop_us[2] = max(self.loop_us[2], value)
+            yield kind, index, value, self._time_us
+        self._pending = data[offset:]
+
+    def summary(self) -> str:
+        """
+        Describe record rates and loop times since the last summary, then reset.
+
+        :return: A one-line summary.
+        :rtype: str
+        """
+        seconds = max((self._time_us - self._window_start) / 1e6, 1e-6)
+        rates = ", ".join(
+            "%s %.1f/s" % (NAMES[k], n / seconds)
+            for k, n in sorted(self.counts.items())
+        )
+        count, total, worst = self.loop_us
+        loops = ""
+        if count:
+            loops = ", update %.0f/%dus (mean/max)" % (total / count, worst)
+        line = "%s%s, %d lost, %d bytes skipped" % (
+            rates or "no records",
+            loops,
+            self.lost,
+            self.skipped,
+        )
+        self.counts = dict()
+        self.loop_us = [0, 0, 0]
+        self._window_start = self._time_us
+        return line
+
+
+def format_record(kind: int, index: int, value: int, time_us: int) -> str:
+    """
+    Turn a decoded record into a log line.
+
+    :return: The log line, starting with the time in seconds since the first record.
+    :rtype: str
+    """
+    if kind == INPUT:
+        text = "button %d %s" % (index, "pressed" if value else "released")
+    elif kind == REPORT:
+        text = "report %d %s" % (index, "sent" if value else "queued")
+    elif kind == LOOP:
+        text = "update took %dus" % value
+    elif kind == OVERRUN:
+        text = "loop overran its budget: %dus" % value
+    elif kind == FAULT:
+        reason = ("recovered", "chattering", "stuck")[min(value, 2)]
+        text = "input %d %s" % (index, reason)
+    elif kind == RESTART:
+        reason = "loop wedged" if index & 0x7F else "periodic summary"
+        cause = ", watchdog reset" if index & 0x80 else ""
+        text = "restarted (%s%s), %d overruns before" % (reason, cause, value)
+    elif kind == PHASE:
+        phase = PHASES[index] if index < len(PHASES) else "unnamed phase"
+        text = "startup: %s done at %dms" % (phase, value)
+    else:
+        text = "%d records dropped on the device" % value
+    return "%12.6f %s" % (time_us / 1e6, text)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("path", help="usb_cdc data port, or a captured stream file")
+    parser.add_argument("--quiet", action="store_true", help="only print statistics")
+    parser.add_argument(
+        "--stats-every", type=float, default=5, help="seconds between stats lines"
+    )
+    args = parser.parse_args(argv)
+
+    fd = os.open(args.path, os.O_RDONLY)
+    if os.isatty(fd):
+        tty.setraw(fd, termios.TCSANOW)
+
+    decoder = TelemetryDecoder()
+    next_stats = time.monotonic() + args.stats_every
+    try:
+        while True:
+            data = os.read(fd, 4096)
+            if not data:
+                break
+            for record in decoder.feed(data):
+                if not args.quiet:
+                    print(format_record(*record))
+            if args.stats_every and time.monotonic() >= next_stats:
+                next_stats += args.stats_every
+                print(decoder.summary(), file=sys.stderr)
+    except KeyboardInterrupt:
+        pass
+    print(decoder.summary(), file=sys.stderr)
+    os.close(fd)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())